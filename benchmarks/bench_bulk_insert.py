@@ -0,0 +1,61 @@
+"""
+Row-by-row PatientController.add_patient vs the batched add_patients.
+
+Usage: python -m benchmarks.bench_bulk_insert [rows] [single_rows]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from controllers.patient_controller import PatientController
+from benchmarks.fixtures import random_name, PROVINCES
+
+
+def generate_patients(count, start=0, seed=7):
+    rng = random.Random(seed)
+    for i in range(start, start + count):
+        ho, ten = random_name(rng)
+        yield {
+            'Ho': ho,
+            'Ten': ten,
+            'CMND': f"{200000000 + i:09d}",
+            'Gioitinh': rng.choice(["Nam", "Nữ"]),
+            'Ngaysinh': f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            'SDT': f"09{rng.randint(10000000, 99999999)}",
+            'Quequan': rng.choice(PROVINCES),
+        }
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    single_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+        controller = PatientController(DatabaseManager(db_file, persistent=True))
+
+        start = time.perf_counter()
+        for patient in generate_patients(single_rows):
+            controller.add_patient(patient)
+        single = time.perf_counter() - start
+        print(f"add_patient  x{single_rows:<8} {single:8.2f} s  ({single_rows / single:10.0f} rows/s)")
+
+        start = time.perf_counter()
+        result = controller.add_patients(generate_patients(rows, start=single_rows))
+        bulk = time.perf_counter() - start
+        print(f"add_patients x{rows:<8} {bulk:8.2f} s  ({rows / bulk:10.0f} rows/s)  {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Per-call cost of DatabaseManager with short-lived vs persistent connections.
+
+Builds a throw-away database with a 100k-row LichKham table and times the
+same model calls against a manager that reconnects on every ``with`` block
+and against one that keeps its connection open.
+
+Usage: python -m benchmarks.bench_connection [rows] [calls]
+"""
+
+import sys
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from database.models import Appointment
+from benchmarks.fixtures import populate_appointments
+
+
+def time_calls(label, func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / calls * 1e6
+    print(f"  {label:<38} {per_call:>10.1f} us/call")
+    return per_call
+
+
+def run(db_file, rows, calls):
+    ids = [random.randint(1, rows) for _ in range(calls)]
+    results = {}
+
+    for label, persistent in (("short-lived", False), ("persistent", True)):
+        db = DatabaseManager(db_file, persistent=persistent)
+        print(f"{label} connection:")
+        it = iter(ids * 3)
+        results[(label, 'find')] = time_calls(
+            "Appointment.find", lambda: Appointment.find(next(it), db), calls)
+        results[(label, 'where')] = time_calls(
+            "Appointment.where (pk)",
+            lambda: Appointment.where("MaLichKham = ?", (next(it),), db), calls)
+
+        def nested():
+            with db:
+                Appointment.find(next(it), db)
+                with db:
+                    Appointment.find(next(it), db)
+        results[(label, 'nested')] = time_calls("nested with-blocks (2 finds)", nested, calls // 2)
+        db.close()
+
+    print("speed-up:")
+    for op in ('find', 'where', 'nested'):
+        ratio = results[('short-lived', op)] / results[('persistent', op)]
+        print(f"  {op:<38} {ratio:>10.1f}x")
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    calls = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+        populate_appointments(DatabaseManager(db_file), rows)
+        print(f"LichKham rows: {rows}, calls per case: {calls}")
+        run(db_file, rows, calls)
+
+
+if __name__ == "__main__":
+    main()
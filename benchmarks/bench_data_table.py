@@ -0,0 +1,123 @@
+"""
+DataTable row bookkeeping at 100k rows: value scans vs the key index.
+
+Usage: python -m benchmarks.bench_data_table [rows] [operations]
+
+Needs a display, since the rows live in a real ttk.Treeview (the window is
+withdrawn).
+"""
+
+import sys
+import time
+import tkinter as tk
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from views.components.data_table import DataTable
+
+
+COLUMNS = [("MaBN", "Mã BN", 60), ("Ho", "Họ", 120), ("Ten", "Tên", 100), ("CMND", "CMND", 100)]
+
+
+# The previous implementations, which matched rows by comparing value tuples;
+# they keep their rows in a plain list, as the table used to
+def legacy_select_item_by_value(table, column_index, value):
+    for item_id in table.tree.get_children():
+        item_values = table.tree.item(item_id, "values")
+        if str(item_values[column_index]) == str(value):
+            table.tree.selection_set(item_id)
+            table.tree.see(item_id)
+            return
+
+
+def legacy_update_selected_row(table, data, values):
+    selected_items = table.tree.selection()
+    if not selected_items:
+        return
+    item_id = selected_items[0]
+    table.tree.item(item_id, values=values)
+    old_values = table.tree.item(item_id, "values")
+    for i, row in enumerate(data):
+        if row == old_values:
+            data[i] = values
+            break
+
+
+def legacy_delete_selected_rows(table, data):
+    selected_items = table.tree.selection()
+    if not selected_items:
+        return
+    values_to_remove = []
+    for item_id in selected_items:
+        values_to_remove.append(table.tree.item(item_id, "values"))
+        table.tree.delete(item_id)
+    data[:] = [row for row in data if row not in values_to_remove]
+
+
+def make_rows(count):
+    return [(i, "Nguyễn", f"Văn {i}", f"{100000000 + i:09d}") for i in range(1, count + 1)]
+
+
+def measure(label, func, operations):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed * 1000:9.1f} ms total, {elapsed / operations * 1e6:9.1f} us/op")
+
+
+def run(root, rows, operations, legacy):
+    table = DataTable(root, COLUMNS, key_column=0)
+    data = make_rows(rows)
+    table.load_data(data)
+    keys = [rows - i * (rows // operations) for i in range(operations)]
+
+    def select():
+        for key in keys:
+            if legacy:
+                legacy_select_item_by_value(table, 0, key)
+            else:
+                table.select_by_key(key)
+
+    def update():
+        for key in keys:
+            table.select_by_key(key)
+            values = (key, "Trần", f"Thị {key}", f"{200000000 + key:09d}")
+            if legacy:
+                legacy_update_selected_row(table, data, values)
+            else:
+                table.update_selected_row(values)
+
+    def delete():
+        table.tree.selection_set([table._key_items[str(key)] for key in keys])
+        if legacy:
+            legacy_delete_selected_rows(table, data)
+        else:
+            table.delete_selected_rows()
+
+    name = "value scans" if legacy else "key index"
+    print(f"{name}:")
+    measure(f"select by key x{operations}", select, operations)
+    measure(f"update selected row x{operations}", update, operations)
+    measure(f"delete {operations} selected rows", delete, operations)
+    table.frame.destroy()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    root = tk.Tk()
+    root.withdraw()
+
+    print(f"{rows} rows, {operations} operations each")
+    run(root, rows, operations, legacy=True)
+    run(root, rows, operations, legacy=False)
+
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
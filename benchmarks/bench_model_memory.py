@@ -0,0 +1,96 @@
+"""
+Bytes per loaded patient: __dict__-backed models vs row-backed models.
+
+Usage: python -m benchmarks.bench_model_memory [patients]
+
+Memory is what tracemalloc sees allocated by the load and still held by the
+returned list, so it includes the column values themselves.
+"""
+
+import sys
+import os
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from database.models import Patient
+from benchmarks.fixtures import populate_people
+
+QUERY = "SELECT * FROM BenhNhan"
+
+
+# The previous Model storage: one __dict__ per instance, built from the
+# dict fetch_all made for the row
+class LegacyPatient:
+
+    def __init__(self, db_manager=None, **kwargs):
+        self.__dict__.update(kwargs)
+        self.__dict__['_changed'] = set()
+        self.db_manager = db_manager
+
+
+def legacy_models(db):
+    with db:
+        return [LegacyPatient(db_manager=db, **record) for record in db.fetch_all(QUERY)]
+
+
+def legacy_controller_rows(db):
+    # What the controllers returned for every instance
+    return [{k: v for k, v in item.__dict__.items() if not k.startswith('_') and k != 'db_manager'}
+            for item in legacy_models(db)]
+
+
+def row_models(db):
+    with db:
+        return Patient._query(db, QUERY)
+
+
+def row_views(db):
+    return [item.row_view() for item in row_models(db)]
+
+
+def row_dicts(db):
+    return [item.to_dict() for item in row_models(db)]
+
+
+def measure(label, func, db, patients):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = func(db)
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<28} {held / patients:8.0f} B/row held {peak / patients:8.0f} B/row peak"
+          f" {elapsed * 1000:9.1f} ms")
+    del rows
+
+
+def main():
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+        db = DatabaseManager(db_file, persistent=True)
+        populate_people(db, patients=patients, doctors=0)
+
+        print(f"{patients} patients")
+        measure("dict-backed models", legacy_models, db, patients)
+        measure("dict-backed controller dicts", legacy_controller_rows, db, patients)
+        measure("row-backed models", row_models, db, patients)
+        measure("row-backed row views", row_views, db, patients)
+        measure("row-backed to_dict", row_dicts, db, patients)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+ScheduleController.find_next_slots over 200 doctors x 90 days.
+
+Usage: python -m benchmarks.bench_next_slots [doctors] [days] [repeat]
+"""
+
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from config.settings import TIME_SLOTS, DEFAULT_SPECIALTIES
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from controllers.schedule_controller import ScheduleController
+from benchmarks.fixtures import populate_people
+
+
+def book_window(db, doctors, days, per_doctor, free_last_day=True):
+    # Every doctor gets per_doctor bookings on every day of the window,
+    # except on the last day when free_last_day is set
+    start = datetime.now() + timedelta(days=1)
+    rows = []
+    for offset in range(days - 1 if free_last_day else days):
+        day = (start + timedelta(days=offset)).strftime("%Y-%m-%d")
+        for doctor_id in range(1, doctors + 1):
+            for slot in TIME_SLOTS[:per_doctor]:
+                rows.append((doctor_id % 1000 + 1, doctor_id, day, slot, "Khám định kỳ", "Chờ khám"))
+
+    with db:
+        db.executemany(
+            "INSERT INTO LichKham (MaBN, MaBS, NgayKham, GioKham, LydoKham, TrangThai) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        db.commit()
+    return start.strftime("%Y-%m-%d"), len(rows)
+
+
+def measure(func, repeat):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    doctors = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    repeat = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+        db = DatabaseManager(db_file, persistent=True)
+        populate_people(db, patients=1000, doctors=doctors)
+
+        # Doctors are at their daily limit until the last day of the window,
+        # so the finder has to read every booked doctor-day before it answers
+        from_date, booked = book_window(db, doctors, days, per_doctor=len(TIME_SLOTS) // 2)
+        print(f"{doctors} doctors x {days} days, {booked} booked appointments")
+
+        controller = ScheduleController(db)
+        controller.max_appointments_per_day = doctors * len(TIME_SLOTS)
+
+        free_date = (datetime.strptime(from_date, "%Y-%m-%d") + timedelta(days=days - 1)).strftime("%Y-%m-%d")
+        cases = [
+            ("any doctor", {}),
+            ("one specialty", {'specialty': DEFAULT_SPECIALTIES[0]}),
+            ("one doctor", {'doctor_id': doctors // 2}),
+        ]
+        for start_label, start_date in (("full window", from_date), ("free first day", free_date)):
+            for label, filters in cases:
+                elapsed, slots = measure(
+                    lambda: controller.find_next_slots(from_date=start_date, n=10, days=days, **filters), repeat
+                )
+                first = f"{slots[0]['NgayKham']} {slots[0]['GioKham']}" if slots else "-"
+                print(f"{start_label:<15} {label:<14} {elapsed:8.2f} ms  {len(slots)} slots, first {first}")
+
+
+if __name__ == "__main__":
+    main()
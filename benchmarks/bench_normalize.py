@@ -0,0 +1,71 @@
+"""
+normalize_vietnamese_name: the old per-character mapping vs the translate table.
+
+Usage: python -m benchmarks.bench_normalize [names]
+"""
+
+import sys
+import random
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from utils.helpers import normalize_vietnamese_name, build_search_key
+from benchmarks.fixtures import random_name
+
+
+# The previous implementation, which rebuilt its mapping for every character
+def normalize_per_char(name):
+    name = name.strip()
+
+    def normalize_char(c):
+        mapping = {
+            'à': 'a', 'á': 'a', 'ả': 'a', 'ã': 'a', 'ạ': 'a',
+            'ă': 'a', 'ằ': 'a', 'ắ': 'a', 'ẳ': 'a', 'ẵ': 'a', 'ặ': 'a',
+            'â': 'a', 'ầ': 'a', 'ấ': 'a', 'ẩ': 'a', 'ẫ': 'a', 'ậ': 'a',
+            'đ': 'd',
+            'è': 'e', 'é': 'e', 'ẻ': 'e', 'ẽ': 'e', 'ẹ': 'e',
+            'ê': 'e', 'ề': 'e', 'ế': 'e', 'ể': 'e', 'ễ': 'e', 'ệ': 'e',
+            'ì': 'i', 'í': 'i', 'ỉ': 'i', 'ĩ': 'i', 'ị': 'i',
+            'ò': 'o', 'ó': 'o', 'ỏ': 'o', 'õ': 'o', 'ọ': 'o',
+            'ô': 'o', 'ồ': 'o', 'ố': 'o', 'ổ': 'o', 'ỗ': 'o', 'ộ': 'o',
+            'ơ': 'o', 'ờ': 'o', 'ớ': 'o', 'ở': 'o', 'ỡ': 'o', 'ợ': 'o',
+            'ù': 'u', 'ú': 'u', 'ủ': 'u', 'ũ': 'u', 'ụ': 'u',
+            'ư': 'u', 'ừ': 'u', 'ứ': 'u', 'ử': 'u', 'ữ': 'u', 'ự': 'u',
+            'ỳ': 'y', 'ý': 'y', 'ỷ': 'y', 'ỹ': 'y', 'ỵ': 'y'
+        }
+        if c.lower() in mapping:
+            return mapping[c.lower()]
+        return c.lower()
+
+    return ''.join(normalize_char(c) for c in name)
+
+
+def measure(func, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    return time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    rng = random.Random(3)
+    names = [" ".join(random_name(rng)) for _ in range(count)]
+
+    mismatches = sum(1 for name in names[:10_000] if normalize_per_char(name) != normalize_vietnamese_name(name))
+    print(f"Checked 10000 names against the old implementation: {mismatches} mismatches")
+
+    for label, func in (("per-character mapping", normalize_per_char),
+                        ("translate table", normalize_vietnamese_name),
+                        ("build_search_key", build_search_key)):
+        elapsed = measure(func, names)
+        print(f"{label:<22} {elapsed:8.2f} s  ({count / elapsed:12.0f} names/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Patient.search (SearchKey and FTS5 indexes) vs the old LIKE '%term%' scan.
+
+Usage: python -m benchmarks.bench_search [patients] [repeat]
+"""
+
+import sys
+import os
+import tempfile
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from database.models import Patient
+from benchmarks.fixtures import populate_people
+
+TERMS = ["Nguyễn", "nguyen van an", "nguyen an", "Trần Thị Mai", "Hu", "Đà Nẵng", "1000123"]
+
+
+# The old Patient.search, which returned every match
+def like_search(db, term):
+    search_term = f"%{term}%"
+    with db:
+        return db.fetch_all(
+            "SELECT * FROM BenhNhan WHERE Ho LIKE ? OR Ten LIKE ? OR CMND LIKE ? OR Quequan LIKE ?",
+            (search_term,) * 4
+        )
+
+
+def measure(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rows = func()
+    return (time.perf_counter() - start) / repeat * 1000, len(rows)
+
+
+def main():
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, 'bench.db')
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+        db = DatabaseManager(db_file, persistent=True)
+
+        start = time.perf_counter()
+        populate_people(db, patients=patients, doctors=0)
+        print(f"Loaded {patients} patients in {time.perf_counter() - start:.1f} s")
+
+        print(f"{'term':<16} {'LIKE ms':>10} {'search ms':>10} {'rows':>6}")
+        for term in TERMS:
+            like_ms, _ = measure(lambda: like_search(db, term), max(1, repeat // 10))
+            search_ms, rows = measure(lambda: Patient.search(term, 100, 0, db), repeat)
+            print(f"{term:<16} {like_ms:10.2f} {search_ms:10.2f} {rows:6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Synthetic data used by the benchmarks.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from config.settings import TIME_SLOTS, DEFAULT_SPECIALTIES
+from utils.helpers import build_search_key, build_sort_key
+
+FAMILY_NAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng", "Bùi", "Đỗ"]
+MIDDLE_NAMES = ["Văn", "Thị", "Hữu", "Đức", "Minh", "Ngọc", "Thanh", "Quốc"]
+GIVEN_NAMES = ["An", "Bình", "Cường", "Dũng", "Giang", "Hà", "Hải", "Hạnh", "Khánh", "Linh",
+               "Long", "Mai", "Nam", "Phúc", "Quân", "Sơn", "Thảo", "Trang", "Tuấn", "Yến"]
+PROVINCES = ["Hà Nội", "Hải Phòng", "Đà Nẵng", "Huế", "Nghệ An", "Thanh Hóa", "Cần Thơ", "TP. Hồ Chí Minh"]
+
+
+def random_name(rng):
+    return (
+        rng.choice(FAMILY_NAMES),
+        f"{rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}"
+    )
+
+
+def populate_people(db, patients=1000, doctors=50, seed=1):
+    rng = random.Random(seed)
+    patient_rows = []
+    for i in range(patients):
+        ho, ten = random_name(rng)
+        gender, province = rng.choice(["Nam", "Nữ"]), rng.choice(PROVINCES)
+        patient_rows.append((ho, ten, build_search_key(f"{ho} {ten}"), f"{100000000 + i:09d}", gender,
+                             f"{rng.randint(1940, 2020)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                             province, *map(build_sort_key, (ho, ten, gender, province))))
+    doctor_rows = []
+    for i in range(doctors):
+        ho, ten = random_name(rng)
+        gender, specialty = rng.choice(["Nam", "Nữ"]), rng.choice(DEFAULT_SPECIALTIES)
+        doctor_rows.append((ho, ten, build_search_key(f"{ho} {ten}"), f"{900000000 + i:09d}", gender,
+                            "1980-01-01", specialty, *map(build_sort_key, (ho, ten, gender, specialty))))
+
+    with db:
+        db.executemany(
+            "INSERT INTO BenhNhan (Ho, Ten, SearchKey, CMND, Gioitinh, Ngaysinh, Quequan,"
+            " HoSortKey, TenSortKey, GioitinhSortKey, QuequanSortKey)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            patient_rows
+        )
+        db.executemany(
+            "INSERT INTO BacSi (Ho, Ten, SearchKey, CMND, Gioitinh, Ngaysinh, ChuyenKhoa,"
+            " HoSortKey, TenSortKey, GioitinhSortKey, ChuyenKhoaSortKey)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            doctor_rows
+        )
+        db.commit()
+
+
+def populate_appointments(db, rows, patients=1000, doctors=50, seed=1):
+    populate_people(db, patients, doctors, seed)
+
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=365)
+    appointment_rows = []
+    for i in range(rows):
+        day = start + timedelta(days=i * 730 // max(rows, 1))
+        status = rng.choice(["Chờ khám", "Đã khám", "Đã khám", "Hủy"])
+        appointment_rows.append((
+            rng.randint(1, patients),
+            (i % doctors) + 1,
+            day.strftime("%Y-%m-%d"),
+            TIME_SLOTS[(i // doctors) % len(TIME_SLOTS)],
+            "Khám định kỳ",
+            status,
+            build_sort_key("Khám định kỳ"),
+            build_sort_key(status)
+        ))
+
+    with db:
+        db.executemany(
+            "INSERT INTO LichKham (MaBN, MaBS, NgayKham, GioKham, LydoKham, TrangThai,"
+            " LydoKhamSortKey, TrangThaiSortKey) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            appointment_rows
+        )
+        db.commit()
@@ -1,11 +1,13 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 from database.models import Doctor
-from database.db_manager import DatabaseManager, DatabaseError
+from database.session import Session
+from database.db_manager import DatabaseManager, DatabaseError, BulkResult
+from controllers.stats_controller import StatsController
 from utils.validators import validate_doctor_data
 
 class DoctorController:
     def __init__(self, db_manager=None):
-        self.db_manager = db_manager or DatabaseManager()
+        self.db_manager = db_manager or DatabaseManager.shared()
     
     def get_all_doctors(self) -> List[Dict[str, Any]]:
         try:
@@ -15,10 +17,26 @@ class DoctorController:
             print(f"Error retrieving doctors: {e}")
             return []
     
+    def get_doctors_page(self, after=None, limit: int = 100, order_by=None,
+                         descending=False, offset: int = 0) -> List[Dict[str, Any]]:
+        try:
+            doctors = Doctor.page(after, limit, order_by, descending, self.db_manager, offset)
+            return [item.row_view() for item in doctors]
+        except (DatabaseError, ValueError) as e:
+            print(f"Error retrieving doctors page: {e}")
+            return []
+    
+    def count_doctors(self) -> int:
+        try:
+            return Doctor.count_rows(self.db_manager)
+        except DatabaseError as e:
+            print(f"Error counting doctors: {e}")
+            return 0
+    
     def get_doctor(self, doctor_id: int) -> Optional[Dict[str, Any]]:
         try:
             doctor = Doctor.find(doctor_id, self.db_manager)
-            return {k: v for k, v in doctor.__dict__.items() if not k.startswith('_') and k != 'db_manager'} if doctor else None
+            return doctor.to_dict() if doctor else None
         except DatabaseError as e:
             print(f"Error retrieving doctor: {e}")
             return None
@@ -26,7 +44,7 @@ class DoctorController:
     def get_doctor_by_cmnd(self, cmnd: str) -> Optional[Dict[str, Any]]:
         try:
             doctor = Doctor.find_by_cmnd(cmnd)
-            return {k: v for k, v in doctor.__dict__.items() if not k.startswith('_') and k != 'db_manager'} if doctor else None
+            return doctor.to_dict() if doctor else None
         except DatabaseError as e:
             print(f"Error retrieving doctor by CMND: {e}")
             return None
@@ -43,50 +61,92 @@ class DoctorController:
         except (DatabaseError, ValueError) as e:
             print(f"Error adding doctor: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
+    
+    def add_doctors(self, rows: Iterable[Dict[str, Any]], update_existing: bool = False,
+                    chunk_size: int = 1000) -> BulkResult:
+        try:
+            rows = (Doctor.with_derived_columns(row) for row in rows)
+            if update_existing:
+                return self.db_manager.upsert_many(
+                    Doctor.table_name, rows, conflict_columns=('CMND',),
+                    validate=validate_doctor_data, chunk_size=chunk_size
+                )
+            return self.db_manager.insert_many(
+                Doctor.table_name, rows, validate=validate_doctor_data, chunk_size=chunk_size
+            )
+        except DatabaseError as e:
+            print(f"Error adding doctors: {e}")
+            return BulkResult()
+        finally:
+            StatsController.invalidate_cache()
     
     def update_doctor(self, doctor_id: int, doctor_data: Dict[str, Any]) -> bool:
         try:
-            doctor = Doctor.find(doctor_id, self.db_manager)
-            if not doctor:
-                return False
-            
-            errors = validate_doctor_data(doctor_data)
-            if errors:
-                raise ValueError(f"Invalid doctor data: {errors}")
-            
-            for key, value in doctor_data.items():
-                setattr(doctor, key, value)
-            
-            return doctor.save()
+            with Session(self.db_manager) as session:
+                doctor = session.get(Doctor, doctor_id)
+                if not doctor:
+                    return False
+                
+                errors = validate_doctor_data(doctor_data)
+                if errors:
+                    raise ValueError(f"Invalid doctor data: {errors}")
+                
+                for key, value in doctor_data.items():
+                    setattr(doctor, key, value)
+                session.add(doctor)
+            return True
             
         except (DatabaseError, ValueError) as e:
             print(f"Error updating doctor: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
     
     def delete_doctor(self, doctor_id: int) -> bool:
         try:
-            doctor = Doctor.find(doctor_id, self.db_manager)
-            if not doctor:
-                return False
-            
-            return doctor.delete()
+            with Session(self.db_manager) as session:
+                doctor = session.get(Doctor, doctor_id)
+                if not doctor:
+                    return False
+                session.delete(doctor)
+            return True
             
         except DatabaseError as e:
             print(f"Error deleting doctor: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
+    
+    def search_doctors(self, search_term: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        try:
+            doctors = Doctor.search(search_term, limit, offset, self.db_manager)
+            return [doc.row_view() for doc in doctors]
+        except DatabaseError as e:
+            print(f"Error searching doctors: {e}")
+            return []
     
-    def search_doctors(self, search_term: str) -> List[Dict[str, Any]]:
+    def search_doctor_keys(self, search_term: str, limit: int = 1000) -> List[tuple]:
         try:
-            doctors = Doctor.search(search_term)
-            return [{k: v for k, v in doc.__dict__.items() if not k.startswith('_') and k != 'db_manager'} for doc in doctors]
+            return Doctor.search_keys(search_term, limit, self.db_manager)
         except DatabaseError as e:
             print(f"Error searching doctors: {e}")
             return []
     
+    def get_doctors_by_ids(self, ids: List[int], offset: int = 0, limit: int = 100, order_by=None,
+                           descending=False) -> List[Dict[str, Any]]:
+        try:
+            doctors = Doctor.find_many(ids, offset, limit, order_by, descending, self.db_manager)
+            return [item.row_view() for item in doctors]
+        except (DatabaseError, ValueError) as e:
+            print(f"Error retrieving doctors: {e}")
+            return []
+    
     def get_doctors_by_specialty(self, specialty: str) -> List[Dict[str, Any]]:
         try:
             doctors = Doctor.find_by_specialty(specialty)
-            return [{k: v for k, v in doc.__dict__.items() if not k.startswith('_') and k != 'db_manager'} for doc in doctors]
+            return [doc.row_view() for doc in doctors]
         except DatabaseError as e:
             print(f"Error retrieving doctors by specialty: {e}")
             return []
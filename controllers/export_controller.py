@@ -0,0 +1,355 @@
+import csv
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+
+from config.settings import APP_NAME, EXPORT_FORMATS
+from database.db_manager import DatabaseManager, DatabaseError
+from utils.helpers import truncate_text
+
+EXPORT_DIR = Path("exports")
+
+FORMAT_EXTENSIONS = {
+    "CSV": "csv",
+    "Excel": "xlsx",
+    "PDF": "pdf",
+}
+
+EXPORT_DATASETS = {
+    "appointments": {
+        "title": "Danh sách lịch khám",
+        "query": """
+            SELECT LK.MaLichKham, LK.NgayKham, LK.GioKham,
+                   BN.Ho || ' ' || BN.Ten AS TenBenhNhan,
+                   BS.Ho || ' ' || BS.Ten AS TenBacSi, BS.ChuyenKhoa,
+                   LK.LydoKham, LK.TrangThai
+            FROM LichKham LK
+            LEFT JOIN BacSi BS ON LK.MaBS = BS.MaBS
+            LEFT JOIN BenhNhan BN ON LK.MaBN = BN.MaBN
+        """,
+        "date_column": "LK.NgayKham",
+        "order_by": "LK.NgayKham, LK.GioKham, LK.MaLichKham",
+        "columns": [
+            ("MaLichKham", "Mã LK", 50),
+            ("NgayKham", "Ngày khám", 70),
+            ("GioKham", "Giờ", 40),
+            ("TenBenhNhan", "Bệnh nhân", 120),
+            ("TenBacSi", "Bác sĩ", 120),
+            ("ChuyenKhoa", "Chuyên khoa", 90),
+            ("LydoKham", "Lý do khám", 150),
+            ("TrangThai", "Trạng thái", 70),
+        ],
+    },
+    "patients": {
+        "title": "Danh sách bệnh nhân",
+        "query": """
+            SELECT MaBN, Ho, Ten, CMND, Gioitinh, Ngaysinh, SDT, Quequan, NhomMau
+            FROM BenhNhan
+        """,
+        "date_column": None,
+        "order_by": "MaBN",
+        "columns": [
+            ("MaBN", "Mã BN", 50),
+            ("Ho", "Họ", 90),
+            ("Ten", "Tên", 70),
+            ("CMND", "CMND", 80),
+            ("Gioitinh", "Giới tính", 50),
+            ("Ngaysinh", "Ngày sinh", 70),
+            ("SDT", "SĐT", 80),
+            ("Quequan", "Quê quán", 120),
+            ("NhomMau", "Nhóm máu", 50),
+        ],
+    },
+    "medical_records": {
+        "title": "Hồ sơ bệnh án",
+        "query": """
+            SELECT HS.MaHoSo, HS.NgayKham,
+                   BN.Ho || ' ' || BN.Ten AS TenBenhNhan,
+                   BS.Ho || ' ' || BS.Ten AS TenBacSi,
+                   HS.ChanDoan, HS.HuongDieuTri, HS.KetLuan
+            FROM HoSoBenhAn HS
+            LEFT JOIN BacSi BS ON HS.MaBS = BS.MaBS
+            LEFT JOIN BenhNhan BN ON HS.MaBN = BN.MaBN
+        """,
+        "date_column": "HS.NgayKham",
+        "order_by": "HS.NgayKham, HS.MaHoSo",
+        "columns": [
+            ("MaHoSo", "Mã HS", 50),
+            ("NgayKham", "Ngày khám", 70),
+            ("TenBenhNhan", "Bệnh nhân", 120),
+            ("TenBacSi", "Bác sĩ", 120),
+            ("ChanDoan", "Chẩn đoán", 150),
+            ("HuongDieuTri", "Hướng điều trị", 150),
+            ("KetLuan", "Kết luận", 120),
+        ],
+    },
+}
+
+PDF_FONT_CANDIDATES = [
+    "DejaVuSans.ttf",
+    "arial.ttf",
+    "Arial.ttf",
+    "LiberationSans-Regular.ttf",
+    "NotoSans-Regular.ttf",
+]
+
+PDF_FONT_DIRS = [
+    Path("/usr/share/fonts"),
+    Path("/usr/local/share/fonts"),
+    Path("/Library/Fonts"),
+    Path("C:/Windows/Fonts"),
+]
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+
+    def __init__(self, dataset: str, export_format: str, path: Path):
+        self.dataset = dataset
+        self.export_format = export_format
+        self.path = path
+        self.rows_written = 0
+        self.error = None
+        self.thread = None
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self.thread is not None and not self.thread.is_alive()
+
+
+def write_csv(path: Path, columns: List[Tuple[str, str, int]], rows: Iterable[tuple], title: str = None):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow([label for _, label, _ in columns])
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_xlsx(path: Path, columns: List[Tuple[str, str, int]], rows: Iterable[tuple], title: str = None):
+    import xlsxwriter
+
+    # constant_memory flushes each row to disk as soon as the next one starts
+    workbook = xlsxwriter.Workbook(str(path), {"constant_memory": True})
+    try:
+        worksheet = workbook.add_worksheet((title or "Export")[:31])
+        header_format = workbook.add_format({"bold": True, "bg_color": "#D9E1F2"})
+
+        for col, (_, label, width) in enumerate(columns):
+            worksheet.set_column(col, col, max(10, width // 7))
+            worksheet.write(0, col, label, header_format)
+
+        for row_index, row in enumerate(rows, start=1):
+            worksheet.write_row(row_index, 0, row)
+    finally:
+        workbook.close()
+
+
+def _register_pdf_font() -> str:
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    if "ExportFont" in pdfmetrics.getRegisteredFontNames():
+        return "ExportFont"
+
+    for font_dir in PDF_FONT_DIRS:
+        if not font_dir.exists():
+            continue
+        for name in PDF_FONT_CANDIDATES:
+            for font_path in font_dir.rglob(name):
+                try:
+                    pdfmetrics.registerFont(TTFont("ExportFont", str(font_path)))
+                    return "ExportFont"
+                except Exception:
+                    continue
+
+    # Built-in fonts cannot render Vietnamese diacritics, but still produce a file
+    return "Helvetica"
+
+
+def write_pdf(path: Path, columns: List[Tuple[str, str, int]], rows: Iterable[tuple], title: str = None):
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas
+
+    font = _register_pdf_font()
+    page_width, page_height = landscape(A4)
+    margin = 30
+    line_height = 14
+    font_size = 8
+
+    total_width = sum(width for _, _, width in columns)
+    scale = (page_width - 2 * margin) / total_width
+    widths = [width * scale for _, _, width in columns]
+    max_chars = [max(4, int(width / (font_size * 0.5))) for width in widths]
+
+    pdf = canvas.Canvas(str(path), pagesize=(page_width, page_height))
+    page_number = 0
+
+    def start_page():
+        nonlocal page_number
+        page_number += 1
+        y = page_height - margin
+        pdf.setFont(font, 12)
+        pdf.drawString(margin, y, title or APP_NAME)
+        pdf.setFont(font, font_size)
+        pdf.drawRightString(page_width - margin, y, f"Trang {page_number}")
+        y -= line_height * 1.5
+
+        x = margin
+        for (_, label, _), width in zip(columns, widths):
+            pdf.drawString(x, y, label)
+            x += width
+        pdf.line(margin, y - 3, page_width - margin, y - 3)
+        return y - line_height
+
+    # Rows are drawn as they arrive instead of being collected first. The
+    # canvas still keeps every finished page in memory until save(); only
+    # the rows themselves are never all held at once.
+    y = start_page()
+    text = pdf.beginText()
+    text.setFont(font, font_size)
+    for row in rows:
+        if y < margin:
+            pdf.drawText(text)
+            pdf.showPage()
+            y = start_page()
+            text = pdf.beginText()
+            text.setFont(font, font_size)
+
+        x = margin
+        for value, width, limit in zip(row, widths, max_chars):
+            if value is not None:
+                text.setTextOrigin(x, y)
+                text.textOut(truncate_text(str(value), limit))
+            x += width
+        y -= line_height
+
+    pdf.drawText(text)
+    pdf.showPage()
+    pdf.save()
+
+
+EXPORT_WRITERS = {
+    "CSV": write_csv,
+    "Excel": write_xlsx,
+    "PDF": write_pdf,
+}
+
+
+class ExportController:
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager.shared()
+
+    def get_datasets(self) -> Dict[str, str]:
+        return {key: spec["title"] for key, spec in EXPORT_DATASETS.items()}
+
+    def get_formats(self) -> List[str]:
+        return list(EXPORT_FORMATS)
+
+    def default_path(self, dataset: str, export_format: str) -> Path:
+        EXPORT_DIR.mkdir(exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        return EXPORT_DIR / f"{dataset}_{timestamp}.{FORMAT_EXTENSIONS[export_format]}"
+
+    def _build_query(self, dataset: str, start_date: str = None, end_date: str = None) -> Tuple[str, tuple]:
+        spec = EXPORT_DATASETS[dataset]
+        query = spec["query"]
+        conditions = []
+        params = []
+
+        if spec["date_column"] and start_date:
+            conditions.append(f"{spec['date_column']} >= ?")
+            params.append(start_date)
+        if spec["date_column"] and end_date:
+            conditions.append(f"{spec['date_column']} <= ?")
+            params.append(end_date)
+
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {spec['order_by']}"
+        return query, tuple(params)
+
+    def _iter_rows(self, job: ExportJob, query: str, params: tuple,
+                   columns: List[Tuple[str, str, int]], on_progress: Optional[Callable[[int], None]]):
+        keys = [key for key, _, _ in columns]
+        for row in self.db_manager.iter_query(query, params):
+            if job.cancelled:
+                raise ExportCancelled()
+
+            yield tuple(row[key] for key in keys)
+            job.rows_written += 1
+
+            if on_progress and job.rows_written % 1000 == 0:
+                on_progress(job.rows_written)
+
+    def _validate(self, dataset: str, export_format: str):
+        if dataset not in EXPORT_DATASETS:
+            raise ValueError(f"Unknown export dataset: {dataset}")
+        if export_format not in EXPORT_WRITERS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+    def _run(self, job: ExportJob, start_date: str = None, end_date: str = None,
+             on_progress: Callable[[int], None] = None):
+        spec = EXPORT_DATASETS[job.dataset]
+        query, params = self._build_query(job.dataset, start_date, end_date)
+        rows = self._iter_rows(job, query, params, spec["columns"], on_progress)
+
+        try:
+            EXPORT_WRITERS[job.export_format](job.path, spec["columns"], rows, spec["title"])
+        except BaseException:
+            rows.close()
+            if job.path.exists():
+                os.remove(job.path)
+            raise
+
+        if on_progress:
+            on_progress(job.rows_written)
+
+    def export(self, dataset: str, export_format: str, path: str = None,
+               start_date: str = None, end_date: str = None,
+               on_progress: Callable[[int], None] = None) -> Optional[ExportJob]:
+        try:
+            self._validate(dataset, export_format)
+            job = ExportJob(dataset, export_format, Path(path) if path else self.default_path(dataset, export_format))
+            self._run(job, start_date, end_date, on_progress)
+            return job
+        except (DatabaseError, ValueError, OSError, ImportError) as e:
+            print(f"Error exporting {dataset}: {e}")
+            return None
+
+    def export_async(self, dataset: str, export_format: str, path: str = None,
+                     start_date: str = None, end_date: str = None,
+                     on_progress: Callable[[int], None] = None,
+                     on_done: Callable[[ExportJob], None] = None) -> ExportJob:
+        self._validate(dataset, export_format)
+        job = ExportJob(dataset, export_format, Path(path) if path else self.default_path(dataset, export_format))
+
+        # Callbacks run on the worker thread; Tk callers should hand them to the
+        # main loop (e.g. with widget.after) before touching widgets.
+        def worker():
+            try:
+                self._run(job, start_date, end_date, on_progress)
+            except ExportCancelled:
+                pass
+            except Exception as e:
+                job.error = e
+                print(f"Error exporting {dataset}: {e}")
+            if on_done:
+                on_done(job)
+
+        job.thread = threading.Thread(target=worker, name=f"export-{dataset}", daemon=True)
+        job.thread.start()
+        return job
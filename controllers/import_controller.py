@@ -0,0 +1,211 @@
+import csv
+import re
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, Callable, Optional, Type, Tuple
+
+from database.models import Model, Patient, Doctor
+from database.db_manager import DatabaseManager, DatabaseError, BulkResult
+from controllers.stats_controller import StatsController
+from utils.helpers import parse_date
+from utils.validators import validate_patient_data, validate_doctor_data
+
+HEADER_ALIASES = {
+    "họ": "Ho",
+    "tên": "Ten",
+    "cmnd": "CMND",
+    "cccd": "CMND",
+    "cmnd/cccd": "CMND",
+    "giới tính": "Gioitinh",
+    "ngày sinh": "Ngaysinh",
+    "sđt": "SDT",
+    "số điện thoại": "SDT",
+    "quê quán": "Quequan",
+    "địa chỉ": "DiaChi",
+    "email": "Email",
+    "ghi chú": "GhiChu",
+    "nhóm máu": "NhomMau",
+    "chiều cao": "ChieuCao",
+    "cân nặng": "CanNang",
+    "tiền sử bệnh án": "TienSuBenhAn",
+    "dị ứng": "DiUng",
+    "chuyên khoa": "ChuyenKhoa",
+    "bằng cấp": "BangCap",
+}
+
+DATE_COLUMNS = ("Ngaysinh", "Ngaykham")
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_DISPLAY_DATE = re.compile(r"^(\d{1,2})[/-](\d{1,2})[/-](\d{4})$")
+
+
+# The readers yield (row number in the file, row) so that errors can point at
+# the right row when blank rows were skipped
+def iter_csv_rows(path: str, encoding: str = "utf-8-sig") -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with open(path, newline="", encoding=encoding) as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def iter_xlsx_rows(path: str, sheet: str = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        rows = worksheet.iter_rows(values_only=True)
+        headers = next(rows, None)
+        if not headers:
+            return
+
+        headers = [str(h).strip() if h is not None else "" for h in headers]
+        for row_number, values in enumerate(rows, start=2):
+            if values is None or all(v is None for v in values):
+                continue
+            yield row_number, dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+
+def iter_file_rows(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return iter_csv_rows(path)
+    if suffix in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(path)
+    raise ValueError(f"Unsupported import file type: {suffix}")
+
+
+def normalize_date(value: str) -> str:
+    # Regex fast paths keep strptime out of the per-row cost of large imports
+    if _ISO_DATE.match(value):
+        return value
+
+    match = _DISPLAY_DATE.match(value)
+    if match:
+        day, month, year = (int(part) for part in match.groups())
+        try:
+            return date(year, month, day).strftime("%Y-%m-%d")
+        except ValueError:
+            return value
+
+    try:
+        return parse_date(value).strftime("%Y-%m-%d")
+    except ValueError:
+        return value
+
+
+def normalize_value(column: str, value: Any) -> Any:
+    if value is None:
+        return None
+
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+
+    if isinstance(value, float) and value.is_integer() and column in ("CMND", "SDT"):
+        value = int(value)
+    if column in ("CMND", "SDT") and isinstance(value, int):
+        return str(value)
+
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        if column in DATE_COLUMNS:
+            return normalize_date(value)
+
+    return value
+
+
+class RowNumbers:
+    # File row of each record read by an import. Rows follow each other
+    # except after skipped blank rows, so only the jumps are stored.
+
+    def __init__(self):
+        self._indexes = []
+        self._rows = []
+
+    def add(self, index: int, row_number: int):
+        if self._rows and self._rows[-1] + index - self._indexes[-1] == row_number:
+            return
+        self._indexes.append(index)
+        self._rows.append(row_number)
+
+    def __getitem__(self, index: int) -> int:
+        position = bisect_right(self._indexes, index) - 1
+        return self._rows[position] + index - self._indexes[position]
+
+
+class ImportController:
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager.shared()
+
+    def _map_headers(self, table: str, row: Dict[str, Any]) -> Dict[str, Optional[str]]:
+        schema = self.db_manager.get_table_schema(table)
+        known = set(schema.column_names) if schema else set()
+        known -= {"created_at", "updated_at", "SearchKey"}
+        known = {name for name in known if not name.endswith("SortKey")}
+
+        mapping = {}
+        for header in row:
+            name = (header or "").strip()
+            column = name if name in known else HEADER_ALIASES.get(name.lower())
+            mapping[header] = column if column in known else None
+        return mapping
+
+    def _iter_records(self, table: str, rows: Iterator[Tuple[int, Dict[str, Any]]],
+                      row_numbers: RowNumbers) -> Iterator[Dict[str, Any]]:
+        mapping = None
+        for index, (row_number, row) in enumerate(rows):
+            row_numbers.add(index, row_number)
+            if mapping is None:
+                mapping = self._map_headers(table, row)
+            yield {
+                column: normalize_value(column, row.get(header))
+                for header, column in mapping.items()
+                if column
+            }
+
+    def _import(self, model: Type[Model], path: str, validate: Callable, update_existing: bool,
+                batch_size: int, progress: Callable[[BulkResult], None]) -> BulkResult:
+        table = model.table_name
+        try:
+            row_numbers = RowNumbers()
+            records = (model.with_derived_columns(record)
+                       for record in self._iter_records(table, iter_file_rows(path), row_numbers))
+            # Rows whose CMND already exists (in the database or earlier in the
+            # file) are skipped or updated by the database, not by an in-memory set.
+            result = self.db_manager.upsert_many(
+                table, records,
+                conflict_columns=("CMND",),
+                update_columns=None if update_existing else (),
+                validate=validate,
+                chunk_size=batch_size,
+                progress=progress
+            )
+            # Errors name the row of the file rather than the record's position
+            result.errors = [(None if index is None else row_numbers[index], errors)
+                             for index, errors in result.errors]
+            return result
+        except (DatabaseError, ValueError, OSError) as e:
+            print(f"Error importing {table} from {path}: {e}")
+            result = BulkResult()
+            result.errors.append((None, str(e)))
+            return result
+        finally:
+            StatsController.invalidate_cache()
+
+    def import_patients(self, path: str, update_existing: bool = False, batch_size: int = 1000,
+                        progress: Callable[[BulkResult], None] = None) -> BulkResult:
+        return self._import(Patient, path, validate_patient_data,
+                            update_existing, batch_size, progress)
+
+    def import_doctors(self, path: str, update_existing: bool = False, batch_size: int = 1000,
+                       progress: Callable[[BulkResult], None] = None) -> BulkResult:
+        return self._import(Doctor, path, validate_doctor_data,
+                            update_existing, batch_size, progress)
@@ -1,11 +1,13 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 from database.models import Patient
-from database.db_manager import DatabaseManager, DatabaseError
+from database.session import Session
+from database.db_manager import DatabaseManager, DatabaseError, BulkResult
+from controllers.stats_controller import StatsController
 from utils.validators import validate_patient_data
 
 class PatientController:
     def __init__(self, db_manager=None):
-        self.db_manager = db_manager or DatabaseManager()
+        self.db_manager = db_manager or DatabaseManager.shared()
     
     def get_all_patients(self) -> List[Dict[str, Any]]:
         try:
@@ -15,10 +17,26 @@ class PatientController:
             print(f"Error retrieving patients: {e}")
             return []
     
+    def get_patients_page(self, after=None, limit: int = 100, order_by=None,
+                          descending=False, offset: int = 0) -> List[Dict[str, Any]]:
+        try:
+            patients = Patient.page(after, limit, order_by, descending, self.db_manager, offset)
+            return [item.row_view() for item in patients]
+        except (DatabaseError, ValueError) as e:
+            print(f"Error retrieving patients page: {e}")
+            return []
+    
+    def count_patients(self) -> int:
+        try:
+            return Patient.count_rows(self.db_manager)
+        except DatabaseError as e:
+            print(f"Error counting patients: {e}")
+            return 0
+    
     def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
         try:
             patient = Patient.find(patient_id, self.db_manager)
-            return {k: v for k, v in patient.__dict__.items() if not k.startswith('_') and k != 'db_manager'} if patient else None
+            return patient.to_dict() if patient else None
         except DatabaseError as e:
             print(f"Error retrieving patient: {e}")
             return None
@@ -26,7 +44,7 @@ class PatientController:
     def get_patient_by_cmnd(self, cmnd: str) -> Optional[Dict[str, Any]]:
         try:
             patient = Patient.find_by_cmnd(cmnd)
-            return {k: v for k, v in patient.__dict__.items() if not k.startswith('_') and k != 'db_manager'} if patient else None
+            return patient.to_dict() if patient else None
         except DatabaseError as e:
             print(f"Error retrieving patient by CMND: {e}")
             return None
@@ -43,46 +61,88 @@ class PatientController:
         except (DatabaseError, ValueError) as e:
             print(f"Error adding patient: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
+    
+    def add_patients(self, rows: Iterable[Dict[str, Any]], update_existing: bool = False,
+                     chunk_size: int = 1000) -> BulkResult:
+        try:
+            rows = (Patient.with_derived_columns(row) for row in rows)
+            if update_existing:
+                return self.db_manager.upsert_many(
+                    Patient.table_name, rows, conflict_columns=('CMND',),
+                    validate=validate_patient_data, chunk_size=chunk_size
+                )
+            return self.db_manager.insert_many(
+                Patient.table_name, rows, validate=validate_patient_data, chunk_size=chunk_size
+            )
+        except DatabaseError as e:
+            print(f"Error adding patients: {e}")
+            return BulkResult()
+        finally:
+            StatsController.invalidate_cache()
     
     def update_patient(self, patient_id: int, patient_data: Dict[str, Any]) -> bool:
         try:
-            patient = Patient.find(patient_id, self.db_manager)
-            if not patient:
-                return False
-            
-            errors = validate_patient_data(patient_data)
-            if errors:
-                raise ValueError(f"Invalid patient data: {errors}")
-            
-            for key, value in patient_data.items():
-                setattr(patient, key, value)
-            
-            return patient.save()
+            with Session(self.db_manager) as session:
+                patient = session.get(Patient, patient_id)
+                if not patient:
+                    return False
+                
+                errors = validate_patient_data(patient_data)
+                if errors:
+                    raise ValueError(f"Invalid patient data: {errors}")
+                
+                for key, value in patient_data.items():
+                    setattr(patient, key, value)
+                session.add(patient)
+            return True
             
         except (DatabaseError, ValueError) as e:
             print(f"Error updating patient: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
     
     def delete_patient(self, patient_id: int) -> bool:
         try:
-            patient = Patient.find(patient_id, self.db_manager)
-            if not patient:
-                return False
-            
-            return patient.delete()
+            with Session(self.db_manager) as session:
+                patient = session.get(Patient, patient_id)
+                if not patient:
+                    return False
+                session.delete(patient)
+            return True
             
         except DatabaseError as e:
             print(f"Error deleting patient: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
+    
+    def search_patients(self, search_term: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        try:
+            patients = Patient.search(search_term, limit, offset, self.db_manager)
+            return [pat.row_view() for pat in patients]
+        except DatabaseError as e:
+            print(f"Error searching patients: {e}")
+            return []
     
-    def search_patients(self, search_term: str) -> List[Dict[str, Any]]:
+    def search_patient_keys(self, search_term: str, limit: int = 1000) -> List[tuple]:
         try:
-            patients = Patient.search(search_term)
-            return [{k: v for k, v in pat.__dict__.items() if not k.startswith('_') and k != 'db_manager'} for pat in patients]
+            return Patient.search_keys(search_term, limit, self.db_manager)
         except DatabaseError as e:
             print(f"Error searching patients: {e}")
             return []
     
+    def get_patients_by_ids(self, ids: List[int], offset: int = 0, limit: int = 100, order_by=None,
+                            descending=False) -> List[Dict[str, Any]]:
+        try:
+            patients = Patient.find_many(ids, offset, limit, order_by, descending, self.db_manager)
+            return [item.row_view() for item in patients]
+        except (DatabaseError, ValueError) as e:
+            print(f"Error retrieving patients: {e}")
+            return []
+    
     def get_patient_appointments(self, patient_id: int) -> List[Dict[str, Any]]:
         try:
             patient = Patient.find(patient_id, self.db_manager)
@@ -1,11 +1,17 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+from datetime import datetime, timedelta
+from config.settings import TIME_SLOTS, DATE_FORMAT, TIME_FORMAT, MAX_APPOINTMENTS_PER_DAY, MAX_APPOINTMENTS_PER_DOCTOR
 from database.models import Appointment, MedicalRecord
-from database.db_manager import DatabaseManager, DatabaseError
+from database.session import Session
+from database.db_manager import DatabaseManager, DatabaseError, IntegrityError, BulkResult
+from controllers.stats_controller import StatsController
 from utils.validators import validate_appointment_data
 
 class ScheduleController:
     def __init__(self, db_manager=None):
-        self.db_manager = db_manager or DatabaseManager()
+        self.db_manager = db_manager or DatabaseManager.shared()
+        self.max_appointments_per_day = MAX_APPOINTMENTS_PER_DAY
+        self.max_appointments_per_doctor = MAX_APPOINTMENTS_PER_DOCTOR
     
     def get_all_appointments(self) -> List[Dict[str, Any]]:
         try:
@@ -14,12 +20,24 @@ class ScheduleController:
             print(f"Error retrieving appointments: {e}")
             return []
     
+    def get_appointments_page(self, after=None, limit: int = 100, order_by=None,
+                              descending=False, offset: int = 0) -> List[Dict[str, Any]]:
+        try:
+            return Appointment.page_with_details(after, limit, order_by, descending, self.db_manager, offset)
+        except (DatabaseError, ValueError) as e:
+            print(f"Error retrieving appointments page: {e}")
+            return []
+    
+    def count_all_appointments(self) -> int:
+        try:
+            return Appointment.count_rows(self.db_manager)
+        except DatabaseError as e:
+            print(f"Error counting appointments: {e}")
+            return 0
+    
     def get_appointment(self, appointment_id: int) -> Optional[Dict[str, Any]]:
         try:
-            appointment = Appointment.find(appointment_id, self.db_manager)
-            if not appointment:
-                return None
-            
+            # One joined lookup; a missing appointment simply returns no row
             with self.db_manager as db:
                 query = """
                 SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, 
@@ -40,63 +58,144 @@ class ScheduleController:
             if errors:
                 raise ValueError(f"Invalid appointment data: {errors}")
             
-            if not self._check_time_available(
-                appointment_data.get('MaBS'), 
-                appointment_data.get('NgayKham'), 
-                appointment_data.get('GioKham')
-            ):
-                raise ValueError("The selected time is not available for this doctor")
-
             if 'TrangThai' not in appointment_data:
                 appointment_data['TrangThai'] = 'Chờ khám'
             
-            appointment = Appointment(db_manager=self.db_manager, **appointment_data)
-            return appointment.save()
+            # The quota check and the booking share one write transaction, so
+            # two terminals cannot both take the last place of a day
+            with self.db_manager.transaction():
+                if appointment_data['TrangThai'] != 'Hủy':
+                    self._check_quota(appointment_data.get('MaBS'), appointment_data.get('NgayKham'))
+                
+                appointment_id = Appointment.book_slot(appointment_data, self.db_manager)
+                if appointment_id is None:
+                    raise ValueError("The selected time is not available for this doctor")
+            return True
             
         except (DatabaseError, ValueError) as e:
             print(f"Error adding appointment: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
     
-    def update_appointment(self, appointment_id: int, appointment_data: Dict[str, Any]) -> bool:
-        try:
-            appointment = Appointment.find(appointment_id, self.db_manager)
-            if not appointment:
-                return False
-            
+    def add_appointments(self, rows: Iterable[Dict[str, Any]], chunk_size: int = 500) -> BulkResult:
+        # Counters are read once per day and doctor-day, then advanced locally
+        # for the rows accepted so far in this batch
+        day_counts = {}
+        doctor_counts = {}
+        
+        def validate(appointment_data):
             errors = validate_appointment_data(appointment_data)
             if errors:
-                raise ValueError(f"Invalid appointment data: {errors}")
-            if ('NgayKham' in appointment_data or 'GioKham' in appointment_data) and \
-               (appointment_data.get('NgayKham') != getattr(appointment, 'NgayKham', None) or 
-                appointment_data.get('GioKham') != getattr(appointment, 'GioKham', None)):
-                
-                doctor_id = appointment_data.get('MaBS', getattr(appointment, 'MaBS', None))
-                date = appointment_data.get('NgayKham', getattr(appointment, 'NgayKham', None))
-                time = appointment_data.get('GioKham', getattr(appointment, 'GioKham', None))
-                
-                if not self._check_time_available(doctor_id, date, time, exclude_id=appointment_id):
-                    raise ValueError("The selected time is not available for this doctor")
+                return errors
+            
+            # Rows for a slot that is already taken are rejected by the unique
+            # slot index and reported by insert_many
+            if appointment_data['TrangThai'] == 'Hủy':
+                return None
             
-            for key, value in appointment_data.items():
-                setattr(appointment, key, value)
+            day = appointment_data.get('NgayKham')
+            doctor_day = (appointment_data.get('MaBS'), day)
+            if day not in day_counts or doctor_day not in doctor_counts:
+                counts = Appointment.get_booking_counts(doctor_day[0], day, self.db_manager)
+                day_counts.setdefault(day, counts['SoLichNgay'])
+                doctor_counts.setdefault(doctor_day, counts['SoLichBacSi'])
             
-            return appointment.save()
+            quota_error = self._quota_error(day_counts[day], doctor_counts[doctor_day])
+            if quota_error:
+                return {'NgayKham': quota_error}
+            
+            day_counts[day] += 1
+            doctor_counts[doctor_day] += 1
+            return None
+        
+        def with_defaults(row):
+            row = dict(row)
+            row.setdefault('TrangThai', 'Chờ khám')
+            return Appointment.with_derived_columns(row)
+        
+        try:
+            return self.db_manager.insert_many(
+                Appointment.table_name, (with_defaults(row) for row in rows),
+                columns=('MaBN', 'MaBS', 'NgayKham', 'GioKham', 'LydoKham', 'TrangThai',
+                         'LydoKhamSortKey', 'TrangThaiSortKey'),
+                validate=validate, chunk_size=chunk_size
+            )
+        except DatabaseError as e:
+            print(f"Error adding appointments: {e}")
+            return BulkResult()
+        finally:
+            StatsController.invalidate_cache()
+    
+    def update_appointment(self, appointment_id: int, appointment_data: Dict[str, Any]) -> bool:
+        try:
+            with Session(self.db_manager) as session:
+                appointment = session.get(Appointment, appointment_id)
+                if not appointment:
+                    return False
+                
+                errors = validate_appointment_data(appointment_data)
+                if errors:
+                    raise ValueError(f"Invalid appointment data: {errors}")
+                
+                was_counted = (
+                    getattr(appointment, 'TrangThai', None) != 'Hủy',
+                    getattr(appointment, 'MaBS', None),
+                    getattr(appointment, 'NgayKham', None)
+                )
+                for key, value in appointment_data.items():
+                    setattr(appointment, key, value)
+                is_counted = (
+                    getattr(appointment, 'TrangThai', None) != 'Hủy',
+                    getattr(appointment, 'MaBS', None),
+                    getattr(appointment, 'NgayKham', None)
+                )
+                session.add(appointment)
+                
+                with self.db_manager.transaction():
+                    # Only a move to another doctor or day, or restoring a
+                    # cancelled appointment, takes up a new place
+                    if is_counted[0] and is_counted != was_counted:
+                        new_day = not was_counted[0] or is_counted[2] != was_counted[2]
+                        self._check_quota(is_counted[1], is_counted[2], check_day=new_day)
+                    
+                    try:
+                        session.flush()
+                    except IntegrityError as e:
+                        if e.is_unique_violation:
+                            raise ValueError("The selected time is not available for this doctor")
+                        raise
+            return True
             
         except (DatabaseError, ValueError) as e:
             print(f"Error updating appointment: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
+    
+    def count_appointments(self, start_date: str, end_date: str = None) -> int:
+        try:
+            if end_date is None:
+                end_date = (datetime.strptime(start_date, DATE_FORMAT) + timedelta(days=1)).strftime(DATE_FORMAT)
+            return Appointment.count_between(start_date, end_date, self.db_manager)
+        except (DatabaseError, ValueError) as e:
+            print(f"Error counting appointments: {e}")
+            return 0
     
     def delete_appointment(self, appointment_id: int) -> bool:
         try:
-            appointment = Appointment.find(appointment_id, self.db_manager)
-            if not appointment:
-                return False
-            
-            return appointment.delete()
+            with Session(self.db_manager) as session:
+                appointment = session.get(Appointment, appointment_id)
+                if not appointment:
+                    return False
+                session.delete(appointment)
+            return True
             
         except DatabaseError as e:
             print(f"Error deleting appointment: {e}")
             return False
+        finally:
+            StatsController.invalidate_cache()
     
     def get_appointments_by_date(self, date: str) -> List[Dict[str, Any]]:
         try:
@@ -105,6 +204,32 @@ class ScheduleController:
             print(f"Error retrieving appointments by date: {e}")
             return []
     
+    def get_appointments_in_range(self, start_date: str, end_date: str,
+                                  doctor_id: int = None) -> List[Dict[str, Any]]:
+        try:
+            return Appointment.get_appointments_in_range(start_date, end_date, doctor_id, self.db_manager)
+        except DatabaseError as e:
+            print(f"Error retrieving appointments in range: {e}")
+            return []
+    
+    def get_daily_counts_in_range(self, start_date: str, end_date: str,
+                                  doctor_id: int = None) -> Dict[str, int]:
+        counts = {}
+        for (date, _), count in self.get_slot_counts_in_range(start_date, end_date, doctor_id).items():
+            counts[date] = counts.get(date, 0) + count
+        return counts
+    
+    def get_slot_counts_in_range(self, start_date: str, end_date: str,
+                                 doctor_id: int = None) -> Dict[Tuple[str, str], int]:
+        try:
+            return {
+                (row["NgayKham"], row["GioKham"]): row["SoLich"]
+                for row in Appointment.count_appointments_in_range(start_date, end_date, doctor_id, self.db_manager)
+            }
+        except DatabaseError as e:
+            print(f"Error counting appointments in range: {e}")
+            return {}
+    
     def get_doctor_appointments(self, doctor_id: int) -> List[Dict[str, Any]]:
         try:
             return Appointment.get_appointments_by_doctor(doctor_id, self.db_manager)
@@ -119,21 +244,131 @@ class ScheduleController:
             print(f"Error retrieving patient appointments: {e}")
             return []
     
-    def _check_time_available(self, doctor_id: int, date: str, time: str, exclude_id: int = None) -> bool:
-        try:
-            if exclude_id:
-                with self.db_manager as db:
-                    query = """
-                    SELECT COUNT(*) as count
-                    FROM LichKham
-                    WHERE MaBS = ? AND NgayKham = ? AND GioKham = ? AND MaLichKham != ?
-                    """
-                    result = db.fetch_one(query, (doctor_id, date, time, exclude_id))
-                    return result['count'] == 0
-            else:
-                return Appointment.check_time_available(doctor_id, date, time, self.db_manager)
-        except DatabaseError:
-            return False
+    def find_next_slots(self, specialty: str = None, doctor_id: int = None, from_date: str = None,
+                        n: int = 10, days: int = 90) -> List[Dict[str, Any]]:
+        try:
+            doctors = self._get_schedule_doctors(specialty, doctor_id)
+            if not doctors or n <= 0:
+                return []
+            
+            now = datetime.now()
+            start = datetime.strptime(from_date, DATE_FORMAT) if from_date else now
+            start_date = start.strftime(DATE_FORMAT)
+            end_date = (start + timedelta(days=days)).strftime(DATE_FORMAT)
+            today = now.strftime(DATE_FORMAT)
+            
+            slot_bits = {slot: 1 << index for index, slot in enumerate(TIME_SLOTS)}
+            full_mask = (1 << len(TIME_SLOTS)) - 1
+            past_mask = sum(bit for slot, bit in slot_bits.items() if slot <= now.strftime(TIME_FORMAT))
+            
+            slots = []
+            booked = Appointment.iter_booked_slots(start_date, end_date, self.db_manager)
+            try:
+                pending = next(booked, None)
+                for offset in range(days):
+                    day = (start + timedelta(days=offset)).strftime(DATE_FORMAT)
+                    if day < today:
+                        continue
+                    
+                    # Rows arrive in date order; take the ones for this day
+                    day_booked = {}
+                    day_total = 0
+                    while pending is not None and pending['NgayKham'] <= day:
+                        if pending['NgayKham'] == day:
+                            day_booked[pending['MaBS']] = pending
+                            day_total += pending['SoLich']
+                        pending = next(booked, None)
+                    
+                    day_capacity = self.max_appointments_per_day - day_total
+                    if day_capacity <= 0:
+                        continue
+                    
+                    closed = past_mask if day == today else 0
+                    open_doctors = []
+                    for doctor in doctors:
+                        row = day_booked.get(doctor['MaBS'])
+                        count = row['SoLich'] if row else 0
+                        if count >= self.max_appointments_per_doctor:
+                            continue
+                        
+                        # Each doctor-day is a bitmask over TIME_SLOTS; the
+                        # booked times are only decoded for doctors with room left
+                        mask = closed
+                        if row:
+                            # group_concat skips NULL times and gives NULL when all are
+                            for slot in (row['GioDaDat'] or '').split(','):
+                                mask |= slot_bits.get(slot, 0)
+                        free = full_mask & ~mask
+                        if free:
+                            open_doctors.append([doctor, free, self.max_appointments_per_doctor - count])
+                    
+                    # Earliest time first, across doctors. The suggestions for a
+                    # day never exceed what the daily and per-doctor limits
+                    # still allow, so all of them can be booked together.
+                    for index, slot in enumerate(TIME_SLOTS):
+                        bit = 1 << index
+                        for entry in open_doctors:
+                            doctor, free, capacity = entry
+                            if not free & bit or capacity <= 0:
+                                continue
+                            
+                            slots.append({
+                                'MaBS': doctor['MaBS'],
+                                'TenBacSi': doctor['TenBacSi'],
+                                'ChuyenKhoa': doctor['ChuyenKhoa'],
+                                'NgayKham': day,
+                                'GioKham': slot
+                            })
+                            if len(slots) >= n:
+                                return slots
+                            
+                            entry[2] -= 1
+                            day_capacity -= 1
+                            if day_capacity <= 0:
+                                break
+                        if day_capacity <= 0:
+                            break
+            finally:
+                booked.close()
+            
+            return slots
+        except (DatabaseError, ValueError) as e:
+            print(f"Error finding available slots: {e}")
+            return []
+    
+    def _quota_error(self, day_count: int, doctor_count: int) -> Optional[str]:
+        if day_count >= self.max_appointments_per_day:
+            return "The clinic is fully booked on this date"
+        if doctor_count >= self.max_appointments_per_doctor:
+            return "This doctor has no more appointments available on this date"
+        return None
+    
+    def _check_quota(self, doctor_id: int, date: str, check_day: bool = True):
+        counts = Appointment.get_booking_counts(doctor_id, date, self.db_manager)
+        day_count = counts['SoLichNgay'] if check_day else 0
+        quota_error = self._quota_error(day_count, counts['SoLichBacSi'])
+        if quota_error:
+            raise ValueError(quota_error)
+    
+    def _get_schedule_doctors(self, specialty: str = None, doctor_id: int = None) -> List[Dict[str, Any]]:
+        conditions = []
+        params = []
+        if doctor_id:
+            conditions.append("MaBS = ?")
+            params.append(doctor_id)
+        if specialty:
+            conditions.append("ChuyenKhoa = ?")
+            params.append(specialty)
+        
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        with self.db_manager as db:
+            query = f"""
+            SELECT MaBS, Ho || ' ' || Ten AS TenBacSi, ChuyenKhoa
+            FROM BacSi
+            {where}
+            ORDER BY MaBS
+            """
+            return db.fetch_all(query, tuple(params))
     
     def create_medical_record(self, appointment_id: int, diagnosis: str) -> bool:
         try:
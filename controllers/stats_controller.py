@@ -0,0 +1,238 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from config.settings import DATE_FORMAT
+from database.db_manager import DatabaseManager, DatabaseError
+
+
+# Trigger-maintained summary tables and the query that recomputes each one
+# from the source tables. Rows with a zero count are left behind by the
+# triggers and are ignored when verifying.
+SUMMARY_TABLES = {
+    "SoBanGhi": (
+        ("Bang",), "SoLuong",
+        """
+        SELECT Bang, SoLuong FROM (
+            SELECT 'BenhNhan' AS Bang, COUNT(*) AS SoLuong FROM BenhNhan
+            UNION ALL
+            SELECT 'BacSi', COUNT(*) FROM BacSi
+        ) WHERE SoLuong > 0
+        """
+    ),
+    "SoLichTheoNgay": (
+        ("NgayKham",), "SoLich",
+        """
+        SELECT NgayKham, COUNT(*) FROM LichKham
+        WHERE TrangThai != 'Hủy' AND NgayKham IS NOT NULL
+        GROUP BY NgayKham
+        """
+    ),
+    "SoLichTheoBacSi": (
+        ("MaBS", "NgayKham"), "SoLich",
+        """
+        SELECT MaBS, NgayKham, COUNT(*) FROM LichKham
+        WHERE TrangThai != 'Hủy' AND NgayKham IS NOT NULL AND MaBS IS NOT NULL
+        GROUP BY MaBS, NgayKham
+        """
+    ),
+    "ThongKeLichKhamNgay": (
+        ("NgayKham", "MaBS", "TrangThai"), "SoLich",
+        """
+        SELECT NgayKham, MaBS, IFNULL(TrangThai, ''), COUNT(*) FROM LichKham
+        WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+        GROUP BY NgayKham, MaBS, IFNULL(TrangThai, '')
+        """
+    ),
+    "ThongKeLichKhamThang": (
+        ("Thang", "MaBS", "TrangThai"), "SoLich",
+        """
+        SELECT substr(NgayKham, 1, 7), MaBS, IFNULL(TrangThai, ''), COUNT(*) FROM LichKham
+        WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+        GROUP BY substr(NgayKham, 1, 7), MaBS, IFNULL(TrangThai, '')
+        """
+    ),
+    "ThongKeHoSoThang": (
+        ("Thang", "MaBS"), "SoHoSo",
+        """
+        SELECT substr(NgayKham, 1, 7), MaBS, COUNT(*) FROM HoSoBenhAn
+        WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+        GROUP BY substr(NgayKham, 1, 7), MaBS
+        """
+    ),
+}
+
+
+class StatsController:
+
+    # Every figure is read from the trigger-maintained counters, so the
+    # dashboard costs the same at any table size. Dashboards that refresh
+    # often can also share results for cache_ttl seconds (off by default);
+    # the patient, doctor and schedule controllers clear it on every write.
+    _stats_cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, db_manager=None, cache_ttl: float = 0):
+        self.db_manager = db_manager or DatabaseManager.shared()
+        self.cache_ttl = cache_ttl
+
+    @classmethod
+    def invalidate_cache(cls):
+        with cls._cache_lock:
+            cls._stats_cache.clear()
+
+    def _cached_stats(self, key) -> Optional[Dict[str, Any]]:
+        if self.cache_ttl <= 0:
+            return None
+        with self._cache_lock:
+            entry = self._stats_cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store_stats(self, key, stats: Dict[str, Any]):
+        if self.cache_ttl <= 0:
+            return
+        with self._cache_lock:
+            self._stats_cache[key] = (time.monotonic() + self.cache_ttl, stats)
+
+    def get_dashboard_stats(self, today: str = None, days: int = 7) -> Dict[str, Any]:
+        today = today or datetime.now().strftime(DATE_FORMAT)
+        end_date = (datetime.strptime(today, DATE_FORMAT) + timedelta(days=days)).strftime(DATE_FORMAT)
+        key = (self.db_manager.db_file, today, days)
+        cached = self._cached_stats(key)
+        if cached is not None:
+            return dict(cached, week_by_day=dict(cached['week_by_day']))
+
+        # Everything the dashboard shows in one round-trip. Appointments are
+        # counted whatever their status, as the dashboard always has; the
+        # rows are a range over the ThongKeLichKhamNgay primary key.
+        query = """
+        SELECT 'appointments' AS Loai, NgayKham AS Khoa, SUM(SoLich) AS SoLuong
+        FROM ThongKeLichKhamNgay
+        WHERE NgayKham >= ? AND NgayKham < ?
+        GROUP BY NgayKham
+        UNION ALL
+        SELECT 'totals', Bang, SoLuong FROM SoBanGhi
+        """
+
+        stats = {
+            'doctor_count': 0,
+            'patient_count': 0,
+            'today_count': 0,
+            'week_count': 0,
+            'week_by_day': {}
+        }
+        try:
+            with self.db_manager as db:
+                rows = db.fetch_all(query, (today, end_date))
+        except DatabaseError as e:
+            print(f"Error retrieving dashboard statistics: {e}")
+            return stats
+
+        for row in rows:
+            if row['Loai'] == 'appointments':
+                if row['SoLuong']:
+                    stats['week_by_day'][row['Khoa']] = row['SoLuong']
+            elif row['Khoa'] == 'BacSi':
+                stats['doctor_count'] = row['SoLuong']
+            elif row['Khoa'] == 'BenhNhan':
+                stats['patient_count'] = row['SoLuong']
+        stats['today_count'] = stats['week_by_day'].get(today, 0)
+        stats['week_count'] = sum(stats['week_by_day'].values())
+        self._store_stats(key, stats)
+        return stats
+
+    def get_daily_appointment_counts(self, start_date: str, end_date: str,
+                                     doctor_id: int = None) -> List[Dict[str, Any]]:
+        query = """
+        SELECT NgayKham, MaBS, TrangThai, SoLich FROM ThongKeLichKhamNgay
+        WHERE NgayKham >= ? AND NgayKham <= ? AND SoLich > 0
+        """
+        params = [start_date, end_date]
+        if doctor_id is not None:
+            query += " AND MaBS = ?"
+            params.append(doctor_id)
+        query += " ORDER BY NgayKham, MaBS, TrangThai"
+
+        try:
+            with self.db_manager as db:
+                return db.fetch_all(query, tuple(params))
+        except DatabaseError as e:
+            print(f"Error retrieving daily appointment counts: {e}")
+            return []
+
+    def get_monthly_utilization(self, start_month: str, end_month: str,
+                                by_specialty: bool = False) -> List[Dict[str, Any]]:
+        # Months are 'YYYY-MM'; one row per month, doctor (or specialty) and status
+        if by_specialty:
+            query = """
+            SELECT t.Thang, bs.ChuyenKhoa, t.TrangThai, SUM(t.SoLich) AS SoLich
+            FROM ThongKeLichKhamThang t
+            JOIN BacSi bs ON bs.MaBS = t.MaBS
+            WHERE t.Thang >= ? AND t.Thang <= ? AND t.SoLich > 0
+            GROUP BY t.Thang, bs.ChuyenKhoa, t.TrangThai
+            ORDER BY t.Thang, bs.ChuyenKhoa, t.TrangThai
+            """
+        else:
+            query = """
+            SELECT t.Thang, t.MaBS, bs.Ho || ' ' || bs.Ten AS TenBacSi, t.TrangThai, t.SoLich
+            FROM ThongKeLichKhamThang t
+            LEFT JOIN BacSi bs ON bs.MaBS = t.MaBS
+            WHERE t.Thang >= ? AND t.Thang <= ? AND t.SoLich > 0
+            ORDER BY t.Thang, t.MaBS, t.TrangThai
+            """
+
+        try:
+            with self.db_manager as db:
+                return db.fetch_all(query, (start_month, end_month))
+        except DatabaseError as e:
+            print(f"Error retrieving monthly utilization: {e}")
+            return []
+
+    def get_records_by_specialty(self, start_month: str, end_month: str) -> List[Dict[str, Any]]:
+        query = """
+        SELECT t.Thang, bs.ChuyenKhoa, SUM(t.SoHoSo) AS SoHoSo
+        FROM ThongKeHoSoThang t
+        JOIN BacSi bs ON bs.MaBS = t.MaBS
+        WHERE t.Thang >= ? AND t.Thang <= ? AND t.SoHoSo > 0
+        GROUP BY t.Thang, bs.ChuyenKhoa
+        ORDER BY t.Thang, bs.ChuyenKhoa
+        """
+        try:
+            with self.db_manager as db:
+                return db.fetch_all(query, (start_month, end_month))
+        except DatabaseError as e:
+            print(f"Error retrieving records by specialty: {e}")
+            return []
+
+    def rebuild_summaries(self, tables=None) -> Dict[str, int]:
+        tables = tables or list(SUMMARY_TABLES)
+        rebuilt = {}
+        with self.db_manager.transaction() as db:
+            for table in tables:
+                keys, count_column, source = SUMMARY_TABLES[table]
+                columns = ", ".join(keys + (count_column,))
+                db.execute(f"DELETE FROM {table}")
+                cursor = db.execute(f"INSERT INTO {table} ({columns}) {source}")
+                rebuilt[table] = cursor.rowcount
+        return rebuilt
+
+    def verify_summaries(self, tables=None) -> Dict[str, int]:
+        # Number of rows that differ from a recount, per table; all zeros
+        # means the triggers kept every summary exact
+        tables = tables or list(SUMMARY_TABLES)
+        mismatches = {}
+        with self.db_manager as db:
+            for table in tables:
+                keys, count_column, source = SUMMARY_TABLES[table]
+                columns = ", ".join(keys + (count_column,))
+                stored = f"SELECT {columns} FROM {table} WHERE {count_column} != 0"
+                row = db.fetch_one(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM ({stored} EXCEPT {source})) +
+                    (SELECT COUNT(*) FROM ({source} EXCEPT {stored})) AS SoLech
+                """)
+                mismatches[table] = row['SoLech']
+        return mismatches
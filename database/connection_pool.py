@@ -0,0 +1,92 @@
+import sqlite3
+import threading
+import queue
+from typing import Callable, Optional
+
+
+class ConnectionPool:
+
+    def __init__(self, db_file: str, readers: int = 4, timeout: float = 30.0,
+                 configure: Optional[Callable[[sqlite3.Connection], None]] = None):
+        self.db_file = db_file
+        self.max_readers = max(0, readers)
+        self.timeout = timeout
+        self._configure = configure
+
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._idle_readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(self.max_readers) if self.max_readers else None
+        self._all_readers = []
+        self._lock = threading.Lock()
+
+    def _open(self, read_only: bool = False) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_file, timeout=self.timeout, check_same_thread=False)
+        if self._configure:
+            self._configure(connection)
+        if read_only:
+            connection.execute("PRAGMA query_only = ON")
+        return connection
+
+    def acquire_writer(self) -> sqlite3.Connection:
+        if not self._writer_lock.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Timed out waiting for the database writer")
+
+        try:
+            if self._writer is None:
+                self._writer = self._open()
+                # WAL lets the reader connections keep working while the writer commits
+                self._writer.execute("PRAGMA journal_mode = WAL")
+                self._writer.execute("PRAGMA synchronous = NORMAL")
+            return self._writer
+        except sqlite3.Error:
+            self._writer_lock.release()
+            raise
+
+    def release_writer(self):
+        if self._writer is not None and self._writer.in_transaction:
+            self._writer.rollback()
+        self._writer_lock.release()
+
+    def acquire_reader(self) -> sqlite3.Connection:
+        if not self._reader_slots:
+            raise sqlite3.OperationalError("Connection pool has no reader connections")
+
+        if not self._reader_slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError("Timed out waiting for a database reader")
+
+        try:
+            return self._idle_readers.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            connection = self._open(read_only=True)
+        except sqlite3.Error:
+            self._reader_slots.release()
+            raise
+
+        with self._lock:
+            self._all_readers.append(connection)
+        return connection
+
+    def release_reader(self, connection: sqlite3.Connection):
+        with self._lock:
+            pooled = connection in self._all_readers
+
+        if pooled:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle_readers.put(connection)
+        self._reader_slots.release()
+
+    def close(self):
+        with self._lock:
+            readers, self._all_readers = self._all_readers, []
+        for connection in readers:
+            connection.close()
+        self._idle_readers = queue.LifoQueue()
+
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
@@ -1,83 +1,356 @@
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional, Tuple, Union
+import threading
+from typing import List, Dict, Any, Optional, Tuple, Union, Iterator, Iterable, Sequence, Callable
+from itertools import islice
+from contextlib import contextmanager
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
 
+from .connection_pool import ConnectionPool
+from .schema import SchemaCatalog, TableSchema
+from utils.helpers import build_search_key
+
 class DatabaseManager:
     
-    def __init__(self, db_file: str = None):
+    _shared_instances = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, db_file: str = None, persistent: bool = False, readers: int = None):
         load_dotenv()
         
         self.db_file = db_file or os.getenv('DB_FILE', 'qlchamsocsk.db')
-        self._connection = None
+        self.persistent = persistent
+        self.readers = readers if readers is not None else int(os.getenv('DB_POOL_READERS', '4'))
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self.schema = SchemaCatalog.for_database(self.db_file)
+        # UPDATE text per (table, columns, condition); identical text lets
+        # sqlite3 reuse its prepared statement for that column set
+        self._update_statements = {}
+    
+    @classmethod
+    def shared(cls, db_file: str = None) -> 'DatabaseManager':
+        manager = cls._shared_instances.get(db_file)
+        if manager is None:
+            with cls._shared_lock:
+                manager = cls._shared_instances.get(db_file)
+                if manager is None:
+                    manager = cls(db_file, persistent=True)
+                    cls._shared_instances[db_file] = manager
+        return manager
         
     def __enter__(self):
-        self.connect()
+        if not self.persistent and not getattr(self._local, 'connection', None):
+            self.connect()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        self._local.depth = max(0, getattr(self._local, 'depth', 0) - 1)
+        if self._local.depth > 0:
+            return
+        
+        if self.persistent:
+            self._release()
+        else:
+            self.close()
+    
+    @staticmethod
+    def _configure_connection(connection: sqlite3.Connection):
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        # Only used by the backfill in migration 20261018100000; SearchKey is
+        # written by the application and the triggers no longer call it
+        connection.create_function("search_key", 1, build_search_key, deterministic=True)
+    
+    def _get_pool(self) -> ConnectionPool:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ConnectionPool(
+                        self.db_file,
+                        readers=self.readers,
+                        configure=self._configure_connection
+                    )
+        return self._pool
         
     def connect(self):
         try:
-            self._connection = sqlite3.connect(self.db_file)
-            self._connection.row_factory = sqlite3.Row  
-
-            self._connection.execute("PRAGMA foreign_keys = ON")
+            if self.persistent:
+                return self._writer()
+            
+            connection = sqlite3.connect(self.db_file)
+            self._configure_connection(connection)
+            self._local.connection = connection
             
-            return self._connection
+            return connection
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to connect to database: {e}")
+    
+    def _writer(self) -> sqlite3.Connection:
+        writer = getattr(self._local, 'writer', None)
+        if writer is None:
+            writer = self._get_pool().acquire_writer()
+            self._local.writer = writer
+        return writer
+    
+    def _reader(self) -> sqlite3.Connection:
+        if not self.persistent:
+            return self.connection
+        
+        # A thread that already holds the writer must keep reading through it
+        # so that it sees its own uncommitted changes.
+        writer = getattr(self._local, 'writer', None)
+        if writer is not None:
+            return writer
+        
+        pool = self._get_pool()
+        if not pool.max_readers:
+            return self._writer()
+        
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            try:
+                reader = pool.acquire_reader()
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to connect to database: {e}")
+            self._local.reader = reader
+        return reader
+    
+    def _release(self):
+        pool = self._pool
+        reader = getattr(self._local, 'reader', None)
+        writer = getattr(self._local, 'writer', None)
+        self._local.reader = None
+        self._local.writer = None
+        
+        if pool is None:
+            return
+        if reader is not None:
+            pool.release_reader(reader)
+        if writer is not None:
+            pool.release_writer()
+    
+    def _release_if_idle(self):
+        if self.persistent and not getattr(self._local, 'depth', 0):
+            self._release()
             
     def close(self):
-        if self._connection:
-            self._connection.close()
-            self._connection = None
+        if self.persistent:
+            self._release()
+            with self._pool_lock:
+                pool, self._pool = self._pool, None
+            if pool is not None:
+                pool.close()
+            return
+        
+        connection = getattr(self._local, 'connection', None)
+        if connection:
+            connection.close()
+            self._local.connection = None
             
     @property
     def connection(self):
-        if not self._connection:
-            self.connect()
-        return self._connection
+        if self.persistent:
+            try:
+                return self._writer()
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to connect to database: {e}")
+        
+        connection = getattr(self._local, 'connection', None)
+        if not connection:
+            connection = self.connect()
+        return connection
+    
+    @property
+    def in_transaction(self) -> bool:
+        return getattr(self._local, 'tx_depth', 0) > 0
+    
+    def _rollback_on_error(self, connection: sqlite3.Connection):
+        # Inside a transaction scope the scope itself decides how far to roll back
+        if not self.in_transaction:
+            connection.rollback()
+            self._release_if_idle()
     
     def execute(self, query: str, params: tuple = None) -> sqlite3.Cursor:
+        connection = self.connection
         try:
-            return self.connection.execute(query, params or ())
+            return connection.execute(query, params or ())
+        except sqlite3.IntegrityError as e:
+            self._rollback_on_error(connection)
+            raise IntegrityError(f"Query execution failed: {e}")
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback_on_error(connection)
             raise DatabaseError(f"Query execution failed: {e}")
             
     def executemany(self, query: str, params_list: List[tuple]) -> sqlite3.Cursor:
+        connection = self.connection
         try:
-            return self.connection.executemany(query, params_list)
+            return connection.executemany(query, params_list)
+        except sqlite3.IntegrityError as e:
+            self._rollback_on_error(connection)
+            raise IntegrityError(f"Multiple query execution failed: {e}")
         except sqlite3.Error as e:
-            self.connection.rollback()
+            self._rollback_on_error(connection)
             raise DatabaseError(f"Multiple query execution failed: {e}")
             
     def commit(self):
+        if self.in_transaction:
+            return
+        
+        connection = self.connection
         try:
-            self.connection.commit()
+            connection.commit()
         except sqlite3.Error as e:
-            self.connection.rollback()
+            connection.rollback()
             raise DatabaseError(f"Failed to commit transaction: {e}")
+        finally:
+            self._release_if_idle()
+    
+    @contextmanager
+    def transaction(self) -> Iterator['DatabaseManager']:
+        with self:
+            connection = self.connection
+            depth = getattr(self._local, 'tx_depth', 0)
+            savepoint = f"sp_{depth}" if depth else None
+            
+            try:
+                if savepoint:
+                    connection.execute(f"SAVEPOINT {savepoint}")
+                elif not connection.in_transaction:
+                    connection.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Failed to begin transaction: {e}")
+            
+            self._local.tx_depth = depth + 1
+            try:
+                yield self
+            except BaseException:
+                self._local.tx_depth = depth
+                try:
+                    if savepoint:
+                        connection.execute(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                        connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+                    else:
+                        connection.rollback()
+                except sqlite3.Error:
+                    pass
+                raise
+            
+            self._local.tx_depth = depth
+            if savepoint:
+                try:
+                    connection.execute(f"RELEASE SAVEPOINT {savepoint}")
+                except sqlite3.Error as e:
+                    raise DatabaseError(f"Failed to release savepoint: {e}")
+            else:
+                self.commit()
+    
+    def _execute_read(self, query: str, params: tuple = None) -> sqlite3.Cursor:
+        connection = self._reader()
+        try:
+            return connection.execute(query, params or ())
+        except sqlite3.Error as e:
+            if connection.in_transaction:
+                connection.rollback()
+            self._release_if_idle()
+            raise DatabaseError(f"Query execution failed: {e}")
             
     def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
-        cursor = self.execute(query, params)
+        cursor = self._execute_read(query, params)
         row = cursor.fetchone()
+        cursor.close()
+        self._release_if_idle()
         return dict(row) if row else None
         
     def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        cursor = self.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        cursor = self._execute_read(query, params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        self._release_if_idle()
+        return rows
+
+    def fetch_rows(self, query: str, params: tuple = None) -> Tuple[Tuple[str, ...], List[tuple]]:
+        # Column names once and plain tuples per row, for callers that keep
+        # many rows and do not need a dict for each
+        cursor = self._execute_read(query, params)
+        cursor.row_factory = None
+        rows = cursor.fetchall()
+        columns = tuple(column[0] for column in cursor.description)
+        cursor.close()
+        self._release_if_idle()
+        return columns, rows
+
+    def get_table_schema(self, table: str) -> Optional[TableSchema]:
+        schema = self.schema.get(table)
+        if schema is not None:
+            return schema
+        
+        try:
+            return self.schema.table(self._reader(), table)
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to load schema for {table}: {e}")
+        finally:
+            self._release_if_idle()
+    
+    def invalidate_schema(self):
+        self.schema.invalidate()
+        
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = 500) -> Iterator[sqlite3.Row]:
+        # The generator can be read slowly, left unfinished or resumed after
+        # other work on this thread, so it does not take part in the
+        # thread's connection scope; it checks out a connection of its own
+        # and gives back exactly that one when it ends or is closed.
+        connection, release = self._checkout_reader()
+        try:
+            try:
+                cursor = connection.execute(query, params or ())
+            except sqlite3.Error as e:
+                raise DatabaseError(f"Query execution failed: {e}")
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+        finally:
+            release()
+    
+    def _checkout_reader(self) -> Tuple[sqlite3.Connection, Callable[[], None]]:
+        # Inside a transaction, or while this thread holds the writer, reads
+        # must see the uncommitted changes, and the enclosing scope releases
+        # the connection
+        if self.in_transaction:
+            return self.connection, lambda: None
+        if self.persistent and getattr(self._local, 'writer', None) is not None:
+            return self._local.writer, lambda: None
+        
+        try:
+            pool = self._get_pool() if self.persistent else None
+            if pool is not None and pool.max_readers:
+                reader = pool.acquire_reader()
+                return reader, lambda: pool.release_reader(reader)
+            # Holding the pool's only writer would block this thread's own
+            # writes until the generator is done, so a plain connection is
+            # used; only the generator touches it, from whichever thread
+            connection = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._configure_connection(connection)
+            return connection, connection.close
+        except sqlite3.Error as e:
+            raise DatabaseError(f"Failed to connect to database: {e}")
         
     def insert(self, table: str, data: Dict[str, Any]) -> int:
-        has_timestamps = self._table_has_column(table, 'created_at') and self._table_has_column(table, 'updated_at')
+        schema = self.get_table_schema(table)
         
-        if has_timestamps:
+        if schema and schema.has_timestamps:
             now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            data['created_at'] = now
+            # A supplied creation time, e.g. of a migrated record, is kept
+            if not data.get('created_at'):
+                data['created_at'] = now
             data['updated_at'] = now
         
         columns = ', '.join(data.keys())
@@ -88,11 +361,17 @@ class DatabaseManager:
         return cursor.lastrowid
         
     def update(self, table: str, data: Dict[str, Any], condition: str, params: tuple) -> int:
-        if self._table_has_column(table, 'updated_at'):
+        schema = self.get_table_schema(table)
+        
+        if schema and schema.has_updated_at:
             data['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        set_clause = ', '.join([f"{column} = ?" for column in data.keys()])
-        query = f"UPDATE {table} SET {set_clause} WHERE {condition}"
+        key = (table, tuple(data), condition)
+        query = self._update_statements.get(key)
+        if query is None:
+            set_clause = ', '.join([f"{column} = ?" for column in data.keys()])
+            query = f"UPDATE {table} SET {set_clause} WHERE {condition}"
+            self._update_statements[key] = query
         cursor = self.execute(query, tuple(data.values()) + params)
         self.commit()
         return cursor.rowcount
@@ -103,13 +382,109 @@ class DatabaseManager:
         self.commit()
         return cursor.rowcount
     
+    def insert_many(self, table: str, rows: Iterable[Dict[str, Any]], columns: Sequence[str] = None,
+                    validate: Callable[[Dict[str, Any]], Any] = None, chunk_size: int = 1000,
+                    progress: Callable[['BulkResult'], None] = None) -> 'BulkResult':
+        return self._write_many(table, rows, columns, validate, chunk_size, progress)
+    
+    def upsert_many(self, table: str, rows: Iterable[Dict[str, Any]], conflict_columns: Sequence[str],
+                    update_columns: Sequence[str] = None, columns: Sequence[str] = None,
+                    validate: Callable[[Dict[str, Any]], Any] = None, chunk_size: int = 1000,
+                    progress: Callable[['BulkResult'], None] = None) -> 'BulkResult':
+        return self._write_many(table, rows, columns, validate, chunk_size, progress,
+                                conflict_columns=conflict_columns, update_columns=update_columns)
+    
+    def _build_bulk_query(self, table: str, columns: Sequence[str], conflict_columns: Sequence[str] = None,
+                          update_columns: Sequence[str] = None) -> str:
+        query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+        
+        if conflict_columns is None:
+            return query
+        
+        if update_columns is None:
+            update_columns = [c for c in columns if c not in conflict_columns and c != 'created_at']
+        
+        conflict = f" ON CONFLICT ({', '.join(conflict_columns)})"
+        if not update_columns:
+            return query + conflict + " DO NOTHING"
+        
+        assignments = ', '.join(f"{c} = excluded.{c}" for c in update_columns)
+        return query + conflict + f" DO UPDATE SET {assignments}"
+    
+    def _write_many(self, table: str, rows: Iterable[Dict[str, Any]], columns: Sequence[str],
+                    validate: Callable[[Dict[str, Any]], Any], chunk_size: int,
+                    progress: Callable[['BulkResult'], None] = None, conflict_columns: Sequence[str] = None,
+                    update_columns: Sequence[str] = None) -> 'BulkResult':
+        result = BulkResult()
+        rows = iter(enumerate(rows))
+        query = None
+        stamped = ()
+        
+        with self:
+            schema = self.get_table_schema(table)
+            
+            while True:
+                chunk = list(islice(rows, chunk_size))
+                if not chunk:
+                    break
+                
+                if query is None:
+                    columns = list(columns or dict.fromkeys(key for _, row in chunk for key in row))
+                    known = set(columns)
+                    if schema and schema.has_timestamps:
+                        stamped = [c for c in ('created_at', 'updated_at') if c not in columns]
+                    query = self._build_bulk_query(table, columns + stamped, conflict_columns, update_columns)
+                
+                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                batch = []
+                for index, row in chunk:
+                    errors = validate(row) if validate else None
+                    if not errors and not known.issuperset(row):
+                        errors = f"Unexpected columns: {', '.join(sorted(set(row) - known))}"
+                    if errors:
+                        result.errors.append((index, errors))
+                        continue
+                    batch.append((index, tuple(row.get(c) for c in columns) + (now,) * len(stamped)))
+                
+                if batch:
+                    self._write_chunk(query, batch, result)
+                result.processed += len(chunk)
+                
+                if progress:
+                    progress(result)
+        
+        return result
+    
+    def _write_chunk(self, query: str, batch: List[Tuple[int, tuple]], result: 'BulkResult'):
+        try:
+            with self.transaction():
+                cursor = self.executemany(query, [params for _, params in batch])
+                result.written += cursor.rowcount
+                result.skipped += len(batch) - cursor.rowcount
+            return
+        except DatabaseError:
+            pass
+        
+        # One bad row fails the whole executemany; replay the chunk row by row
+        # so that only the offending rows are reported and the rest are kept.
+        with self.transaction():
+            connection = self.connection
+            for index, params in batch:
+                try:
+                    with self.transaction():
+                        changed = connection.execute(query, params).rowcount
+                except (sqlite3.Error, DatabaseError) as e:
+                    result.errors.append((index, str(e)))
+                    continue
+                result.written += changed
+                result.skipped += 1 - changed
+    
     def _table_has_column(self, table: str, column: str) -> bool:
         try:
-            cursor = self.execute(f"PRAGMA table_info({table})")
-            columns = [row['name'] for row in cursor.fetchall()]
-            return column in columns
-        except sqlite3.Error:
+            schema = self.get_table_schema(table)
+        except DatabaseError:
             return False
+        return schema is not None and schema.has_column(column)
     
     def backup(self, backup_file: str = None) -> str:
         if not backup_file:
@@ -119,7 +494,7 @@ class DatabaseManager:
         try:
             backup_conn = sqlite3.connect(backup_file)
             with backup_conn:
-                self.connection.backup(backup_conn)
+                self._reader().backup(backup_conn)
 
             backup_conn.close()
             
@@ -127,6 +502,8 @@ class DatabaseManager:
             
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to backup database: {e}")
+        finally:
+            self._release_if_idle()
     
     def restore(self, backup_file: str) -> bool:
         if not Path(backup_file).exists():
@@ -145,15 +522,40 @@ class DatabaseManager:
             
         except sqlite3.Error as e:
             raise DatabaseError(f"Failed to restore database: {e}")
+        finally:
+            self._release_if_idle()
     
     def execute_script(self, script: str) -> bool:
         try:
             self.connection.executescript(script)
+            self.invalidate_schema()
             self.commit()
             return True
         except sqlite3.Error as e:
             self.connection.rollback()
             raise DatabaseError(f"Failed to execute script: {e}")
 
+class BulkResult:
+    
+    def __init__(self):
+        self.processed = 0
+        self.written = 0
+        self.skipped = 0
+        self.errors = []
+    
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+    
+    def __repr__(self):
+        return (f"BulkResult(processed={self.processed}, written={self.written}, "
+                f"skipped={self.skipped}, failed={self.failed})")
+
 class DatabaseError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class IntegrityError(DatabaseError):
+    
+    @property
+    def is_unique_violation(self) -> bool:
+        return 'UNIQUE constraint failed' in str(self)
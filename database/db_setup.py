@@ -8,6 +8,7 @@ import json
 from datetime import datetime
 
 from .db_manager import DatabaseManager
+from .models import Patient, Doctor, Appointment
 from utils.helpers import generate_password_hash
 
 class DatabaseSetup:
@@ -22,6 +23,7 @@ class DatabaseSetup:
         self.initialize_migrations_table()
         self.create_base_tables()  # Tạo bảng cơ sở trước
         self.run_migrations()      # Sau đó mới áp dụng migrations
+        self.backfill_derived_columns()
         self.initialize_admin_account()
     
     def initialize_migrations_table(self):
@@ -62,14 +64,18 @@ class DatabaseSetup:
         
         with self.db_manager as db:
             try:
-                db.execute(sql)
-                
+                # Migrations hold several statements; the explicit BEGIN keeps the
+                # whole file and its migrations row in a single transaction
+                db.connection.executescript(f"BEGIN;\n{sql}\n;")
+
                 db.execute('INSERT INTO migrations (migration_name) VALUES (?)', (migration_file,))
                 db.commit()
             except Exception as e:
                 db.connection.rollback()
                 print(f"Error applying migration {migration_file}: {e}")
                 raise
+            finally:
+                db.invalidate_schema()
     
     def create_base_tables(self):
         with self.db_manager as db:
@@ -178,6 +184,42 @@ class DatabaseSetup:
             ''')
             
             db.commit()
+            db.invalidate_schema()
+    
+    def backfill_derived_columns(self):
+        # SearchKey and the sort keys are computed by the application, so rows
+        # another tool wrote without them are filled in here
+        with self.db_manager as db:
+            for model in (Patient, Doctor, Appointment):
+                schema = db.get_table_schema(model.table_name)
+                if not schema:
+                    continue
+                derived = {f"{column}SortKey": (column,) for column in model.sort_key_columns}
+                if model.search_key_columns:
+                    derived['SearchKey'] = model.search_key_columns
+                derived = {key: sources for key, sources in derived.items() if schema.has_column(key)}
+                if not derived:
+                    continue
+                
+                sources = list(dict.fromkeys(column for columns in derived.values() for column in columns))
+                missing = " OR ".join(
+                    f"({key} IS NULL AND {' AND '.join(f'{c} IS NOT NULL' for c in columns)})"
+                    for key, columns in derived.items()
+                )
+                rows = db.fetch_all(
+                    f"SELECT {model.primary_key}, {', '.join(sources)} FROM {model.table_name} WHERE {missing}"
+                )
+                keys = list(derived)
+                updates = []
+                for row in rows:
+                    values = model.with_derived_columns({column: row[column] for column in sources})
+                    updates.append(tuple(values[key] for key in keys) + (row[model.primary_key],))
+                if updates:
+                    assignments = ", ".join(f"{key} = ?" for key in keys)
+                    db.executemany(
+                        f"UPDATE {model.table_name} SET {assignments} WHERE {model.primary_key} = ?", updates
+                    )
+                    db.commit()
     
     def initialize_admin_account(self):
         with self.db_manager as db:
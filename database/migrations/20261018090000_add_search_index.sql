@@ -0,0 +1,64 @@
+-- Migration: add_search_index
+-- Created at: 2026-10-18 09:00:00
+
+-- Full-text indexes for the patient and doctor search boxes. Both are
+-- external-content tables: the text lives in BenhNhan/BacSi and the
+-- triggers below keep the index in step with every insert, update and delete.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS BenhNhan_fts USING fts5(
+    Ho, Ten, CMND, Quequan,
+    content='BenhNhan',
+    content_rowid='MaBN',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3 4 5 6'
+);
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_fts_insert AFTER INSERT ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (rowid, Ho, Ten, CMND, Quequan)
+    VALUES (new.MaBN, new.Ho, new.Ten, new.CMND, new.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_fts_delete AFTER DELETE ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, Ho, Ten, CMND, Quequan)
+    VALUES ('delete', old.MaBN, old.Ho, old.Ten, old.CMND, old.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_fts_update AFTER UPDATE OF Ho, Ten, CMND, Quequan ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, Ho, Ten, CMND, Quequan)
+    VALUES ('delete', old.MaBN, old.Ho, old.Ten, old.CMND, old.Quequan);
+    INSERT INTO BenhNhan_fts (rowid, Ho, Ten, CMND, Quequan)
+    VALUES (new.MaBN, new.Ho, new.Ten, new.CMND, new.Quequan);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS BacSi_fts USING fts5(
+    Ho, Ten, CMND, ChuyenKhoa,
+    content='BacSi',
+    content_rowid='MaBS',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3 4 5 6'
+);
+
+CREATE TRIGGER IF NOT EXISTS BacSi_fts_insert AFTER INSERT ON BacSi BEGIN
+    INSERT INTO BacSi_fts (rowid, Ho, Ten, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, new.Ho, new.Ten, new.CMND, new.ChuyenKhoa);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_fts_delete AFTER DELETE ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, Ho, Ten, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, old.Ho, old.Ten, old.CMND, old.ChuyenKhoa);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_fts_update AFTER UPDATE OF Ho, Ten, CMND, ChuyenKhoa ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, Ho, Ten, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, old.Ho, old.Ten, old.CMND, old.ChuyenKhoa);
+    INSERT INTO BacSi_fts (rowid, Ho, Ten, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, new.Ho, new.Ten, new.CMND, new.ChuyenKhoa);
+END;
+
+-- Rank name matches above CMND and hometown/specialty matches
+INSERT INTO BenhNhan_fts (BenhNhan_fts, rank) VALUES ('rank', 'bm25(4.0, 8.0, 2.0, 1.0)');
+INSERT INTO BacSi_fts (BacSi_fts, rank) VALUES ('rank', 'bm25(4.0, 8.0, 2.0, 1.0)');
+
+-- Index the rows that existed before this migration
+INSERT INTO BenhNhan_fts (BenhNhan_fts) VALUES ('rebuild');
+INSERT INTO BacSi_fts (BacSi_fts) VALUES ('rebuild');
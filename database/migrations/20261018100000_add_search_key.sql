@@ -0,0 +1,91 @@
+-- Migration: add_search_key
+-- Created at: 2026-10-18 10:00:00
+
+-- Accent-folded "ho ten" key for patients and doctors, so "nguyen van an"
+-- finds "Nguyễn Văn An". The key is kept up to date by triggers using the
+-- search_key() function the application registers on every connection, and
+-- feeds both a B-tree index (full-name prefix lookups) and the FTS index.
+
+ALTER TABLE BenhNhan ADD COLUMN SearchKey TEXT;
+ALTER TABLE BacSi ADD COLUMN SearchKey TEXT;
+
+UPDATE BenhNhan SET SearchKey = search_key(Ho || ' ' || Ten);
+UPDATE BacSi SET SearchKey = search_key(Ho || ' ' || Ten);
+
+CREATE INDEX IF NOT EXISTS idx_benhnhan_searchkey ON BenhNhan(SearchKey);
+CREATE INDEX IF NOT EXISTS idx_bacsi_searchkey ON BacSi(SearchKey);
+
+DROP TRIGGER IF EXISTS BenhNhan_fts_insert;
+DROP TRIGGER IF EXISTS BenhNhan_fts_delete;
+DROP TRIGGER IF EXISTS BenhNhan_fts_update;
+DROP TABLE IF EXISTS BenhNhan_fts;
+
+DROP TRIGGER IF EXISTS BacSi_fts_insert;
+DROP TRIGGER IF EXISTS BacSi_fts_delete;
+DROP TRIGGER IF EXISTS BacSi_fts_update;
+DROP TABLE IF EXISTS BacSi_fts;
+
+-- The names are indexed through SearchKey; hometown and specialty are still
+-- indexed as typed and folded by the tokenizer
+CREATE VIRTUAL TABLE IF NOT EXISTS BenhNhan_fts USING fts5(
+    SearchKey, CMND, Quequan,
+    content='BenhNhan',
+    content_rowid='MaBN',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3 4 5 6'
+);
+
+-- SearchKey is still NULL when AFTER INSERT runs, so the index entry is
+-- computed from the new row and the key is written back afterwards
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_insert AFTER INSERT ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (rowid, SearchKey, CMND, Quequan)
+    VALUES (new.MaBN, search_key(new.Ho || ' ' || new.Ten), new.CMND, new.Quequan);
+    UPDATE BenhNhan SET SearchKey = search_key(new.Ho || ' ' || new.Ten) WHERE MaBN = new.MaBN;
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_delete AFTER DELETE ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, SearchKey, CMND, Quequan)
+    VALUES ('delete', old.MaBN, search_key(old.Ho || ' ' || old.Ten), old.CMND, old.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_update AFTER UPDATE OF Ho, Ten, CMND, Quequan ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, SearchKey, CMND, Quequan)
+    VALUES ('delete', old.MaBN, search_key(old.Ho || ' ' || old.Ten), old.CMND, old.Quequan);
+    INSERT INTO BenhNhan_fts (rowid, SearchKey, CMND, Quequan)
+    VALUES (new.MaBN, search_key(new.Ho || ' ' || new.Ten), new.CMND, new.Quequan);
+    UPDATE BenhNhan SET SearchKey = search_key(new.Ho || ' ' || new.Ten) WHERE MaBN = new.MaBN;
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS BacSi_fts USING fts5(
+    SearchKey, CMND, ChuyenKhoa,
+    content='BacSi',
+    content_rowid='MaBS',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='1 2 3 4 5 6'
+);
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_insert AFTER INSERT ON BacSi BEGIN
+    INSERT INTO BacSi_fts (rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, search_key(new.Ho || ' ' || new.Ten), new.CMND, new.ChuyenKhoa);
+    UPDATE BacSi SET SearchKey = search_key(new.Ho || ' ' || new.Ten) WHERE MaBS = new.MaBS;
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_delete AFTER DELETE ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, search_key(old.Ho || ' ' || old.Ten), old.CMND, old.ChuyenKhoa);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_update AFTER UPDATE OF Ho, Ten, CMND, ChuyenKhoa ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, search_key(old.Ho || ' ' || old.Ten), old.CMND, old.ChuyenKhoa);
+    INSERT INTO BacSi_fts (rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, search_key(new.Ho || ' ' || new.Ten), new.CMND, new.ChuyenKhoa);
+    UPDATE BacSi SET SearchKey = search_key(new.Ho || ' ' || new.Ten) WHERE MaBS = new.MaBS;
+END;
+
+-- Name matches rank above CMND and hometown/specialty matches
+INSERT INTO BenhNhan_fts (BenhNhan_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)');
+INSERT INTO BacSi_fts (BacSi_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0, 1.0)');
+
+INSERT INTO BenhNhan_fts (BenhNhan_fts) VALUES ('rebuild');
+INSERT INTO BacSi_fts (BacSi_fts) VALUES ('rebuild');
@@ -0,0 +1,10 @@
+-- Migration: add_appointment_slot_index
+-- Created at: 2026-10-18 11:00:00
+
+-- One active appointment per doctor, day and time slot. Cancelled
+-- appointments are left out so their slot can be booked again. The index
+-- also serves the slot lookups by doctor and day; an existing double
+-- booking has to be cancelled before this migration can be applied.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lichkham_slot
+ON LichKham(MaBS, NgayKham, GioKham)
+WHERE TrangThai != 'Hủy';
@@ -0,0 +1,8 @@
+-- Migration: add_appointment_day_index
+-- Created at: 2026-10-18 12:00:00
+
+-- Covers the booked (NgayKham, MaBS, GioKham) tuples of active appointments
+-- in date order, so a window of days is read from the index alone.
+CREATE INDEX IF NOT EXISTS idx_lichkham_day_slots
+ON LichKham(NgayKham, MaBS, GioKham)
+WHERE TrangThai != 'Hủy';
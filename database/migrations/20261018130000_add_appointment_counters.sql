@@ -0,0 +1,72 @@
+-- Migration: add_appointment_counters
+-- Created at: 2026-10-18 13:00:00
+
+-- Active (not cancelled) appointments per day and per doctor-day, kept up to
+-- date by the triggers below so quota checks and dashboard totals are single
+-- primary-key lookups instead of COUNT(*) scans over LichKham.
+
+CREATE TABLE IF NOT EXISTS SoLichTheoNgay (
+    NgayKham TEXT PRIMARY KEY,
+    SoLich INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS SoLichTheoBacSi (
+    MaBS INTEGER NOT NULL,
+    NgayKham TEXT NOT NULL,
+    SoLich INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (MaBS, NgayKham)
+) WITHOUT ROWID;
+
+DELETE FROM SoLichTheoNgay;
+DELETE FROM SoLichTheoBacSi;
+
+INSERT INTO SoLichTheoNgay (NgayKham, SoLich)
+SELECT NgayKham, COUNT(*) FROM LichKham
+WHERE TrangThai != 'Hủy' AND NgayKham IS NOT NULL
+GROUP BY NgayKham;
+
+INSERT INTO SoLichTheoBacSi (MaBS, NgayKham, SoLich)
+SELECT MaBS, NgayKham, COUNT(*) FROM LichKham
+WHERE TrangThai != 'Hủy' AND NgayKham IS NOT NULL AND MaBS IS NOT NULL
+GROUP BY MaBS, NgayKham;
+
+CREATE TRIGGER IF NOT EXISTS LichKham_counters_insert AFTER INSERT ON LichKham BEGIN
+    INSERT INTO SoLichTheoNgay (NgayKham, SoLich)
+    SELECT new.NgayKham, 1
+    WHERE new.TrangThai != 'Hủy' AND new.NgayKham IS NOT NULL
+    ON CONFLICT (NgayKham) DO UPDATE SET SoLich = SoLich + 1;
+
+    INSERT INTO SoLichTheoBacSi (MaBS, NgayKham, SoLich)
+    SELECT new.MaBS, new.NgayKham, 1
+    WHERE new.TrangThai != 'Hủy' AND new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL
+    ON CONFLICT (MaBS, NgayKham) DO UPDATE SET SoLich = SoLich + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS LichKham_counters_delete AFTER DELETE ON LichKham
+WHEN old.TrangThai != 'Hủy' BEGIN
+    UPDATE SoLichTheoNgay SET SoLich = SoLich - 1
+    WHERE NgayKham = old.NgayKham;
+
+    UPDATE SoLichTheoBacSi SET SoLich = SoLich - 1
+    WHERE MaBS = old.MaBS AND NgayKham = old.NgayKham;
+END;
+
+-- Moving, cancelling or restoring an appointment takes it off its old
+-- counters and puts it on the new ones
+CREATE TRIGGER IF NOT EXISTS LichKham_counters_update AFTER UPDATE OF MaBS, NgayKham, TrangThai ON LichKham BEGIN
+    UPDATE SoLichTheoNgay SET SoLich = SoLich - 1
+    WHERE NgayKham = old.NgayKham AND old.TrangThai != 'Hủy';
+
+    UPDATE SoLichTheoBacSi SET SoLich = SoLich - 1
+    WHERE MaBS = old.MaBS AND NgayKham = old.NgayKham AND old.TrangThai != 'Hủy';
+
+    INSERT INTO SoLichTheoNgay (NgayKham, SoLich)
+    SELECT new.NgayKham, 1
+    WHERE new.TrangThai != 'Hủy' AND new.NgayKham IS NOT NULL
+    ON CONFLICT (NgayKham) DO UPDATE SET SoLich = SoLich + 1;
+
+    INSERT INTO SoLichTheoBacSi (MaBS, NgayKham, SoLich)
+    SELECT new.MaBS, new.NgayKham, 1
+    WHERE new.TrangThai != 'Hủy' AND new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL
+    ON CONFLICT (MaBS, NgayKham) DO UPDATE SET SoLich = SoLich + 1;
+END;
@@ -0,0 +1,114 @@
+-- Migration: add_statistics_tables
+-- Created at: 2026-10-18 14:00:00
+
+-- Summary tables for the reports, kept current by triggers so that load and
+-- utilization reports read a few rows per doctor and period instead of
+-- scanning LichKham and HoSoBenhAn. scripts/rebuild_stats.py recomputes and
+-- verifies them.
+
+-- Appointments per day, doctor and status (cancelled ones included)
+CREATE TABLE IF NOT EXISTS ThongKeLichKhamNgay (
+    NgayKham TEXT NOT NULL,
+    MaBS INTEGER NOT NULL,
+    TrangThai TEXT NOT NULL,
+    SoLich INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (NgayKham, MaBS, TrangThai)
+) WITHOUT ROWID;
+
+-- The same per month ('YYYY-MM'), for reports spanning years
+CREATE TABLE IF NOT EXISTS ThongKeLichKhamThang (
+    Thang TEXT NOT NULL,
+    MaBS INTEGER NOT NULL,
+    TrangThai TEXT NOT NULL,
+    SoLich INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (Thang, MaBS, TrangThai)
+) WITHOUT ROWID;
+
+-- Medical records per month and doctor; reports group them by the doctor's
+-- specialty
+CREATE TABLE IF NOT EXISTS ThongKeHoSoThang (
+    Thang TEXT NOT NULL,
+    MaBS INTEGER NOT NULL,
+    SoHoSo INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (Thang, MaBS)
+) WITHOUT ROWID;
+
+DELETE FROM ThongKeLichKhamNgay;
+DELETE FROM ThongKeLichKhamThang;
+DELETE FROM ThongKeHoSoThang;
+
+INSERT INTO ThongKeLichKhamNgay (NgayKham, MaBS, TrangThai, SoLich)
+SELECT NgayKham, MaBS, IFNULL(TrangThai, ''), COUNT(*) FROM LichKham
+WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+GROUP BY NgayKham, MaBS, IFNULL(TrangThai, '');
+
+INSERT INTO ThongKeLichKhamThang (Thang, MaBS, TrangThai, SoLich)
+SELECT substr(NgayKham, 1, 7), MaBS, IFNULL(TrangThai, ''), COUNT(*) FROM LichKham
+WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+GROUP BY substr(NgayKham, 1, 7), MaBS, IFNULL(TrangThai, '');
+
+INSERT INTO ThongKeHoSoThang (Thang, MaBS, SoHoSo)
+SELECT substr(NgayKham, 1, 7), MaBS, COUNT(*) FROM HoSoBenhAn
+WHERE NgayKham IS NOT NULL AND MaBS IS NOT NULL
+GROUP BY substr(NgayKham, 1, 7), MaBS;
+
+CREATE TRIGGER IF NOT EXISTS LichKham_stats_insert AFTER INSERT ON LichKham
+WHEN new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL BEGIN
+    INSERT INTO ThongKeLichKhamNgay (NgayKham, MaBS, TrangThai, SoLich)
+    VALUES (new.NgayKham, new.MaBS, IFNULL(new.TrangThai, ''), 1)
+    ON CONFLICT (NgayKham, MaBS, TrangThai) DO UPDATE SET SoLich = SoLich + 1;
+
+    INSERT INTO ThongKeLichKhamThang (Thang, MaBS, TrangThai, SoLich)
+    VALUES (substr(new.NgayKham, 1, 7), new.MaBS, IFNULL(new.TrangThai, ''), 1)
+    ON CONFLICT (Thang, MaBS, TrangThai) DO UPDATE SET SoLich = SoLich + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS LichKham_stats_delete AFTER DELETE ON LichKham
+WHEN old.NgayKham IS NOT NULL AND old.MaBS IS NOT NULL BEGIN
+    UPDATE ThongKeLichKhamNgay SET SoLich = SoLich - 1
+    WHERE NgayKham = old.NgayKham AND MaBS = old.MaBS AND TrangThai = IFNULL(old.TrangThai, '');
+
+    UPDATE ThongKeLichKhamThang SET SoLich = SoLich - 1
+    WHERE Thang = substr(old.NgayKham, 1, 7) AND MaBS = old.MaBS AND TrangThai = IFNULL(old.TrangThai, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS LichKham_stats_update AFTER UPDATE OF MaBS, NgayKham, TrangThai ON LichKham BEGIN
+    UPDATE ThongKeLichKhamNgay SET SoLich = SoLich - 1
+    WHERE NgayKham = old.NgayKham AND MaBS = old.MaBS AND TrangThai = IFNULL(old.TrangThai, '');
+
+    UPDATE ThongKeLichKhamThang SET SoLich = SoLich - 1
+    WHERE Thang = substr(old.NgayKham, 1, 7) AND MaBS = old.MaBS AND TrangThai = IFNULL(old.TrangThai, '');
+
+    INSERT INTO ThongKeLichKhamNgay (NgayKham, MaBS, TrangThai, SoLich)
+    SELECT new.NgayKham, new.MaBS, IFNULL(new.TrangThai, ''), 1
+    WHERE new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL
+    ON CONFLICT (NgayKham, MaBS, TrangThai) DO UPDATE SET SoLich = SoLich + 1;
+
+    INSERT INTO ThongKeLichKhamThang (Thang, MaBS, TrangThai, SoLich)
+    SELECT substr(new.NgayKham, 1, 7), new.MaBS, IFNULL(new.TrangThai, ''), 1
+    WHERE new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL
+    ON CONFLICT (Thang, MaBS, TrangThai) DO UPDATE SET SoLich = SoLich + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS HoSoBenhAn_stats_insert AFTER INSERT ON HoSoBenhAn
+WHEN new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL BEGIN
+    INSERT INTO ThongKeHoSoThang (Thang, MaBS, SoHoSo)
+    VALUES (substr(new.NgayKham, 1, 7), new.MaBS, 1)
+    ON CONFLICT (Thang, MaBS) DO UPDATE SET SoHoSo = SoHoSo + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS HoSoBenhAn_stats_delete AFTER DELETE ON HoSoBenhAn
+WHEN old.NgayKham IS NOT NULL AND old.MaBS IS NOT NULL BEGIN
+    UPDATE ThongKeHoSoThang SET SoHoSo = SoHoSo - 1
+    WHERE Thang = substr(old.NgayKham, 1, 7) AND MaBS = old.MaBS;
+END;
+
+CREATE TRIGGER IF NOT EXISTS HoSoBenhAn_stats_update AFTER UPDATE OF MaBS, NgayKham ON HoSoBenhAn BEGIN
+    UPDATE ThongKeHoSoThang SET SoHoSo = SoHoSo - 1
+    WHERE Thang = substr(old.NgayKham, 1, 7) AND MaBS = old.MaBS;
+
+    INSERT INTO ThongKeHoSoThang (Thang, MaBS, SoHoSo)
+    SELECT substr(new.NgayKham, 1, 7), new.MaBS, 1
+    WHERE new.NgayKham IS NOT NULL AND new.MaBS IS NOT NULL
+    ON CONFLICT (Thang, MaBS) DO UPDATE SET SoHoSo = SoHoSo + 1;
+END;
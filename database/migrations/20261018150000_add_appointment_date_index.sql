@@ -0,0 +1,10 @@
+-- Migration: add_appointment_date_index
+-- Created at: 2026-10-18 15:00:00
+
+-- Full (not partial) index in appointment date order, so lists sorted by
+-- date and time page through it with an indexed ORDER BY. The rowid at the
+-- end of each entry is MaLichKham, the keyset tie-breaker.
+-- healthcare_system_schema.sql used to create idx_lichkham_ngaykham on
+-- NgayKham alone; the new index covers every query that one served.
+DROP INDEX IF EXISTS idx_lichkham_ngaykham;
+CREATE INDEX IF NOT EXISTS idx_lichkham_ngaykham_giokham ON LichKham(NgayKham, GioKham);
@@ -0,0 +1,35 @@
+-- Migration: add_row_counters
+-- Created at: 2026-10-18 16:00:00
+
+-- Number of rows in BenhNhan and BacSi, kept current by the triggers below
+-- so the dashboard totals are primary-key lookups instead of COUNT(*) scans.
+
+CREATE TABLE IF NOT EXISTS SoBanGhi (
+    Bang TEXT PRIMARY KEY,
+    SoLuong INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+DELETE FROM SoBanGhi;
+
+INSERT INTO SoBanGhi (Bang, SoLuong)
+SELECT 'BenhNhan', COUNT(*) FROM BenhNhan
+UNION ALL
+SELECT 'BacSi', COUNT(*) FROM BacSi;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_counters_insert AFTER INSERT ON BenhNhan BEGIN
+    INSERT INTO SoBanGhi (Bang, SoLuong) VALUES ('BenhNhan', 1)
+    ON CONFLICT (Bang) DO UPDATE SET SoLuong = SoLuong + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_counters_delete AFTER DELETE ON BenhNhan BEGIN
+    UPDATE SoBanGhi SET SoLuong = SoLuong - 1 WHERE Bang = 'BenhNhan';
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_counters_insert AFTER INSERT ON BacSi BEGIN
+    INSERT INTO SoBanGhi (Bang, SoLuong) VALUES ('BacSi', 1)
+    ON CONFLICT (Bang) DO UPDATE SET SoLuong = SoLuong + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_counters_delete AFTER DELETE ON BacSi BEGIN
+    UPDATE SoBanGhi SET SoLuong = SoLuong - 1 WHERE Bang = 'BacSi';
+END;
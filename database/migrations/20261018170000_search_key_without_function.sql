@@ -0,0 +1,54 @@
+-- Migration: search_key_without_function
+-- Created at: 2026-10-18 17:00:00
+
+-- SearchKey is now written by the application together with the name it is
+-- built from (Model.save, Session.flush, insert_many/upsert_many and the
+-- importer), so the search triggers below are plain SQL and other tools can
+-- write BenhNhan and BacSi without the search_key() function. A row written
+-- elsewhere without SearchKey is still found by CMND and hometown/specialty,
+-- and gets its key when the application next starts
+-- (DatabaseSetup.backfill_search_keys).
+
+DROP TRIGGER IF EXISTS BenhNhan_search_insert;
+DROP TRIGGER IF EXISTS BenhNhan_search_delete;
+DROP TRIGGER IF EXISTS BenhNhan_search_update;
+
+DROP TRIGGER IF EXISTS BacSi_search_insert;
+DROP TRIGGER IF EXISTS BacSi_search_delete;
+DROP TRIGGER IF EXISTS BacSi_search_update;
+
+-- The index holds the stored SearchKey, so an entry is always removed with
+-- the values it was added with
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_insert AFTER INSERT ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (rowid, SearchKey, CMND, Quequan)
+    VALUES (new.MaBN, new.SearchKey, new.CMND, new.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_delete AFTER DELETE ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, SearchKey, CMND, Quequan)
+    VALUES ('delete', old.MaBN, old.SearchKey, old.CMND, old.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BenhNhan_search_update AFTER UPDATE OF SearchKey, CMND, Quequan ON BenhNhan BEGIN
+    INSERT INTO BenhNhan_fts (BenhNhan_fts, rowid, SearchKey, CMND, Quequan)
+    VALUES ('delete', old.MaBN, old.SearchKey, old.CMND, old.Quequan);
+    INSERT INTO BenhNhan_fts (rowid, SearchKey, CMND, Quequan)
+    VALUES (new.MaBN, new.SearchKey, new.CMND, new.Quequan);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_insert AFTER INSERT ON BacSi BEGIN
+    INSERT INTO BacSi_fts (rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, new.SearchKey, new.CMND, new.ChuyenKhoa);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_delete AFTER DELETE ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, old.SearchKey, old.CMND, old.ChuyenKhoa);
+END;
+
+CREATE TRIGGER IF NOT EXISTS BacSi_search_update AFTER UPDATE OF SearchKey, CMND, ChuyenKhoa ON BacSi BEGIN
+    INSERT INTO BacSi_fts (BacSi_fts, rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES ('delete', old.MaBS, old.SearchKey, old.CMND, old.ChuyenKhoa);
+    INSERT INTO BacSi_fts (rowid, SearchKey, CMND, ChuyenKhoa)
+    VALUES (new.MaBS, new.SearchKey, new.CMND, new.ChuyenKhoa);
+END;
@@ -0,0 +1,35 @@
+-- Migration: add_sort_keys
+-- Created at: 2026-10-18 18:00:00
+
+-- Text columns the lists can be sorted by get a <column>SortKey column
+-- holding build_sort_key(value), whose plain order is Vietnamese alphabet
+-- order. Indexed with the primary key as the tiebreaker, a sorted page is an
+-- index seek instead of sorting every row through a Python collation. Like
+-- SearchKey, the keys are written by the application (Model.sort_key_columns)
+-- and existing rows get theirs from DatabaseSetup.backfill_derived_columns.
+
+ALTER TABLE BenhNhan ADD COLUMN HoSortKey TEXT;
+ALTER TABLE BenhNhan ADD COLUMN TenSortKey TEXT;
+ALTER TABLE BenhNhan ADD COLUMN GioitinhSortKey TEXT;
+ALTER TABLE BenhNhan ADD COLUMN QuequanSortKey TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_benhnhan_ho_sort ON BenhNhan(HoSortKey, MaBN);
+CREATE INDEX IF NOT EXISTS idx_benhnhan_ten_sort ON BenhNhan(TenSortKey, MaBN);
+CREATE INDEX IF NOT EXISTS idx_benhnhan_gioitinh_sort ON BenhNhan(GioitinhSortKey, MaBN);
+CREATE INDEX IF NOT EXISTS idx_benhnhan_quequan_sort ON BenhNhan(QuequanSortKey, MaBN);
+
+ALTER TABLE BacSi ADD COLUMN HoSortKey TEXT;
+ALTER TABLE BacSi ADD COLUMN TenSortKey TEXT;
+ALTER TABLE BacSi ADD COLUMN GioitinhSortKey TEXT;
+ALTER TABLE BacSi ADD COLUMN ChuyenKhoaSortKey TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_bacsi_ho_sort ON BacSi(HoSortKey, MaBS);
+CREATE INDEX IF NOT EXISTS idx_bacsi_ten_sort ON BacSi(TenSortKey, MaBS);
+CREATE INDEX IF NOT EXISTS idx_bacsi_gioitinh_sort ON BacSi(GioitinhSortKey, MaBS);
+CREATE INDEX IF NOT EXISTS idx_bacsi_chuyenkhoa_sort ON BacSi(ChuyenKhoaSortKey, MaBS);
+
+ALTER TABLE LichKham ADD COLUMN LydoKhamSortKey TEXT;
+ALTER TABLE LichKham ADD COLUMN TrangThaiSortKey TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_lichkham_lydokham_sort ON LichKham(LydoKhamSortKey, MaLichKham);
+CREATE INDEX IF NOT EXISTS idx_lichkham_trangthai_sort ON LichKham(TrangThaiSortKey, MaLichKham);
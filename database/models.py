@@ -1,48 +1,449 @@
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 from datetime import datetime
-from .db_manager import DatabaseManager
-from utils.helpers import generate_password_hash, verify_password
+from .db_manager import DatabaseManager, IntegrityError
+from .rows import RowLayout, RowView
+from utils.helpers import (generate_password_hash, verify_password, build_fts_query, build_search_key,
+                           build_sort_key, search_tokens, search_matches)
+
+_MISSING = object()
+
 
 class Model:
+    # Instances keep their columns in a tuple (as read from the cursor) laid
+    # out by a shared RowLayout, so a loaded row costs one small object and
+    # one tuple instead of a per-instance __dict__. Subclasses declare
+    # __slots__ = () to keep it that way.
+    __slots__ = ('_layout', '_values', '_changed', 'db_manager')
+    
     table_name = None
     primary_key = None
+    search_columns = ()
+    search_index_columns = ()
+    search_ranked_limit = 250
+    # Columns SearchKey is built from, joined by a space; the application
+    # writes the key, the database does not compute it
+    search_key_columns = ()
+    # Text columns sorted on a stored <column>SortKey (build_sort_key), kept
+    # current by the application and indexed with the primary key
+    sort_key_columns = ()
     
     def __init__(self, db_manager=None, **kwargs):
-        self.db_manager = db_manager or DatabaseManager()
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        # Loaded rows come from from_rows() and start clean. Values given
+        # here are not known to be stored, so they all count as changes and
+        # save() writes them even when the primary key is set.
+        object.__setattr__(self, '_layout', RowLayout.of(kwargs))
+        object.__setattr__(self, '_values', tuple(kwargs.values()))
+        object.__setattr__(self, '_changed', {key for key in kwargs if key != self.primary_key} or None)
+        object.__setattr__(self, 'db_manager', db_manager or DatabaseManager.shared())
+    
+    @classmethod
+    def from_rows(cls, columns: Tuple[str, ...], rows: List[tuple], db_manager=None) -> List['Model']:
+        db = db_manager or DatabaseManager.shared()
+        layout = RowLayout.of(columns)
+        new = object.__new__
+        instances = []
+        for row in rows:
+            instance = new(cls)
+            object.__setattr__(instance, '_layout', layout)
+            object.__setattr__(instance, '_values', row)
+            object.__setattr__(instance, '_changed', None)
+            object.__setattr__(instance, 'db_manager', db)
+            instances.append(instance)
+        return instances
+    
+    @classmethod
+    def _query(cls, db, query: str, params: tuple = None) -> List['Model']:
+        columns, rows = db.fetch_rows(query, params)
+        return cls.from_rows(columns, rows, db)
+    
+    def __getattr__(self, key):
+        # Only reached for names that are not slots or class attributes
+        try:
+            position = object.__getattribute__(self, '_layout').index[key]
+        except (KeyError, AttributeError):
+            raise AttributeError(f"{type(self).__name__} has no attribute {key!r}") from None
+        return self._values[position]
+    
+    def __setattr__(self, key, value):
+        if hasattr(type(self), key):
+            # Slots and properties such as User.pass_
+            object.__setattr__(self, key, value)
+            return
+        
+        current = self._get(key)
+        if current is _MISSING or current != value or type(current) is not type(value):
+            if self._changed is None:
+                object.__setattr__(self, '_changed', set())
+            self._changed.add(key)
+        self._set(key, value)
+    
+    def _get(self, key):
+        position = self._layout.index.get(key)
+        return _MISSING if position is None else self._values[position]
+    
+    def _set(self, key, value):
+        position = self._layout.index.get(key)
+        # A new list, so RowViews taken earlier keep the old values
+        values = list(self._values)
+        if position is None:
+            object.__setattr__(self, '_layout', self._layout.extend(key))
+            values.append(value)
+        else:
+            values[position] = value
+        object.__setattr__(self, '_values', values)
+    
+    def _assign(self, data: Dict[str, Any]):
+        # Stores values that are already in the database, e.g. timestamps
+        # written by insert() or update()
+        for key, value in data.items():
+            self._set(key, value)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._layout.columns, self._values))
+    
+    def row_view(self) -> RowView:
+        return RowView(self)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
     
     @classmethod
     def find(cls, id_value, db_manager=None) -> Optional['Model']:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
-            data = db.fetch_one(
+            found = cls._query(
+                db,
                 f"SELECT * FROM {cls.table_name} WHERE {cls.primary_key} = ?", 
                 (id_value,)
             )
-            return cls(db_manager=db, **data) if data else None
+            return found[0] if found else None
     
     @classmethod
     def find_all(cls, db_manager=None) -> List['Model']:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
-            records = db.fetch_all(f"SELECT * FROM {cls.table_name}")
-            return [cls(db_manager=db, **record) for record in records]
+            return cls._query(db, f"SELECT * FROM {cls.table_name}")
     
     @classmethod
     def where(cls, condition: str, params: tuple, db_manager=None) -> List['Model']:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = f"SELECT * FROM {cls.table_name} WHERE {condition}"
-            records = db.fetch_all(query, params)
-            return [cls(db_manager=db, **record) for record in records]
+            return cls._query(db, query, params)
+    
+    @classmethod
+    def count_rows(cls, db_manager=None) -> int:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            # BenhNhan and BacSi are counted by the SoBanGhi triggers
+            if db.get_table_schema('SoBanGhi'):
+                row = db.fetch_one("SELECT SoLuong FROM SoBanGhi WHERE Bang = ?", (cls.table_name,))
+                if row:
+                    return row['SoLuong']
+            return db.fetch_one(f"SELECT COUNT(*) AS SoLuong FROM {cls.table_name}")['SoLuong']
+    
+    @staticmethod
+    def _sort_spec(order_by=None, descending=False) -> List[Tuple[str, bool]]:
+        # order_by is a column or a sequence of columns; descending is one
+        # flag for all of them or one flag per column
+        if not order_by:
+            return []
+        columns = [order_by] if isinstance(order_by, str) else list(order_by)
+        flags = descending if isinstance(descending, (list, tuple)) else [descending] * len(columns)
+        return list(zip(columns, flags))
+
+    @classmethod
+    def _sort_columns(cls, sort_spec: List[Tuple[str, bool]], schema, prefix: str = "") -> List[Tuple[str, bool]]:
+        # Checks the sort columns against the table and returns the expressions
+        # to order and compare them by
+        columns = []
+        for column, desc in sort_spec:
+            stored = cls.sort_key_column(column)
+            if not schema or not schema.has_column(column) or not schema.has_column(stored):
+                raise ValueError(f"Cannot sort {cls.table_name} by {column}")
+            columns.append((f"{prefix}{stored}", desc))
+        return columns
+
+    @classmethod
+    def sort_key_column(cls, column: str) -> str:
+        # The column a sort on column orders and compares by
+        return f"{column}SortKey" if column in cls.sort_key_columns else column
+
+    @staticmethod
+    def _keyset_condition(key_column: str, after, sort_spec: List[Tuple[str, bool]] = (),
+                          descending: bool = False) -> Tuple[str, tuple]:
+        # Rows strictly after the cursor in ORDER BY <sort columns>, key_column.
+        # The cursor is the last key value, or (sort values..., key value)
+        # when sort columns are used. SQLite sorts NULL first, so NULL sort
+        # values are handled explicitly instead of through a row-value
+        # comparison.
+        if not sort_spec:
+            return f"{key_column} {'<' if descending else '>'} ?", (after,)
+
+        values, key = after[:-1], after[-1]
+        key_descending = sort_spec[-1][1]
+        condition = f"{key_column} {'<' if key_descending else '>'} ?"
+        params = (key,)
+        for (column, column_descending), value in reversed(list(zip(sort_spec, values))):
+            equal = f"{column} IS NULL" if value is None else f"{column} = ?"
+            equal_params = () if value is None else (value,)
+            if value is None:
+                after_value = None if column_descending else f"{column} IS NOT NULL"
+                after_params = ()
+            elif column_descending:
+                after_value, after_params = f"({column} < ? OR {column} IS NULL)", (value,)
+            else:
+                after_value, after_params = f"{column} > ?", (value,)
+
+            condition = f"{equal} AND ({condition})"
+            params = equal_params + params
+            if after_value:
+                condition = f"{after_value} OR ({condition})"
+                params = after_params + params
+
+        # A lower bound on the first column lets SQLite seek its index
+        # instead of walking it from the start
+        column, column_descending = sort_spec[0]
+        if values[0] is not None and not column_descending:
+            condition = f"{column} >= ? AND ({condition})"
+            params = (values[0],) + params
+        return condition, params
+
+    @classmethod
+    def _order_clause(cls, sort_spec: List[Tuple[str, bool]], key_descending: bool) -> str:
+        return ", ".join(
+            [f"{column} {'DESC' if desc else 'ASC'}" for column, desc in sort_spec] +
+            [f"{cls.primary_key} {'DESC' if key_descending else 'ASC'}"]
+        )
+
+    @classmethod
+    def page(cls, after=None, limit: int = 100, order_by=None, descending=False,
+             db_manager=None, offset: int = 0) -> List['Model']:
+        # offset skips rows past after (or from the start) so a page far down
+        # the list is read in one query; page_cursor on its last row then
+        # continues from there
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            sort_spec = cls._sort_spec(order_by, descending)
+            if sort_spec:
+                sort_spec = cls._sort_columns(sort_spec, db.get_table_schema(cls.table_name))
+            key_descending = sort_spec[-1][1] if sort_spec else descending
+            order = cls._order_clause(sort_spec, key_descending)
+
+            query = f"SELECT * FROM {cls.table_name}"
+            params = ()
+            if after is not None:
+                condition, params = cls._keyset_condition(cls.primary_key, after, sort_spec, key_descending)
+                query += f" WHERE {condition}"
+            query += f" ORDER BY {order} LIMIT ? OFFSET ?"
+            return cls._query(db, query, params + (limit, offset))
+
+    @classmethod
+    def find_many(cls, keys: List[Any], offset: int = 0, limit: int = 100, order_by=None,
+                  descending=False, db_manager=None) -> List['Model']:
+        # Rows offset to offset + limit of the rows with the given keys, in
+        # the order of keys or sorted like page(); keys of rows deleted since
+        # are skipped
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            sort_spec = cls._sort_spec(order_by, descending)
+            if not sort_spec:
+                keys = list(keys[offset:offset + limit])
+                if not keys:
+                    return []
+                placeholders = ", ".join("?" * len(keys))
+                found = {
+                    getattr(instance, cls.primary_key): instance for instance in cls._query(
+                        db, f"SELECT * FROM {cls.table_name} WHERE {cls.primary_key} IN ({placeholders})",
+                        tuple(keys)
+                    )
+                }
+                return [found[key] for key in keys if key in found]
+
+            sort_spec = cls._sort_columns(sort_spec, db.get_table_schema(cls.table_name))
+            placeholders = ", ".join("?" * len(keys))
+            query = f"""
+            SELECT * FROM {cls.table_name} WHERE {cls.primary_key} IN ({placeholders})
+            ORDER BY {cls._order_clause(sort_spec, sort_spec[-1][1])} LIMIT ? OFFSET ?
+            """
+            return cls._query(db, query, tuple(keys) + (limit, offset))
+
+    @classmethod
+    def page_cursor(cls, record: Dict[str, Any], order_by=None):
+        key = record[cls.primary_key]
+        if not order_by:
+            return key
+        columns = [order_by] if isinstance(order_by, str) else order_by
+        return tuple(record[cls.sort_key_column(column)] for column in columns) + (key,)
+    
+    @classmethod
+    def search(cls, term: str, limit: int = 100, offset: int = 0, db_manager=None) -> List['Model']:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            query, params = cls._search_query(db, term, "T.*", limit, offset)
+            return cls._query(db, query, params)
+    
+    @classmethod
+    def search_hit_columns(cls) -> Tuple[str, ...]:
+        # The key and the columns refine_search() narrows matches by
+        return (cls.primary_key,) + tuple(dict.fromkeys(cls.search_index_columns + cls.search_columns))
+    
+    @classmethod
+    def search_keys(cls, term: str, limit: int = 100, db_manager=None) -> List[tuple]:
+        # The matches of search() as search_hit_columns() tuples, in the same
+        # order, without reading the rest of each row
+        db = db_manager or DatabaseManager.shared()
+        columns = ", ".join(f"T.{column}" for column in cls.search_hit_columns())
+        with db:
+            query, params = cls._search_query(db, term, columns, limit, 0)
+            return db.fetch_rows(query, params)[1]
+    
+    @classmethod
+    def _search_query(cls, db, term: str, columns: str, limit: int, offset: int) -> Tuple[str, tuple]:
+        match = build_fts_query(term)
+        key = build_search_key(term)
+        fts_table = f"{cls.table_name}_fts"
+
+        schema = db.get_table_schema(cls.table_name)
+        key_range = None
+        if key and schema and schema.has_column('SearchKey') and not any(c.isdigit() for c in key):
+            key_range = (key, key + "\uffff")
+
+        if not match:
+            query = f"SELECT {columns} FROM {cls.table_name} T ORDER BY {cls.primary_key} LIMIT ? OFFSET ?"
+            params = (limit, offset)
+        elif key_range and db.fetch_one(
+                f"SELECT 1 FROM {cls.table_name} WHERE SearchKey >= ? AND SearchKey < ? LIMIT 1", key_range):
+            # A name typed from the start ("nguyen van an") is a range scan
+            # on the SearchKey index and is listed alphabetically
+            query = f"""
+            SELECT {columns} FROM {cls.table_name} T
+            WHERE SearchKey >= ? AND SearchKey < ?
+            ORDER BY SearchKey, {cls.primary_key}
+            LIMIT ? OFFSET ?
+            """
+            params = key_range + (limit, offset)
+        elif db.get_table_schema(fts_table):
+            # bm25 has to read the whole posting list of every token, which
+            # costs tens of milliseconds for "Nguyễn" or "Thị" on a large
+            # table. Terms that broad match more rows than anyone pages
+            # through, so they are listed in index order and only
+            # selective terms are ranked.
+            hits = db.fetch_all(
+                f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ? LIMIT ?",
+                (match, cls.search_ranked_limit + 1)
+            )
+            order = "rowid" if len(hits) > cls.search_ranked_limit else "rank"
+            query = f"""
+            SELECT {columns} FROM (
+                SELECT rowid, {order} AS position FROM {fts_table}
+                WHERE {fts_table} MATCH ?
+                ORDER BY {order}
+                LIMIT ? OFFSET ?
+            ) F
+            JOIN {cls.table_name} T ON T.{cls.primary_key} = F.rowid
+            ORDER BY F.position
+            """
+            params = (match, limit, offset)
+        else:
+            search_term = f"%{term.strip()}%"
+            condition = " OR ".join(f"{column} LIKE ?" for column in cls.search_columns)
+            query = f"SELECT {columns} FROM {cls.table_name} T WHERE {condition} LIMIT ? OFFSET ?"
+            params = (search_term,) * len(cls.search_columns) + (limit, offset)
+        return query, params
+    
+    @classmethod
+    def refine_search(cls, term: str, previous: str, hits: List[tuple],
+                      db_manager=None) -> Optional[List[tuple]]:
+        # Narrows the complete result of search_keys(previous) to what
+        # search_keys(term) returns, for a term that extends previous. None
+        # means the matches of term are not all among hits and the database
+        # has to be asked.
+        db = db_manager or DatabaseManager.shared()
+        if not build_fts_query(term) or not term.startswith(previous):
+            return None
+        position = {column: index for index, column in enumerate(cls.search_hit_columns())}
+
+        def key_range_hits(text):
+            key = build_search_key(text)
+            if not key or any(c.isdigit() for c in key):
+                return None
+            return [hit for hit in hits if (hit[position['SearchKey']] or '').startswith(key)]
+
+        with db:
+            schema = db.get_table_schema(cls.table_name)
+            if schema and schema.has_column('SearchKey'):
+                # Every row whose SearchKey starts with term also matched
+                # previous, whichever way previous was searched
+                matched = key_range_hits(term)
+                if matched:
+                    return sorted(matched, key=lambda hit: (hit[position['SearchKey']], hit[0]))
+                if key_range_hits(previous):
+                    # previous was a SearchKey range, term falls back to the
+                    # full text index and can match rows outside it
+                    return None
+
+            if db.get_table_schema(f"{cls.table_name}_fts"):
+                # Matches keep the order of the broader search
+                return [
+                    hit for hit in hits
+                    if search_matches(term, [t for c in cls.search_index_columns
+                                             for t in search_tokens(hit[position[c]])])
+                ]
+
+        needle = term.strip().lower()
+        return [hit for hit in hits
+                if any(needle in str(hit[position[c]] or '').lower() for c in cls.search_columns)]
+    
+    @classmethod
+    def with_derived_columns(cls, data: Dict[str, Any], current: Dict[str, Any] = None) -> Dict[str, Any]:
+        # Adds SearchKey and the sort keys to a row being written for the
+        # columns it changes; current holds the stored values data leaves as is
+        derived = {f"{column}SortKey": build_sort_key(data[column])
+                   for column in cls.sort_key_columns if column in data}
+        if any(column in data for column in cls.search_key_columns):
+            current = current or {}
+            parts = [data[column] if column in data else current.get(column) for column in cls.search_key_columns]
+            derived['SearchKey'] = None if any(part is None for part in parts) else build_search_key(" ".join(map(str, parts)))
+        return dict(data, **derived) if derived else data
+
+    def _with_stored_derived_columns(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # A built instance may hold only some of the key columns; the others
+        # are read from its row
+        current = self.to_dict()
+        missing = [column for column in self.search_key_columns if column not in current]
+        if missing and any(column in data for column in self.search_key_columns):
+            row = self.db_manager.fetch_one(
+                f"SELECT {', '.join(missing)} FROM {self.table_name} WHERE {self.primary_key} = ?",
+                (getattr(self, self.primary_key),)
+            )
+            current.update(row or {})
+        return self.with_derived_columns(data, current)
+    
+    def column_values(self) -> Dict[str, Any]:
+        return {k: v for k, v in zip(self._layout.columns, self._values) if k != self.primary_key}
+    
+    def changed_values(self) -> Dict[str, Any]:
+        if not self._changed:
+            return {}
+        return {k: self._get(k) for k in self._changed if k in self._layout.index and k != self.primary_key}
+    
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self.changed_values())
+    
+    def mark_clean(self):
+        object.__setattr__(self, '_changed', None)
     
     def save(self) -> bool:
         with self.db_manager:
-            data = {k: v for k, v in self.__dict__.items() 
-                    if k not in ('db_manager', self.primary_key) and not k.startswith('_')}
-            
             if hasattr(self, self.primary_key) and getattr(self, self.primary_key):
+                # Only the modified columns are written, and an unmodified
+                # row is not written at all
+                data = self.changed_values()
+                if not data:
+                    return True
+                data = self._with_stored_derived_columns(data)
                 pk_value = getattr(self, self.primary_key)
                 self.db_manager.update(
                     self.table_name, 
@@ -50,10 +451,15 @@ class Model:
                     f"{self.primary_key} = ?", 
                     (pk_value,)
                 )
+                self._assign(data)
+                self.mark_clean()
                 return True
             else:
+                data = self.with_derived_columns(self.column_values())
                 new_id = self.db_manager.insert(self.table_name, data)
-                setattr(self, self.primary_key, new_id)
+                self._assign(data)
+                self._set(self.primary_key, new_id)
+                self.mark_clean()
                 return True
         return False
     
@@ -78,25 +484,28 @@ class Model:
                     (pk_value,)
                 )
                 if data:
-                    for key, value in data.items():
-                        setattr(self, key, value)
+                    self._assign(data)
+                    self.mark_clean()
                     return True
         return False
 
 
 class User(Model):
+    __slots__ = ()
+
     table_name = "TaiKhoan"
     primary_key = "username"
     
     @classmethod
     def find_by_username(cls, username: str) -> Optional['User']:
-        db = DatabaseManager()
+        db = DatabaseManager.shared()
         with db:
-            data = db.fetch_one(
+            found = cls._query(
+                db,
                 f"SELECT * FROM {cls.table_name} WHERE username = ?", 
                 (username,)
             )
-            return cls(db_manager=db, **data) if data else None
+            return found[0] if found else None
     
     @classmethod
     def authenticate(cls, username: str, password: str) -> Optional['User']:
@@ -137,35 +546,30 @@ class User(Model):
 
 
 class Doctor(Model):
+    __slots__ = ()
+
     table_name = "BacSi"
     primary_key = "MaBS"
+    search_columns = ("Ho", "Ten", "CMND", "ChuyenKhoa")
+    search_index_columns = ("SearchKey", "CMND", "ChuyenKhoa")
+    search_key_columns = ("Ho", "Ten")
+    sort_key_columns = ("Ho", "Ten", "Gioitinh", "ChuyenKhoa")
     
     @classmethod
     def find_by_cmnd(cls, cmnd: str) -> Optional['Doctor']:
-        db = DatabaseManager()
+        db = DatabaseManager.shared()
         with db:
-            data = db.fetch_one(
+            found = cls._query(
+                db,
                 f"SELECT * FROM {cls.table_name} WHERE CMND = ?", 
                 (cmnd,)
             )
-            return cls(db_manager=db, **data) if data else None
+            return found[0] if found else None
     
     @classmethod
     def find_by_specialty(cls, specialty: str) -> List['Doctor']:
         return cls.where("ChuyenKhoa = ?", (specialty,))
     
-    @classmethod
-    def search(cls, term: str) -> List['Doctor']:
-        search_term = f"%{term}%"
-        db = DatabaseManager()
-        with db:
-            query = f"""
-            SELECT * FROM {cls.table_name} 
-            WHERE Ho LIKE ? OR Ten LIKE ? OR CMND LIKE ? OR ChuyenKhoa LIKE ?
-            """
-            records = db.fetch_all(query, (search_term, search_term, search_term, search_term))
-            return [cls(db_manager=db, **record) for record in records]
-    
     def get_full_name(self) -> str:
         ho = getattr(self, 'Ho', '')
         ten = getattr(self, 'Ten', '')
@@ -190,30 +594,25 @@ class Doctor(Model):
 
 
 class Patient(Model):
+    __slots__ = ()
+
     table_name = "BenhNhan"
     primary_key = "MaBN"
+    search_columns = ("Ho", "Ten", "CMND", "Quequan")
+    search_index_columns = ("SearchKey", "CMND", "Quequan")
+    search_key_columns = ("Ho", "Ten")
+    sort_key_columns = ("Ho", "Ten", "Gioitinh", "Quequan")
     
     @classmethod
     def find_by_cmnd(cls, cmnd: str) -> Optional['Patient']:
-        db = DatabaseManager()
+        db = DatabaseManager.shared()
         with db:
-            data = db.fetch_one(
+            found = cls._query(
+                db,
                 f"SELECT * FROM {cls.table_name} WHERE CMND = ?", 
                 (cmnd,)
             )
-            return cls(db_manager=db, **data) if data else None
-    
-    @classmethod
-    def search(cls, term: str) -> List['Patient']:
-        search_term = f"%{term}%"
-        db = DatabaseManager()
-        with db:
-            query = f"""
-            SELECT * FROM {cls.table_name} 
-            WHERE Ho LIKE ? OR Ten LIKE ? OR CMND LIKE ? OR Quequan LIKE ?
-            """
-            records = db.fetch_all(query, (search_term, search_term, search_term, search_term))
-            return [cls(db_manager=db, **record) for record in records]
+            return found[0] if found else None
     
     def get_full_name(self) -> str:
         ho = getattr(self, 'Ho', '')
@@ -267,12 +666,15 @@ class Patient(Model):
 
 
 class Appointment(Model):
+    __slots__ = ()
+
     table_name = "LichKham"
     primary_key = "MaLichKham"
+    sort_key_columns = ("LydoKham", "TrangThai")
     
     @classmethod
     def get_appointments_with_details(cls, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, 
@@ -283,9 +685,47 @@ class Appointment(Model):
             """
             return db.fetch_all(query)
     
+    @classmethod
+    def count_rows(cls, db_manager=None) -> int:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            # Every status is counted per month, as the list shows them all
+            if db.get_table_schema('ThongKeLichKhamThang'):
+                return db.fetch_one(
+                    "SELECT COALESCE(SUM(SoLich), 0) AS SoLuong FROM ThongKeLichKhamThang"
+                )['SoLuong']
+        return super().count_rows(db)
+    
+    @classmethod
+    def page_with_details(cls, after=None, limit: int = 100, order_by=None, descending=False,
+                          db_manager=None, offset: int = 0) -> List[Dict[str, Any]]:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            sort_spec = cls._sort_columns(cls._sort_spec(order_by, descending),
+                                          db.get_table_schema(cls.table_name), prefix="LK.")
+            key_descending = sort_spec[-1][1] if sort_spec else descending
+
+            query = """
+            SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, 
+                          BN.Ho || ' ' || BN.Ten AS TenBenhNhan
+            FROM LichKham LK
+            LEFT JOIN BacSi BS ON LK.MaBS = BS.MaBS
+            LEFT JOIN BenhNhan BN ON LK.MaBN = BN.MaBN
+            """
+            params = ()
+            if after is not None:
+                condition, params = cls._keyset_condition("LK.MaLichKham", after, sort_spec, key_descending)
+                query += f" WHERE {condition}"
+            query += " ORDER BY " + ", ".join(
+                [f"{column} {'DESC' if desc else 'ASC'}" for column, desc in sort_spec] +
+                [f"LK.MaLichKham {'DESC' if key_descending else 'ASC'}"]
+            )
+            query += " LIMIT ? OFFSET ?"
+            return db.fetch_all(query, params + (limit, offset))
+    
     @classmethod
     def get_appointments_by_date(cls, date: str, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, BS.ChuyenKhoa,
@@ -298,9 +738,48 @@ class Appointment(Model):
             """
             return db.fetch_all(query, (date,))
     
+    @classmethod
+    def get_appointments_in_range(cls, start_date: str, end_date: str, doctor_id: int = None,
+                                  db_manager=None) -> List[Dict[str, Any]]:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            # A range seek on idx_lichkham_ngaykham_giokham, already in slot order
+            query = """
+            SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, BS.ChuyenKhoa,
+                          BN.Ho || ' ' || BN.Ten AS TenBenhNhan
+            FROM LichKham LK
+            LEFT JOIN BacSi BS ON LK.MaBS = BS.MaBS
+            LEFT JOIN BenhNhan BN ON LK.MaBN = BN.MaBN
+            WHERE LK.NgayKham BETWEEN ? AND ?
+            """
+            params = (start_date, end_date)
+            if doctor_id is not None:
+                query += " AND LK.MaBS = ?"
+                params += (doctor_id,)
+            query += " ORDER BY LK.NgayKham, LK.GioKham"
+            return db.fetch_all(query, params)
+    
+    @classmethod
+    def count_appointments_in_range(cls, start_date: str, end_date: str, doctor_id: int = None,
+                                    db_manager=None) -> List[Dict[str, Any]]:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            # One row per booked (day, time); cancelled appointments free their slot
+            query = """
+            SELECT NgayKham, GioKham, COUNT(*) AS SoLich
+            FROM LichKham
+            WHERE NgayKham BETWEEN ? AND ? AND TrangThai != 'Hủy'
+            """
+            params = (start_date, end_date)
+            if doctor_id is not None:
+                query += " AND MaBS = ?"
+                params += (doctor_id,)
+            query += " GROUP BY NgayKham, GioKham ORDER BY NgayKham, GioKham"
+            return db.fetch_all(query, params)
+    
     @classmethod
     def get_appointments_by_doctor(cls, doctor_id: int, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT LK.*, BN.Ho || ' ' || BN.Ten AS TenBenhNhan
@@ -313,7 +792,7 @@ class Appointment(Model):
     
     @classmethod
     def get_appointments_by_patient(cls, patient_id: int, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT LK.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, BS.ChuyenKhoa
@@ -325,25 +804,68 @@ class Appointment(Model):
             return db.fetch_all(query, (patient_id,))
     
     @classmethod
-    def check_time_available(cls, doctor_id: int, date: str, time: str, db_manager=None) -> bool:
-        db = db_manager or DatabaseManager()
+    def iter_booked_slots(cls, start_date: str, end_date: str, db_manager=None) -> Iterator[Dict[str, Any]]:
+        db = db_manager or DatabaseManager.shared()
+        # One row per booked doctor-day, in date order, read from the
+        # idx_lichkham_day_slots index alone
+        query = """
+        SELECT NgayKham, MaBS, COUNT(*) AS SoLich, group_concat(GioKham) AS GioDaDat
+        FROM LichKham
+        WHERE NgayKham >= ? AND NgayKham < ? AND TrangThai != 'Hủy'
+        GROUP BY NgayKham, MaBS
+        ORDER BY NgayKham
+        """
+        return db.iter_query(query, (start_date, end_date))
+    
+    @classmethod
+    def get_booking_counts(cls, doctor_id: int, date: str, db_manager=None) -> Dict[str, int]:
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
-            SELECT COUNT(*) as count
-            FROM LichKham
-            WHERE MaBS = ? AND NgayKham = ? AND GioKham = ?
+            SELECT
+                COALESCE((SELECT SoLich FROM SoLichTheoNgay WHERE NgayKham = ?), 0) AS SoLichNgay,
+                COALESCE((SELECT SoLich FROM SoLichTheoBacSi WHERE MaBS = ? AND NgayKham = ?), 0) AS SoLichBacSi
             """
-            result = db.fetch_one(query, (doctor_id, date, time))
-            return result['count'] == 0
+            return db.fetch_one(query, (date, doctor_id, date))
+    
+    @classmethod
+    def count_between(cls, start_date: str, end_date: str, db_manager=None) -> int:
+        db = db_manager or DatabaseManager.shared()
+        with db:
+            query = """
+            SELECT COALESCE(SUM(SoLich), 0) AS SoLich
+            FROM SoLichTheoNgay
+            WHERE NgayKham >= ? AND NgayKham < ?
+            """
+            return db.fetch_one(query, (start_date, end_date))['SoLich']
+    
+    @classmethod
+    def book_slot(cls, appointment_data: Dict[str, Any], db_manager=None) -> Optional[int]:
+        db = db_manager or DatabaseManager.shared()
+        data = dict(appointment_data)
+        data.setdefault('TrangThai', 'Chờ khám')
+        data = cls.with_derived_columns(data)
+        
+        # A single INSERT: the unique slot index rejects a slot that is already
+        # taken, so there is no separate availability check to race against
+        try:
+            with db:
+                return db.insert(cls.table_name, data)
+        except IntegrityError as e:
+            if e.is_unique_violation:
+                return None
+            raise
 
 
 class MedicalRecord(Model):
+    __slots__ = ()
+
     table_name = "HoSoBenhAn"
     primary_key = "MaHoSo"
     
     @classmethod
     def get_records_by_patient(cls, patient_id: int, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT HS.*, BS.Ho || ' ' || BS.Ten AS TenBacSi, BS.ChuyenKhoa
@@ -356,7 +878,7 @@ class MedicalRecord(Model):
     
     @classmethod
     def get_records_by_doctor(cls, doctor_id: int, db_manager=None) -> List[Dict[str, Any]]:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         with db:
             query = """
             SELECT HS.*, BN.Ho || ' ' || BN.Ten AS TenBenhNhan
@@ -369,8 +891,8 @@ class MedicalRecord(Model):
     
     @classmethod
     def create_from_appointment(cls, appointment_id: int, diagnosis: str, db_manager=None) -> Optional['MedicalRecord']:
-        db = db_manager or DatabaseManager()
-        with db:
+        db = db_manager or DatabaseManager.shared()
+        with db.transaction():
             appointment = db.fetch_one(
                 "SELECT * FROM LichKham WHERE MaLichKham = ?", 
                 (appointment_id,)
@@ -395,7 +917,7 @@ class MedicalRecord(Model):
             
             db.update(
                 'LichKham',
-                {'TrangThai': 'Đã khám'},
+                Appointment.with_derived_columns({'TrangThai': 'Đã khám'}),
                 'MaLichKham = ?',
                 (appointment_id,)
             )
@@ -404,6 +926,8 @@ class MedicalRecord(Model):
 
 
 class AppSetting(Model):
+    __slots__ = ()
+
     table_name = "AppSettings"
     primary_key = "setting_key"
     
@@ -431,7 +955,7 @@ class AppSetting(Model):
     
     @classmethod
     def set(cls, key: str, value: Any, value_type: str = None, description: str = None, db_manager=None) -> bool:
-        db = db_manager or DatabaseManager()
+        db = db_manager or DatabaseManager.shared()
         
         value_str = str(value)
         
@@ -0,0 +1,58 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Tuple
+
+
+class RowLayout:
+    # Column names and their positions, shared by every row of the same shape
+    # instead of each row carrying its own dict of keys
+
+    __slots__ = ('columns', 'index', '_extended')
+
+    _layouts: Dict[Tuple[str, ...], 'RowLayout'] = {}
+
+    def __init__(self, columns: Tuple[str, ...]):
+        self.columns = columns
+        self.index = {column: position for position, column in enumerate(columns)}
+        self._extended = {}
+
+    @classmethod
+    def of(cls, columns) -> 'RowLayout':
+        columns = tuple(columns)
+        layout = cls._layouts.get(columns)
+        if layout is None:
+            layout = cls._layouts.setdefault(columns, cls(columns))
+        return layout
+
+    def extend(self, column: str) -> 'RowLayout':
+        layout = self._extended.get(column)
+        if layout is None:
+            layout = self._extended.setdefault(column, RowLayout.of(self.columns + (column,)))
+        return layout
+
+
+class RowView(Mapping):
+    # Read-only mapping over a model's values as they were when the view was
+    # taken. Nothing is copied: a model never changes its values in place but
+    # replaces them (Model._set), so later edits, e.g. through a Session, do
+    # not show up in rows a view has already rendered.
+
+    __slots__ = ('_layout', '_values')
+
+    def __init__(self, model):
+        self._layout = model._layout
+        self._values = model._values
+
+    def __getitem__(self, column: str) -> Any:
+        position = self._layout.index.get(column)
+        if position is None:
+            raise KeyError(column)
+        return self._values[position]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout.columns)
+
+    def __len__(self) -> int:
+        return len(self._layout.columns)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+class TableSchema:
+
+    def __init__(self, name: str, columns: Dict[str, str]):
+        self.name = name
+        self.columns = columns
+        self.column_names = tuple(columns)
+        self.has_created_at = 'created_at' in columns
+        self.has_updated_at = 'updated_at' in columns
+        self.has_timestamps = self.has_created_at and self.has_updated_at
+
+    def has_column(self, column: str) -> bool:
+        return column in self.columns
+
+    def column_type(self, column: str) -> Optional[str]:
+        return self.columns.get(column)
+
+
+class SchemaCatalog:
+
+    _catalogs = {}
+    _catalogs_lock = threading.Lock()
+
+    def __init__(self):
+        self._tables = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_database(cls, db_file: str) -> 'SchemaCatalog':
+        catalog = cls._catalogs.get(db_file)
+        if catalog is None:
+            with cls._catalogs_lock:
+                catalog = cls._catalogs.setdefault(db_file, cls())
+        return catalog
+
+    def load(self, connection: sqlite3.Connection) -> Dict[str, TableSchema]:
+        rows = connection.execute("""
+            SELECT m.name AS table_name, p.name AS column_name, p.type AS column_type
+            FROM sqlite_master m
+            JOIN pragma_table_info(m.name) p
+            WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%'
+            ORDER BY m.name, p.cid
+        """).fetchall()
+
+        columns_by_table = {}
+        for table_name, column_name, column_type in rows:
+            columns_by_table.setdefault(table_name, {})[column_name] = column_type
+
+        tables = {
+            name: TableSchema(name, columns)
+            for name, columns in columns_by_table.items()
+        }
+        with self._lock:
+            self._tables = tables
+        return tables
+
+    def invalidate(self):
+        with self._lock:
+            self._tables = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._tables is not None
+
+    def get(self, name: str) -> Optional[TableSchema]:
+        tables = self._tables
+        return tables.get(name) if tables is not None else None
+
+    def table(self, connection: sqlite3.Connection, name: str) -> Optional[TableSchema]:
+        tables = self._tables
+        if tables is None:
+            return self.load(connection).get(name)
+
+        schema = tables.get(name)
+        if schema is None:
+            # The table may have been created after the catalog was loaded
+            schema = self.load(connection).get(name)
+        return schema
+
+    def table_names(self, connection: sqlite3.Connection) -> List[str]:
+        tables = self._tables
+        if tables is None:
+            tables = self.load(connection)
+        return sorted(tables)
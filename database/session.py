@@ -0,0 +1,164 @@
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple, Type
+
+from .db_manager import DatabaseManager
+from .models import Model
+
+
+class Session:
+    # Unit of work: every row loaded through the session is one instance per
+    # (table, primary key), and changes are written together by flush()
+
+    def __init__(self, db_manager=None):
+        self.db_manager = db_manager or DatabaseManager.shared()
+        self.identity_map: Dict[Tuple[str, Any], Model] = {}
+        self._new: List[Model] = []
+        self._deleted: Dict[Tuple[str, Any], Model] = {}
+
+    def __enter__(self) -> 'Session':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.flush()
+        self.clear()
+        return False
+
+    @staticmethod
+    def identity(instance: Model) -> Optional[Tuple[str, Any]]:
+        pk_value = getattr(instance, instance.primary_key, None)
+        return (instance.table_name, pk_value) if pk_value else None
+
+    def merge(self, instance: Model) -> Model:
+        # Returns the instance already in the session for the same row, so
+        # changes made earlier in the operation are not lost
+        key = self.identity(instance)
+        if key is None:
+            return instance
+        return self.identity_map.setdefault(key, instance)
+
+    def get(self, model_cls: Type[Model], pk_value) -> Optional[Model]:
+        key = (model_cls.table_name, pk_value)
+        instance = self.identity_map.get(key)
+        if instance is None:
+            instance = model_cls.find(pk_value, self.db_manager)
+            if instance is None:
+                return None
+            # Also remember the key as given, e.g. "12" from a form for MaBN 12
+            instance = self.merge(instance)
+            self.identity_map[key] = instance
+        return None if self.identity(instance) in self._deleted else instance
+
+    def where(self, model_cls: Type[Model], condition: str, params: tuple) -> List[Model]:
+        instances = [self.merge(instance) for instance in model_cls.where(condition, params, self.db_manager)]
+        return [instance for instance in instances if self.identity(instance) not in self._deleted]
+
+    def add(self, instance: Model) -> Model:
+        # Loaded instances are flushed whenever they change, so this is only
+        # needed for new rows and for instances loaded outside the session
+        if self.identity(instance) is None:
+            if instance not in self._new:
+                self._new.append(instance)
+            return instance
+        return self.merge(instance)
+
+    def delete(self, instance: Model):
+        key = self.identity(instance)
+        if key is None:
+            if instance in self._new:
+                self._new.remove(instance)
+            return
+        self._deleted[key] = instance
+
+    def _changed(self) -> List[Model]:
+        # An instance can be in the map under two keys (see get())
+        instances = {id(instance): instance for instance in self.identity_map.values()}
+        return [instance for instance in instances.values()
+                if self.identity(instance) not in self._deleted and instance.changed_values()]
+
+    def flush(self):
+        changed = self._changed()
+        if not (self._new or changed or self._deleted):
+            return
+
+        with self.db_manager.transaction():
+            self._flush_deletes()
+            self._flush_updates(changed)
+            self._flush_inserts()
+
+        for instance in changed + self._new:
+            instance.mark_clean()
+        for instance in self._new:
+            self.merge(instance)
+
+        self.identity_map = {
+            key: instance for key, instance in self.identity_map.items()
+            if self.identity(instance) not in self._deleted
+        }
+        self._new = []
+        self._deleted = {}
+
+    def _flush_deletes(self):
+        batches: Dict[Type[Model], List[tuple]] = {}
+        for (_, pk_value), instance in self._deleted.items():
+            batches.setdefault(type(instance), []).append((pk_value,))
+
+        for model_cls, params in batches.items():
+            self.db_manager.executemany(
+                f"DELETE FROM {model_cls.table_name} WHERE {model_cls.primary_key} = ?", params
+            )
+
+    def _flush_updates(self, changed: List[Model]):
+        # Rows of one table that change the same columns share one statement,
+        # and each writes only its modified columns
+        batches: Dict[Tuple[Type[Model], Tuple[str, ...]], List[tuple]] = {}
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for instance in changed:
+            data = instance._with_stored_derived_columns(instance.changed_values())
+            schema = self.db_manager.get_table_schema(instance.table_name)
+            if schema and schema.has_updated_at:
+                data['updated_at'] = now
+            key = (type(instance), tuple(sorted(data)))
+            batches.setdefault(key, []).append(
+                tuple(data[column] for column in key[1]) + (getattr(instance, instance.primary_key),)
+            )
+            instance._assign(data)
+
+        for (model_cls, columns), params in batches.items():
+            set_clause = ', '.join(f"{column} = ?" for column in columns)
+            self.db_manager.executemany(
+                f"UPDATE {model_cls.table_name} SET {set_clause} WHERE {model_cls.primary_key} = ?", params
+            )
+
+    def _flush_inserts(self):
+        # New rows of one table with the same columns share one statement too
+        batches: Dict[Tuple[Type[Model], Tuple[str, ...]], List[Tuple[Model, Dict[str, Any]]]] = {}
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        for instance in self._new:
+            data = instance.with_derived_columns(instance.column_values())
+            schema = self.db_manager.get_table_schema(instance.table_name)
+            if schema and schema.has_timestamps:
+                # A supplied creation time is kept, as in DatabaseManager.insert
+                if not data.get('created_at'):
+                    data['created_at'] = now
+                data['updated_at'] = now
+            key = (type(instance), tuple(sorted(data)))
+            batches.setdefault(key, []).append((instance, data))
+
+        for (model_cls, columns), items in batches.items():
+            placeholders = ', '.join(['?'] * len(columns))
+            self.db_manager.executemany(
+                f"INSERT INTO {model_cls.table_name} ({', '.join(columns)}) VALUES ({placeholders})",
+                [tuple(data[column] for column in columns) for _, data in items]
+            )
+            # The write transaction keeps other writers out, so SQLite gives
+            # the rows consecutive keys ending at the last one inserted
+            last_id = self.db_manager.fetch_one("SELECT last_insert_rowid() AS id")['id']
+            for pk_value, (instance, data) in enumerate(items, last_id - len(items) + 1):
+                instance._assign(data)
+                instance._set(instance.primary_key, pk_value)
+
+    def clear(self):
+        self.identity_map.clear()
+        self._new = []
+        self._deleted = {}
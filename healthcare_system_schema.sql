@@ -106,7 +106,7 @@ CREATE TABLE IF NOT EXISTS migrations (
 
 -- Index để tăng hiệu năng truy vấn
 CREATE INDEX IF NOT EXISTS idx_bacsi_chuyenkhoa ON BacSi(ChuyenKhoa);
-CREATE INDEX IF NOT EXISTS idx_lichkham_ngaykham ON LichKham(NgayKham);
+CREATE INDEX IF NOT EXISTS idx_lichkham_ngaykham_giokham ON LichKham(NgayKham, GioKham);
 CREATE INDEX IF NOT EXISTS idx_lichkham_mabs ON LichKham(MaBS);
 CREATE INDEX IF NOT EXISTS idx_lichkham_mabn ON LichKham(MaBN);
 CREATE INDEX IF NOT EXISTS idx_hosoba_mabn ON HoSoBenhAn(MaBN);
@@ -0,0 +1,73 @@
+"""
+Import patients or doctors from a CSV or XLSX file.
+
+Usage: python -m scripts.import_data <patients|doctors> <file> [--update] [--batch-size N]
+
+Rows are streamed from the file and written in batched transactions.
+Rows whose CMND already exists are skipped, or updated with --update.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from controllers.import_controller import ImportController
+
+def main():
+    args = []
+    update_existing = False
+    batch_size = 1000
+
+    argv = iter(sys.argv[1:])
+    for arg in argv:
+        if arg == '--update':
+            update_existing = True
+        elif arg == '--batch-size':
+            try:
+                batch_size = int(next(argv, ''))
+            except ValueError:
+                print("Error: --batch-size expects a number")
+                sys.exit(1)
+        else:
+            args.append(arg)
+
+    if len(args) < 2 or args[0] not in ('patients', 'doctors'):
+        print("Error: Import target and file path are required")
+        print(__doc__)
+        sys.exit(1)
+
+    target, path = args[0], args[1]
+
+    if not Path(path).exists():
+        print(f"Error: Import file not found: {path}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+
+    def report(result):
+        elapsed = time.perf_counter() - start
+        print(f"\r{result.processed} rows read, {result.written} written, "
+              f"{result.skipped} duplicates, {result.failed} invalid ({elapsed:.1f}s)", end="", flush=True)
+
+    controller = ImportController()
+    if target == 'patients':
+        result = controller.import_patients(path, update_existing, batch_size, report)
+    else:
+        result = controller.import_doctors(path, update_existing, batch_size, report)
+    print()
+
+    for row_number, errors in result.errors[:20]:
+        row_label = f"row {row_number}" if row_number is not None else "file"
+        print(f"  {row_label}: {errors}")
+    if result.failed > 20:
+        print(f"  ... and {result.failed - 20} more invalid rows")
+
+    print(f"Import finished: {result.written} {target} written, "
+          f"{result.skipped} duplicates skipped, {result.failed} rows rejected")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Rebuild or verify the trigger-maintained statistics tables.
+
+Usage: python -m scripts.rebuild_stats [--verify] [table ...]
+
+Without --verify every summary table is recomputed from its source table in
+one transaction. With --verify the tables are compared with a
+fresh recount and the command exits with status 1 if any row differs.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+parent_dir = str(Path(__file__).parent.parent)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from controllers.stats_controller import StatsController, SUMMARY_TABLES
+from database.db_manager import DatabaseError
+
+def main():
+    verify = False
+    tables = []
+
+    for arg in sys.argv[1:]:
+        if arg == '--verify':
+            verify = True
+        elif arg in SUMMARY_TABLES:
+            tables.append(arg)
+        else:
+            print(f"Error: Unknown statistics table: {arg}")
+            print(__doc__)
+            sys.exit(1)
+
+    controller = StatsController()
+    start = time.perf_counter()
+
+    try:
+        if verify:
+            mismatches = controller.verify_summaries(tables)
+        else:
+            rebuilt = controller.rebuild_summaries(tables)
+    except DatabaseError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+
+    if verify:
+        for table, count in mismatches.items():
+            status = "OK" if count == 0 else f"{count} rows differ"
+            print(f"  {table}: {status}")
+        if any(mismatches.values()):
+            print(f"Verification failed ({elapsed:.1f}s); run without --verify to rebuild")
+            sys.exit(1)
+        print(f"All statistics tables are up to date ({elapsed:.1f}s)")
+    else:
+        for table, count in rebuilt.items():
+            print(f"  {table}: {count} rows")
+        print(f"Statistics tables rebuilt ({elapsed:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from database.db_manager import DatabaseManager
+from database.db_setup import DatabaseSetup
+from benchmarks.fixtures import populate_people
+
+
+@pytest.fixture
+def db(tmp_path):
+    # A migrated database with a few patients and doctors, like the app's
+    db_file = str(tmp_path / "test.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        DatabaseSetup(DatabaseManager(db_file)).setup()
+    db = DatabaseManager(db_file, persistent=True)
+    populate_people(db, patients=20, doctors=3)
+    yield db
+    db.close()
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from controllers.schedule_controller import ScheduleController
+from controllers.stats_controller import StatsController
+from database.db_manager import IntegrityError
+from database.models import Appointment
+
+DAY = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+OTHER_DAY = (datetime.now() + timedelta(days=4)).strftime("%Y-%m-%d")
+
+
+def day_count(db, day):
+    row = db.fetch_one("SELECT SoLich FROM SoLichTheoNgay WHERE NgayKham = ?", (day,))
+    return row['SoLich'] if row else 0
+
+
+def doctor_count(db, doctor_id, day):
+    row = db.fetch_one("SELECT SoLich FROM SoLichTheoBacSi WHERE MaBS = ? AND NgayKham = ?", (doctor_id, day))
+    return row['SoLich'] if row else 0
+
+
+def assert_summaries_exact(db):
+    mismatches = StatsController(db).verify_summaries(["SoLichTheoNgay", "SoLichTheoBacSi"])
+    assert mismatches == {"SoLichTheoNgay": 0, "SoLichTheoBacSi": 0}
+
+
+def book(controller, doctor_id=1, day=DAY, time="08:00", patient_id=1):
+    return controller.add_appointment({'MaBN': patient_id, 'MaBS': doctor_id, 'NgayKham': day, 'GioKham': time})
+
+
+def appointment_id(db, doctor_id=1, day=DAY, time="08:00"):
+    return db.fetch_one(
+        "SELECT MaLichKham FROM LichKham WHERE MaBS = ? AND NgayKham = ? AND GioKham = ?",
+        (doctor_id, day, time)
+    )['MaLichKham']
+
+
+def update(controller, db, appointment, **changes):
+    # The form always sends every field of the appointment
+    row = db.fetch_one("SELECT MaBN, MaBS, NgayKham, GioKham, LydoKham, TrangThai FROM LichKham"
+                       " WHERE MaLichKham = ?", (appointment,))
+    return controller.update_appointment(appointment, dict(row, **changes))
+
+
+def test_book_cancel_restore_and_move_keep_counters(db):
+    controller = ScheduleController(db)
+
+    assert book(controller)
+    assert book(controller, doctor_id=2, time="08:30", patient_id=2)
+    assert (day_count(db, DAY), doctor_count(db, 1, DAY), doctor_count(db, 2, DAY)) == (2, 1, 1)
+    assert_summaries_exact(db)
+
+    first = appointment_id(db)
+    assert update(controller, db, first, TrangThai='Hủy')
+    assert (day_count(db, DAY), doctor_count(db, 1, DAY)) == (1, 0)
+    assert_summaries_exact(db)
+
+    assert update(controller, db, first, TrangThai='Chờ khám')
+    assert (day_count(db, DAY), doctor_count(db, 1, DAY)) == (2, 1)
+    assert_summaries_exact(db)
+
+    assert update(controller, db, first, MaBS=3, NgayKham=OTHER_DAY)
+    assert (day_count(db, DAY), doctor_count(db, 1, DAY)) == (1, 0)
+    assert (day_count(db, OTHER_DAY), doctor_count(db, 3, OTHER_DAY)) == (1, 1)
+    assert_summaries_exact(db)
+
+    assert controller.delete_appointment(first)
+    assert (day_count(db, OTHER_DAY), doctor_count(db, 3, OTHER_DAY)) == (0, 0)
+    assert_summaries_exact(db)
+
+
+def test_quota_is_read_from_the_counters(db):
+    controller = ScheduleController(db)
+    controller.max_appointments_per_doctor = 1
+
+    assert book(controller)
+    assert not book(controller, time="08:30", patient_id=2)
+    assert book(controller, doctor_id=2, time="08:30", patient_id=2)
+
+    # A cancelled appointment gives its place back
+    assert update(controller, db, appointment_id(db), TrangThai='Hủy')
+    assert book(controller, time="09:00", patient_id=3)
+    assert doctor_count(db, 1, DAY) == 1
+    assert_summaries_exact(db)
+
+
+def test_double_booking_is_rejected_by_the_slot_index(db):
+    controller = ScheduleController(db)
+
+    assert book(controller)
+    assert not book(controller, patient_id=2)
+    assert Appointment.book_slot({'MaBN': 3, 'MaBS': 1, 'NgayKham': DAY, 'GioKham': "08:00"}, db) is None
+
+    with pytest.raises(IntegrityError) as error:
+        with db:
+            db.insert('LichKham', {'MaBN': 4, 'MaBS': 1, 'NgayKham': DAY, 'GioKham': "08:00",
+                                   'TrangThai': 'Chờ khám'})
+    assert error.value.is_unique_violation
+
+    # Only the first booking was counted, and a cancelled slot can be taken again
+    assert (day_count(db, DAY), doctor_count(db, 1, DAY)) == (1, 1)
+    assert update(controller, db, appointment_id(db), TrangThai='Hủy')
+    assert book(controller, patient_id=2)
+    assert_summaries_exact(db)
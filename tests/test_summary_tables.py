@@ -0,0 +1,74 @@
+import random
+
+from controllers.schedule_controller import ScheduleController
+from controllers.stats_controller import StatsController, SUMMARY_TABLES
+
+STATUSES = ["Chờ khám", "Đang khám", "Đã khám", "Hủy", None]
+
+
+def no_mismatches():
+    return {table: 0 for table in SUMMARY_TABLES}
+
+
+def add_appointments(db, rows, seed=1):
+    rng = random.Random(seed)
+    with db.transaction():
+        db.executemany(
+            "INSERT INTO LichKham (MaBN, MaBS, NgayKham, GioKham, TrangThai) VALUES (?, ?, ?, ?, ?)",
+            [(rng.randint(1, 20), i % 3 + 1, f"2026-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"{i // 3:03d}",
+              rng.choice(STATUSES)) for i in range(rows)]
+        )
+
+
+def test_triggers_keep_summaries_exact_through_mixed_writes(db):
+    add_appointments(db, 300, seed=2)
+    controller = ScheduleController(db)
+    for appointment in db.fetch_all("SELECT MaLichKham FROM LichKham WHERE MaLichKham % 4 = 0"):
+        assert controller.create_medical_record(appointment['MaLichKham'], "Cảm cúm")
+
+    rng = random.Random(7)
+    with db.transaction():
+        for step in range(400):
+            appointments = [row['MaLichKham'] for row in db.fetch_all("SELECT MaLichKham FROM LichKham")]
+            records = [row['MaHoSo'] for row in db.fetch_all("SELECT MaHoSo FROM HoSoBenhAn")]
+            day = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+            action = rng.choice(["insert", "update", "move", "delete", "record", "record_update", "record_delete"])
+
+            if action == "insert":
+                # Distinct times keep clear of the unique slot index
+                db.execute(
+                    "INSERT INTO LichKham (MaBN, MaBS, NgayKham, GioKham, TrangThai) VALUES (?, ?, ?, ?, ?)",
+                    (rng.randint(1, 20), rng.choice([1, 2, 3, None]), day, f"{step:04d}", rng.choice(STATUSES))
+                )
+            elif action == "update" and appointments:
+                db.execute("UPDATE LichKham SET TrangThai = ? WHERE MaLichKham = ?",
+                           (rng.choice(STATUSES), rng.choice(appointments)))
+            elif action == "move" and appointments:
+                db.execute("UPDATE LichKham SET MaBS = ?, NgayKham = ?, GioKham = ? WHERE MaLichKham = ?",
+                           (rng.randint(1, 3), rng.choice([day, None]), f"{step:04d}", rng.choice(appointments)))
+            elif action == "delete" and appointments:
+                db.execute("DELETE FROM LichKham WHERE MaLichKham = ?", (rng.choice(appointments),))
+            elif action == "record":
+                db.insert('HoSoBenhAn', {'MaBN': rng.randint(1, 20), 'MaBS': rng.randint(1, 3),
+                                         'NgayKham': day, 'ChanDoan': "Viêm họng"})
+            elif action == "record_update" and records:
+                db.execute("UPDATE HoSoBenhAn SET MaBS = ?, NgayKham = ? WHERE MaHoSo = ?",
+                           (rng.choice([1, 2, 3, None]), day, rng.choice(records)))
+            elif action == "record_delete" and records:
+                db.execute("DELETE FROM HoSoBenhAn WHERE MaHoSo = ?", (rng.choice(records),))
+
+    assert StatsController(db).verify_summaries() == no_mismatches()
+
+
+def test_rebuild_repairs_drifted_summaries(db):
+    add_appointments(db, 100)
+    stats = StatsController(db)
+    with db.transaction():
+        db.execute("UPDATE SoLichTheoNgay SET SoLich = SoLich + 1")
+        db.execute("DELETE FROM ThongKeLichKhamThang")
+
+    mismatches = stats.verify_summaries()
+    assert mismatches["SoLichTheoNgay"] > 0 and mismatches["ThongKeLichKhamThang"] > 0
+
+    stats.rebuild_summaries()
+    assert stats.verify_summaries() == no_mismatches()
@@ -0,0 +1,146 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BackgroundTask:
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+        self.future = None
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        # A task that already started keeps running on its worker; its result
+        # is simply never delivered
+        self._cancelled.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+class BackgroundRunner:
+
+    # Shared by every runner: database calls are I/O bound and the
+    # connection pool only has a few readers, so a small pool is enough
+    _executor = None
+    _executor_lock = threading.Lock()
+    max_workers = 4
+
+    def __init__(self, widget, poll_interval: int = 30,
+                 on_busy_change: Callable[[bool], None] = None):
+        self.widget = widget
+        self.poll_interval = poll_interval
+        self.on_busy_change = on_busy_change
+
+        self._results = queue.Queue()
+        self._pending = {}
+        self._keys: Dict[str, BackgroundTask] = {}
+        self._polling = False
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=cls.max_workers,
+                                                       thread_name_prefix="background")
+        return cls._executor
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._pending)
+
+    def submit(self, func: Callable[..., Any], *args,
+               on_success: Callable[[Any], None] = None,
+               on_error: Callable[[Exception], None] = None,
+               key: str = None, **kwargs) -> BackgroundTask:
+        # Must be called from the Tk thread. A task submitted with the key of
+        # a task still in flight supersedes it.
+        task = BackgroundTask(key)
+        was_busy = self.busy
+        self._pending[task] = (on_success, on_error)
+        if key is not None:
+            if key in self._keys:
+                self.cancel(self._keys[key])
+            self._keys[key] = task
+
+        def run():
+            if task.cancelled:
+                return
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((task, None, e))
+            else:
+                self._results.put((task, result, None))
+
+        task.future = self._get_executor().submit(run)
+
+        if not was_busy:
+            self._notify_busy(True)
+        self._schedule_poll()
+        return task
+
+    def cancel(self, task: BackgroundTask = None):
+        # Cancel one task, or every pending task when none is given
+        tasks = [task] if task is not None else list(self._pending)
+        for pending in tasks:
+            pending.cancel()
+            self._finish(pending)
+
+    def cancel_key(self, key: str):
+        task = self._keys.get(key)
+        if task is not None:
+            self.cancel(task)
+
+    def _finish(self, task: BackgroundTask):
+        self._pending.pop(task, None)
+        if task.key is not None and self._keys.get(task.key) is task:
+            del self._keys[task.key]
+        if not self.busy:
+            self._notify_busy(False)
+
+    def _notify_busy(self, busy: bool):
+        if self.on_busy_change is not None:
+            self.on_busy_change(busy)
+
+    def _schedule_poll(self):
+        if self._polling:
+            return
+        self._polling = True
+        try:
+            self.widget.after(self.poll_interval, self._poll)
+        except Exception:
+            # The widget is gone; nothing is left to deliver results to
+            self._polling = False
+            self.cancel()
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            callbacks = self._pending.get(task)
+            if callbacks is None or task.cancelled:
+                continue
+            self._finish(task)
+
+            on_success, on_error = callbacks
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    print(f"Error in background task: {error}")
+            elif on_success is not None:
+                on_success(result)
+
+        if self._pending:
+            self._schedule_poll()
@@ -1,6 +1,7 @@
 import os
 import hashlib
 import re
+import unicodedata
 from datetime import datetime, timedelta
 import calendar
 import uuid
@@ -22,31 +23,121 @@ def verify_password(plain_password, hashed_password):
     return calculated_hash == hash_value
 
 
+_VIETNAMESE_FOLD = str.maketrans({
+    'à': 'a', 'á': 'a', 'ả': 'a', 'ã': 'a', 'ạ': 'a',
+    'ă': 'a', 'ằ': 'a', 'ắ': 'a', 'ẳ': 'a', 'ẵ': 'a', 'ặ': 'a',
+    'â': 'a', 'ầ': 'a', 'ấ': 'a', 'ẩ': 'a', 'ẫ': 'a', 'ậ': 'a',
+    'đ': 'd',
+    'è': 'e', 'é': 'e', 'ẻ': 'e', 'ẽ': 'e', 'ẹ': 'e',
+    'ê': 'e', 'ề': 'e', 'ế': 'e', 'ể': 'e', 'ễ': 'e', 'ệ': 'e',
+    'ì': 'i', 'í': 'i', 'ỉ': 'i', 'ĩ': 'i', 'ị': 'i',
+    'ò': 'o', 'ó': 'o', 'ỏ': 'o', 'õ': 'o', 'ọ': 'o',
+    'ô': 'o', 'ồ': 'o', 'ố': 'o', 'ổ': 'o', 'ỗ': 'o', 'ộ': 'o',
+    'ơ': 'o', 'ờ': 'o', 'ớ': 'o', 'ở': 'o', 'ỡ': 'o', 'ợ': 'o',
+    'ù': 'u', 'ú': 'u', 'ủ': 'u', 'ũ': 'u', 'ụ': 'u',
+    'ư': 'u', 'ừ': 'u', 'ứ': 'u', 'ử': 'u', 'ữ': 'u', 'ự': 'u',
+    'ỳ': 'y', 'ý': 'y', 'ỷ': 'y', 'ỹ': 'y', 'ỵ': 'y',
+    # Combining tone and vowel marks, for text typed in decomposed form
+    '\u0300': None, '\u0301': None, '\u0303': None, '\u0309': None, '\u0323': None,
+    '\u0302': None, '\u0306': None, '\u031b': None,
+})
+
 def normalize_vietnamese_name(name):
-    name = name.strip()
-    
-    def normalize_char(c):
-        mapping = {
-            'à': 'a', 'á': 'a', 'ả': 'a', 'ã': 'a', 'ạ': 'a',
-            'ă': 'a', 'ằ': 'a', 'ắ': 'a', 'ẳ': 'a', 'ẵ': 'a', 'ặ': 'a',
-            'â': 'a', 'ầ': 'a', 'ấ': 'a', 'ẩ': 'a', 'ẫ': 'a', 'ậ': 'a',
-            'đ': 'd',
-            'è': 'e', 'é': 'e', 'ẻ': 'e', 'ẽ': 'e', 'ẹ': 'e',
-            'ê': 'e', 'ề': 'e', 'ế': 'e', 'ể': 'e', 'ễ': 'e', 'ệ': 'e',
-            'ì': 'i', 'í': 'i', 'ỉ': 'i', 'ĩ': 'i', 'ị': 'i',
-            'ò': 'o', 'ó': 'o', 'ỏ': 'o', 'õ': 'o', 'ọ': 'o',
-            'ô': 'o', 'ồ': 'o', 'ố': 'o', 'ổ': 'o', 'ỗ': 'o', 'ộ': 'o',
-            'ơ': 'o', 'ờ': 'o', 'ớ': 'o', 'ở': 'o', 'ỡ': 'o', 'ợ': 'o',
-            'ù': 'u', 'ú': 'u', 'ủ': 'u', 'ũ': 'u', 'ụ': 'u',
-            'ư': 'u', 'ừ': 'u', 'ứ': 'u', 'ử': 'u', 'ữ': 'u', 'ự': 'u',
-            'ỳ': 'y', 'ý': 'y', 'ỷ': 'y', 'ỹ': 'y', 'ỵ': 'y'
-        }
-        if c.lower() in mapping:
-            return mapping[c.lower()]
-        return c.lower()
-    
-    normalized = ''.join(normalize_char(c) for c in name)
-    return normalized
+    return name.strip().lower().translate(_VIETNAMESE_FOLD)
+
+def build_search_key(text):
+    if text is None:
+        return None
+    return " ".join(normalize_vietnamese_name(text).split())
+
+def build_fts_query(term):
+    # Words are folded like the indexed search key and quoted so user input
+    # never reaches the FTS5 query syntax, then ANDed together. Only the
+    # last word, the one still being typed, is a prefix match; the earlier
+    # ones are complete words and look up a single posting list instead of
+    # merging every term they prefix.
+    tokens = re.findall(r"\w+", unicodedata.normalize("NFC", term or "").lower())
+    if not tokens:
+        return ""
+
+    quoted = []
+    for index, token in enumerate(tokens):
+        star = "*" if index == len(tokens) - 1 else ""
+        folded = token.translate(_VIETNAMESE_FOLD)
+        if 'đ' in token:
+            # The FTS tokenizer folds tone marks but not đ, so columns indexed
+            # as typed (hometown, specialty) still need the original spelling
+            quoted.append(f'("{folded}"{star} OR "{token}"{star})')
+        else:
+            quoted.append(f'"{folded}"{star}')
+    return " AND ".join(quoted)
+
+# The FTS tokenizer strips tone and vowel marks but keeps đ as its own letter
+_TONE_FOLD = str.maketrans({k: v for k, v in _VIETNAMESE_FOLD.items() if k != ord('đ')})
+
+def search_tokens(text):
+    # Words of a value as the FTS index sees them
+    if text is None:
+        return []
+    normalized = unicodedata.normalize("NFC", str(text)).lower()
+    return [token.translate(_TONE_FOLD) for token in re.findall(r"\w+", normalized)]
+
+def search_matches(term, tokens):
+    # In-memory counterpart of MATCH build_fts_query(term) over tokens
+    words = re.findall(r"\w+", unicodedata.normalize("NFC", term or "").lower())
+    if not words:
+        return False
+
+    for index, word in enumerate(words):
+        spellings = {word.translate(_VIETNAMESE_FOLD), word.translate(_TONE_FOLD)}
+        if index == len(words) - 1:
+            found = any(token.startswith(spelling) for token in tokens for spelling in spellings)
+        else:
+            found = any(token in spellings for token in tokens)
+        if not found:
+            return False
+    return True
+
+# Vietnamese alphabet order (a < ă < â < b ... d < đ ...), with the Latin
+# letters Vietnamese does not use slotted in where English puts them. Letters
+# are mapped to private-use characters so digits and punctuation sort first.
+_VIETNAMESE_ALPHABET = "aăâbcdđeêfghijklmnoôơpqrstuưvwxyz"
+_VIETNAMESE_COLLATE = str.maketrans({
+    letter: chr(0xE000 + index) for index, letter in enumerate(_VIETNAMESE_ALPHABET)
+})
+# Tones in dictionary order: ngang, huyền, hỏi, ngã, sắc, nặng
+_VIETNAMESE_TONES = {'\u0300': 1, '\u0309': 2, '\u0303': 3, '\u0301': 4, '\u0323': 5}
+
+def vietnamese_sort_key(text):
+    # Compares letters first, then the tone of each letter, then the text
+    # itself so that different spellings never compare equal
+    if text is None:
+        return ("", (), "")
+
+    text = str(text)
+    tones = []
+    letters = []
+    for char in unicodedata.normalize("NFD", text.strip().lower()):
+        tone = _VIETNAMESE_TONES.get(char)
+        if tone is not None:
+            if tones:
+                tones[-1] = tone
+        else:
+            if not unicodedata.combining(char):
+                tones.append(0)
+            letters.append(char)
+
+    primary = unicodedata.normalize("NFC", "".join(letters)).translate(_VIETNAMESE_COLLATE)
+    return (primary, tuple(tones), text)
+
+def build_sort_key(text):
+    # vietnamese_sort_key as one string whose plain (BINARY) order is the same,
+    # so an index on it serves ORDER BY in Vietnamese alphabet order. The
+    # parts are joined with \x01, which sorts before every character in them.
+    if text is None:
+        return None
+    primary, tones, original = vietnamese_sort_key(text)
+    return f"{primary}\x01{''.join(map(str, tones))}\x01{original}"
 
 def format_date(date_str, input_format="%Y-%m-%d", output_format="%d/%m/%Y"):
     try:
@@ -0,0 +1,56 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+Refine = Callable[[str, str, List[tuple]], Optional[List[tuple]]]
+
+
+class SearchCache:
+
+    def __init__(self, refine: Refine, max_entries: int = 32, max_hits: int = 1000):
+        # Entries hold the matches of a term as compact hit tuples (the key
+        # first, see Model.search_keys), at most max_hits of them. refine(term,
+        # previous, hits) narrows the hits of a cached term that term extends,
+        # or returns None when only the database can answer.
+        self.refine = refine
+        self.max_entries = max_entries
+        self.max_hits = max_hits
+        self._entries: "OrderedDict[str, Tuple[Tuple[tuple, ...], bool]]" = OrderedDict()
+        # Hits are stored from background workers
+        self._lock = threading.Lock()
+
+    def get(self, term: str) -> Optional[Tuple[tuple, ...]]:
+        with self._lock:
+            entry = self._entries.get(term)
+            if entry is not None:
+                self._entries.move_to_end(term)
+                return entry[0]
+
+            # Typing "ngu" then "nguy" narrows the longest cached prefix, but
+            # only a complete result holds every match of the longer term
+            prefixes = sorted((t for t, (_, complete) in self._entries.items()
+                               if complete and term.startswith(t)), key=len, reverse=True)
+            candidates = [(previous, self._entries[previous][0]) for previous in prefixes]
+
+        for previous, hits in candidates:
+            refined = self.refine(term, previous, list(hits))
+            if refined is not None:
+                self.put(term, refined, complete=True)
+                return tuple(refined[:self.max_hits])
+        return None
+
+    def put(self, term: str, hits: List[tuple], complete: bool):
+        # complete says hits are all the matches of term rather than the
+        # first ones; a longer list is cut to max_hits and is then incomplete
+        with self._lock:
+            self._entries[term] = (tuple(hits[:self.max_hits]), complete and len(hits) <= self.max_hits)
+            self._entries.move_to_end(term)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -5,6 +5,8 @@ from PIL import Image, ImageTk
 from pathlib import Path
 from typing import Dict, Any, Callable, Optional, Union, List, Tuple
 
+from utils.background import BackgroundRunner
+
 class BaseView:
     def __init__(self, parent: tk.Widget, padding: int = 10):
         self.parent = parent
@@ -19,6 +21,59 @@ class BaseView:
         self.parent.bind("<Configure>", self._on_window_resize)
         
         self.images = {}
+        self._loading_label = None
+        self._debounced = {}
+        self.background = BackgroundRunner(self.frame, on_busy_change=self._set_loading)
+    
+    def run_in_background(self, func: Callable, *args, on_success: Callable = None,
+                          on_error: Callable = None, key: str = None, **kwargs):
+        # Keeps database calls off the Tk thread; on_success/on_error run on it
+        return self.background.submit(func, *args, on_success=on_success,
+                                      on_error=on_error, key=key, **kwargs)
+    
+    def debounce(self, key: str, delay: int, func: Callable):
+        # Runs func once no call with the same key has come in for delay ms
+        after_id = self._debounced.pop(key, None)
+        if after_id is not None:
+            self.frame.after_cancel(after_id)
+        
+        def run():
+            self._debounced.pop(key, None)
+            func()
+        
+        self._debounced[key] = self.frame.after(delay, run)
+    
+    def bind_search_as_you_type(self, entry: tk.Widget, search: Callable, delay: int = 300):
+        last_text = [entry.get()]
+        
+        def on_key(event):
+            # Arrow keys, Shift and the like do not change the text
+            text = entry.get()
+            if text != last_text[0]:
+                last_text[0] = text
+                self.debounce(str(entry), delay, search)
+        
+        def on_return(event):
+            last_text[0] = entry.get()
+            self.debounce(str(entry), 0, search)
+        
+        entry.bind("<KeyRelease>", on_key, add="+")
+        entry.bind("<Return>", on_return, add="+")
+    
+    def _set_loading(self, loading: bool):
+        if not self.frame.winfo_exists():
+            return
+        
+        if loading:
+            if self._loading_label is None or not self._loading_label.winfo_exists():
+                self._loading_label = ttk.Label(self.frame, text="Đang tải...")
+            self._loading_label.place(relx=1.0, rely=0.0, anchor="ne")
+            self._loading_label.lift()
+            self.frame.configure(cursor="watch")
+        else:
+            if self._loading_label is not None and self._loading_label.winfo_exists():
+                self._loading_label.place_forget()
+            self.frame.configure(cursor="")
     
     def _on_window_resize(self, event):
         if (event.width != self._window_width or 
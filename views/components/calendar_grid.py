@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Calendar Grid - Appointment slots for one day, a heatmap of slots for several
+days side by side, and a month heatmap
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+
+WEEKDAY_NAMES = ("T2", "T3", "T4", "T5", "T6", "T7", "CN")
+
+
+def _heat_color(count: int, max_count: int) -> Tuple[str, str]:
+    """Return (background, foreground) for a count, darker for busier cells"""
+    if not count or not max_count:
+        return "#FFFFFF", "#000000"
+    ratio = min(count / max_count, 1.0)
+    low, high = (220, 235, 250), (31, 95, 168)
+    red, green, blue = (round(l + (h - l) * ratio) for l, h in zip(low, high))
+    return f"#{red:02x}{green:02x}{blue:02x}", "#FFFFFF" if ratio > 0.5 else "#000000"
+
+
+class CalendarGrid:
+    """
+    Time slot grid whose widgets are created once and reused for every date
+
+    Switching dates only changes label texts. Buttons and cells are bound to
+    fixed handlers that look up what they currently show, so no Tcl command
+    is registered per render.
+    """
+
+    def __init__(self, parent: tk.Widget, start_hour: int = 8, end_hour: int = 18,
+                 slot_minutes: int = 30,
+                 on_add: Optional[Callable[[str, str], None]] = None,
+                 on_edit: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_select_day: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the calendar grid
+
+        Args:
+            parent: Parent widget
+            start_hour: Hour of the first slot
+            end_hour: Hour at which the last slot ends
+            slot_minutes: Length of a slot in minutes
+            on_add: Called with (date, time) when an empty slot is chosen
+            on_edit: Called with the appointment when a booked slot is chosen
+            on_select_day: Called with the date when a month mode day or a
+                booked multi-day cell is chosen
+        """
+        self.on_add = on_add
+        self.on_edit = on_edit
+        self.on_select_day = on_select_day
+        self.slot_minutes = slot_minutes
+        self._start_minutes = start_hour * 60
+        self.slots = [
+            f"{minutes // 60:02d}:{minutes % 60:02d}"
+            for minutes in range(start_hour * 60, end_hour * 60, slot_minutes)
+        ]
+
+        self.frame = ttk.Frame(parent)
+        self.mode = None
+        self.dates: List[str] = []
+
+        # Day mode: a pool of lines, one per appointment or empty slot
+        self._day_frame = ttk.Frame(self.frame)
+        self._lines = []
+        self._line_entries: List[Tuple[str, Optional[Dict[str, Any]]]] = []
+        self._create_day_header()
+
+        # Multi-day mode: one cell per slot and day, created on first use
+        self._days_frame = ttk.Frame(self.frame)
+        self._day_headers = []
+        self._cells = []
+        self._cell_counts: Dict[Tuple[int, int], int] = {}
+
+        # Month mode: six weeks of day cells, created on first use
+        self._month_frame = ttk.Frame(self.frame)
+        self._month_cells = []
+        self._month_dates: List[Optional[str]] = []
+
+    def _create_day_header(self):
+        """Create the column headings of the day mode"""
+        header = ttk.Frame(self._day_frame)
+        header.pack(fill=tk.X, pady=(0, 10))
+
+        for text, width in (("Thời gian", 10), ("Bác sĩ", 20), ("Bệnh nhân", 20), ("Lý do khám", 30)):
+            ttk.Label(header, text=text, width=width, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
+
+    def _get_line(self, index: int) -> Dict[str, ttk.Widget]:
+        """Return the widgets of a day mode line, creating it the first time"""
+        while len(self._lines) <= index:
+            line_index = len(self._lines)
+            row = ttk.Frame(self._day_frame)
+            line = {"row": row}
+            for name, width in (("time", 10), ("doctor", 20), ("patient", 20), ("reason", 30)):
+                line[name] = ttk.Label(row, width=width)
+                line[name].pack(side=tk.LEFT, padx=5)
+            line["button"] = ttk.Button(
+                row,
+                width=8,
+                command=lambda i=line_index: self._on_line_button(i)
+            )
+            line["button"].pack(side=tk.RIGHT, padx=5)
+            self._lines.append(line)
+        return self._lines[index]
+
+    def _create_days_grid(self, day_count: int):
+        """Create the headers and cells of the multi-day mode for day_count days"""
+        if len(self._day_headers) >= day_count:
+            return
+
+        if not self._day_headers:
+            ttk.Label(self._days_frame, text="Thời gian", font=("Arial", 10, "bold")).grid(
+                row=0, column=0, padx=2, pady=2, sticky="nsew")
+            for row, slot in enumerate(self.slots, start=1):
+                ttk.Label(self._days_frame, text=slot, width=8).grid(row=row, column=0, padx=2, sticky="nsew")
+                self._cells.append([])
+
+        for column in range(len(self._day_headers), day_count):
+            header = ttk.Label(self._days_frame, font=("Arial", 10, "bold"), anchor="center")
+            header.grid(row=0, column=column + 1, padx=2, pady=2, sticky="nsew")
+            self._day_headers.append(header)
+            self._days_frame.columnconfigure(column + 1, weight=1, uniform="day")
+
+            for slot_index, cells in enumerate(self._cells):
+                cell = tk.Label(self._days_frame, anchor="w", relief="groove", bg="#FFFFFF", padx=4)
+                cell.grid(row=slot_index + 1, column=column + 1, sticky="nsew")
+                cell.bind("<Button-1>", lambda event, r=slot_index, c=column: self._on_cell_click(r, c))
+                cells.append(cell)
+
+    def _create_month_grid(self):
+        """Create the weekday headers and day cells of the month mode"""
+        if self._month_cells:
+            return
+
+        for column, name in enumerate(WEEKDAY_NAMES):
+            ttk.Label(self._month_frame, text=name, font=("Arial", 10, "bold"), anchor="center").grid(
+                row=0, column=column, padx=2, pady=2, sticky="nsew")
+            self._month_frame.columnconfigure(column, weight=1, uniform="weekday")
+
+        for index in range(6 * 7):
+            row, column = divmod(index, 7)
+            cell = tk.Label(self._month_frame, anchor="nw", justify="left", relief="groove", padx=4, pady=4)
+            cell.grid(row=row + 1, column=column, sticky="nsew")
+            cell.bind("<Button-1>", lambda event, i=index: self._on_month_click(i))
+            self._month_frame.rowconfigure(row + 1, weight=1, uniform="week")
+            self._month_cells.append(cell)
+
+    def slot_index(self, time_str: str) -> Optional[int]:
+        """
+        Return the index of the slot containing a time
+
+        Args:
+            time_str: Time in HH:MM format
+
+        Returns:
+            Slot index, or None when the time is outside the grid
+        """
+        try:
+            hour, minute = str(time_str).split(":")[:2]
+            minutes = int(hour) * 60 + int(minute)
+        except ValueError:
+            return None
+
+        index = (minutes - self._start_minutes) // self.slot_minutes
+        return index if 0 <= index < len(self.slots) else None
+
+    def _group_by_slot(self, appointments: List[Dict[str, Any]]) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+        """Group appointments by (date, slot index)"""
+        grouped = {}
+        for appt in appointments:
+            index = self.slot_index(appt.get("GioKham", ""))
+            if index is not None:
+                grouped.setdefault((appt.get("NgayKham"), index), []).append(appt)
+        return grouped
+
+    def _show_mode(self, mode: str):
+        """Show the frame of a mode and hide the other"""
+        if self.mode == mode:
+            return
+        self.mode = mode
+        frames = {"day": self._day_frame, "days": self._days_frame, "month": self._month_frame}
+        for frame in frames.values():
+            frame.pack_forget()
+        frames[mode].pack(fill=tk.BOTH, expand=True)
+
+    def show_day(self, date: str, appointments: List[Dict[str, Any]]):
+        """
+        Show the slots of one day
+
+        Args:
+            date: Date in YYYY-MM-DD format
+            appointments: Appointments of that day
+        """
+        self._show_mode("day")
+        self.dates = [date]
+        grouped = self._group_by_slot(appointments)
+
+        # (time shown, slot, appointment); extra appointments of a slot get
+        # their own line with the time left blank
+        entries = []
+        for index, slot in enumerate(self.slots):
+            booked = grouped.get((date, index))
+            if not booked:
+                entries.append((slot, slot, None))
+                continue
+            for i, appt in enumerate(booked):
+                entries.append((slot if i == 0 else "", slot, appt))
+        self._line_entries = [(slot, appt) for _, slot, appt in entries]
+
+        for index, (time, _, appt) in enumerate(entries):
+            line = self._get_line(index)
+            line["time"].configure(text=time)
+            line["doctor"].configure(text=appt.get("TenBacSi", "") if appt else "")
+            line["patient"].configure(text=appt.get("TenBenhNhan", "") if appt else "")
+            line["reason"].configure(text=appt.get("LydoKham", "") if appt else "")
+            line["button"].configure(text="Sửa" if appt else "+")
+            if not line["row"].winfo_manager():
+                line["row"].pack(fill=tk.X, pady=2)
+
+        for line in self._lines[len(entries):]:
+            line["row"].pack_forget()
+
+    def show_days(self, dates: List[str], counts: Dict[Tuple[str, str], int]):
+        """
+        Show several days side by side, e.g. a week, as a heatmap of slots
+
+        Args:
+            dates: Dates in YYYY-MM-DD format, one column each
+            counts: Number of appointments per (date, time); only counts are
+                shown, a booked cell opens its day through on_select_day
+        """
+        self._show_mode("days")
+        self._create_days_grid(len(dates))
+        self.dates = list(dates)
+        grouped = {}
+        for (date, time), count in counts.items():
+            index = self.slot_index(time)
+            if index is not None:
+                grouped[(date, index)] = grouped.get((date, index), 0) + count
+        busiest = max(grouped.values(), default=0)
+        self._cell_counts = {}
+
+        for column, header in enumerate(self._day_headers):
+            if column >= len(dates):
+                header.grid_remove()
+                for cells in self._cells:
+                    cells[column].grid_remove()
+                continue
+
+            total = sum(grouped.get((dates[column], row), 0) for row in range(len(self._cells)))
+            text = self._format_day(dates[column])
+            header.configure(text=f"{text}\n{total} lịch" if total else text)
+            header.grid()
+            for row, cells in enumerate(self._cells):
+                count = grouped.get((dates[column], row), 0)
+                self._cell_counts[(row, column)] = count
+                background, foreground = _heat_color(count, busiest)
+                cells[column].configure(text=f"{count} lịch" if count else "", bg=background, fg=foreground)
+                cells[column].grid()
+
+    def show_month(self, dates: List[str], counts: Dict[str, int]):
+        """
+        Show a month as a heatmap of appointments per day
+
+        Args:
+            dates: Dates of the month in YYYY-MM-DD format, in order
+            counts: Number of appointments per date
+        """
+        self._show_mode("month")
+        self._create_month_grid()
+        self.dates = list(dates)
+
+        # Weeks start on Monday, like get_week_dates
+        offset = datetime.strptime(dates[0], "%Y-%m-%d").weekday() if dates else 0
+        self._month_dates = [None] * offset + list(dates)
+        self._month_dates += [None] * (len(self._month_cells) - len(self._month_dates))
+        busiest = max(counts.values(), default=0)
+
+        for cell, date in zip(self._month_cells, self._month_dates):
+            if date is None:
+                cell.configure(text="", bg="#F0F0F0", fg="#000000")
+                continue
+            count = counts.get(date, 0)
+            background, foreground = _heat_color(count, busiest)
+            text = f"{int(date[8:])}\n{count} lịch" if count else str(int(date[8:]))
+            cell.configure(text=text, bg=background, fg=foreground)
+
+    def _format_day(self, date: str) -> str:
+        """Format a date for a column header"""
+        try:
+            return datetime.strptime(date, "%Y-%m-%d").strftime("%a %d/%m")
+        except ValueError:
+            return date
+
+    def _on_line_button(self, index: int):
+        """Handle the button of a day mode line"""
+        if index >= len(self._line_entries):
+            return
+        time, appt = self._line_entries[index]
+        if appt is not None:
+            if self.on_edit:
+                self.on_edit(appt)
+        elif self.on_add:
+            self.on_add(self.dates[0], time)
+
+    def _on_cell_click(self, row: int, column: int):
+        """Handle a click on a multi-day cell"""
+        if column >= len(self.dates):
+            return
+        if self._cell_counts.get((row, column)):
+            if self.on_select_day:
+                self.on_select_day(self.dates[column])
+        elif self.on_add:
+            self.on_add(self.dates[column], self.slots[row])
+
+    def _on_month_click(self, index: int):
+        """Handle a click on a month mode day"""
+        if index < len(self._month_dates) and self._month_dates[index] and self.on_select_day:
+            self.on_select_day(self._month_dates[index])
@@ -7,12 +7,540 @@ Data Table Component - Reusable data table with sorting and filtering
 
 import tkinter as tk
 from tkinter import ttk
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import List, Tuple, Dict, Any, Callable, Optional
 
+from utils.helpers import vietnamese_sort_key
+
+
+def _parse_sort_date(value: str) -> Tuple[int, int, int]:
+    """Parse yyyy-mm-dd or dd/mm/yyyy (ignoring any time part) to a (y, m, d) tuple"""
+    text = str(value).strip().split(" ")[0]
+    if "/" in text:
+        day, month, year = text.split("/")
+    else:
+        year, month, day = text.split("-")
+    return int(year), int(month), int(day)
+
+
+def _typed_sort_key(parse: Callable[[Any], Any]) -> Callable[[Any], tuple]:
+    """Wrap a parser so empty values sort first and unparsable ones last"""
+    def key(value):
+        if value is None or value == "":
+            return (0,)
+        try:
+            return (1, parse(value))
+        except (ValueError, TypeError):
+            return (2, str(value))
+    return key
+
+
+# Sort key per column type; treeview values come back as strings, so every
+# key parses its value instead of relying on the Python type
+SORT_KEYS = {
+    "text": _typed_sort_key(vietnamese_sort_key),
+    "int": _typed_sort_key(int),
+    "float": _typed_sort_key(float),
+    "date": _typed_sort_key(_parse_sort_date),
+}
+
+
+def sort_rows(rows: List[Any], order: List[Tuple[int, bool]],
+              sort_keys: Dict[int, Callable[[Any], Any]],
+              values: Callable[[Any], tuple] = None):
+    """
+    Stable in-place sort of value tuples by several columns
+    
+    Args:
+        rows: Rows to sort
+        order: (column_index, reverse) pairs, most significant first
+        sort_keys: Sort key function for each column index in order
+        values: Function returning the value tuple of an item of rows, when
+            the items are not value tuples themselves
+    """
+    if not order:
+        return
+    values = values or (lambda row: row)
+    
+    if len({reverse for _, reverse in order}) == 1:
+        # Same direction everywhere: one pass with a combined key
+        rows.sort(
+            key=lambda row: tuple(sort_keys[index](values(row)[index]) for index, _ in order),
+            reverse=order[0][1]
+        )
+        return
+    
+    # Mixed directions: one stable pass per column, least significant first
+    for index, reverse in reversed(order):
+        key = sort_keys[index]
+        rows.sort(key=lambda row: key(values(row)[index]), reverse=reverse)
+
+
+_DELETED = object()
+
+
+class RowStore:
+    """
+    Rows in display order with constant-time lookup by key
+    
+    A deleted row leaves a tombstone instead of shifting the rows after it,
+    so the key index never has to be rebuilt; a Fenwick tree over the live
+    rows turns a display index into a slot and back in O(log n). The list
+    is compacted once half of it is tombstones.
+    """
+    
+    def __init__(self, rows: List[tuple] = (), key: Optional[Callable[[tuple], Any]] = None):
+        """
+        Initialize the store
+        
+        Args:
+            rows: Rows in display order
+            key: Function returning the unique key of a row; without one every
+                row gets a generated handle
+            
+        Raises:
+            ValueError: If two rows have the same key
+        """
+        self.key = key
+        self._next_handle = 0
+        rows = list(rows)
+        self._load(rows, self._new_handles(rows))
+    
+    def _new_handles(self, rows: List[tuple]) -> List[Any]:
+        if self.key is not None:
+            return [self.key(row) for row in rows]
+        start = self._next_handle
+        self._next_handle += len(rows)
+        return list(range(start, self._next_handle))
+    
+    def _load(self, rows: List[tuple], handles: List[Any]):
+        self._slots = rows
+        self._handles = handles
+        self._positions = {handle: slot for slot, handle in enumerate(handles)}
+        if len(self._positions) != len(handles):
+            seen = set()
+            duplicate = next(handle for handle in handles if handle in seen or seen.add(handle))
+            raise ValueError(f"Duplicate row key: {duplicate!r}")
+        self._deleted = 0
+        # Every slot is live, so each node holds the size of its range
+        self._tree = [i & -i for i in range(len(rows) + 1)]
+    
+    def _update(self, slot: int, delta: int):
+        i = slot + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+    
+    def _live_before(self, slot: int) -> int:
+        count = 0
+        i = slot
+        while i > 0:
+            count += self._tree[i]
+            i -= i & -i
+        return count
+    
+    def _slot(self, index: int) -> int:
+        """Return the slot of the index-th live row"""
+        if not self._deleted:
+            return index
+        slot = 0
+        remaining = index + 1
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            if slot + step < len(self._tree) and self._tree[slot + step] < remaining:
+                slot += step
+                remaining -= self._tree[slot]
+            step >>= 1
+        return slot
+    
+    def __len__(self) -> int:
+        return len(self._slots) - self._deleted
+    
+    def __iter__(self):
+        return (row for row in self._slots if row is not _DELETED)
+    
+    def __contains__(self, handle) -> bool:
+        return handle in self._positions
+    
+    def items(self):
+        """Yield (handle, row) pairs in display order"""
+        return ((handle, row) for handle, row in zip(self._handles, self._slots) if row is not _DELETED)
+    
+    def rows(self) -> List[tuple]:
+        """Return the live rows as a new list"""
+        return list(self)
+    
+    def get(self, handle) -> Optional[tuple]:
+        """Return the row stored under a handle, or None"""
+        slot = self._positions.get(handle)
+        return None if slot is None else self._slots[slot]
+    
+    def window(self, start: int, count: int) -> List[tuple]:
+        """Return up to count rows from display index start"""
+        if not self._deleted:
+            return self._slots[start:start + count]
+        if start >= len(self) or count <= 0:
+            return []
+        rows = []
+        slot = self._slot(start)
+        while len(rows) < count and slot < len(self._slots):
+            if self._slots[slot] is not _DELETED:
+                rows.append(self._slots[slot])
+            slot += 1
+        return rows
+    
+    def index_of(self, handle) -> Optional[int]:
+        """Return the display index of a row, or None if it is not stored"""
+        slot = self._positions.get(handle)
+        if slot is None or not self._deleted:
+            return slot
+        return self._live_before(slot)
+    
+    def handle_at(self, index: int):
+        """Return the handle of the row at a display index"""
+        return self._handles[self._slot(index)]
+    
+    def append(self, row: tuple):
+        """
+        Add a row at the end
+        
+        Returns:
+            Handle of the new row
+            
+        Raises:
+            ValueError: If the key is already stored
+        """
+        handle = self._new_handles([row])[0]
+        if handle in self._positions:
+            raise ValueError(f"Duplicate row key: {handle!r}")
+        self.add(handle, row)
+        return handle
+    
+    def add(self, handle, row: tuple):
+        """Add a row at the end under a handle given by another store"""
+        self._positions[handle] = len(self._slots)
+        self._slots.append(row)
+        self._handles.append(handle)
+        # The new node covers the slots (i - lowbit(i), i]
+        i = len(self._tree)
+        self._tree.append(self._live_before(i - 1) - self._live_before(i - (i & -i)) + 1)
+    
+    def replace(self, handle, row: tuple):
+        """
+        Replace a row in place
+        
+        Returns:
+            Handle of the row, which changes with its key
+            
+        Raises:
+            KeyError: If the row is not stored
+            ValueError: If the new key belongs to another row
+        """
+        slot = self._positions[handle]
+        new_handle = self.key(row) if self.key is not None else handle
+        if new_handle != handle:
+            if new_handle in self._positions:
+                raise ValueError(f"Duplicate row key: {new_handle!r}")
+            del self._positions[handle]
+            self._positions[new_handle] = slot
+            self._handles[slot] = new_handle
+        self._slots[slot] = row
+        return new_handle
+    
+    def delete(self, handle) -> Optional[tuple]:
+        """Remove a row, returning it, or None if it is not stored"""
+        slot = self._positions.pop(handle, None)
+        if slot is None:
+            return None
+        row = self._slots[slot]
+        self._slots[slot] = _DELETED
+        self._handles[slot] = None
+        self._deleted += 1
+        self._update(slot, -1)
+        if self._deleted > 64 and self._deleted * 2 > len(self._slots):
+            self.compact()
+        return row
+    
+    def compact(self):
+        """Drop the tombstones"""
+        live = list(self.items())
+        self._load([row for _, row in live], [handle for handle, _ in live])
+    
+    def subset(self, predicate: Callable[[tuple], bool]) -> 'RowStore':
+        """Return a store of the rows matching predicate, with the same handles"""
+        store = RowStore(key=self.key)
+        live = [(handle, row) for handle, row in self.items() if predicate(row)]
+        store._load([row for _, row in live], [handle for handle, _ in live])
+        return store
+    
+    def sort(self, order: List[Tuple[int, bool]], sort_keys: Dict[int, Callable[[Any], Any]]):
+        """Sort the rows in place; handles stay with their rows"""
+        live = list(self.items())
+        sort_rows(live, order, sort_keys, values=lambda item: item[1])
+        self._load([row for _, row in live], [handle for handle, _ in live])
+
+
+class DataProvider(ABC):
+    """Source of rows for a virtual data table"""
+    
+    # Set by the table showing the provider; a provider that reads rows in the
+    # background calls it once rows it returned as placeholders have arrived
+    on_change: Optional[Callable[[], None]] = None
+    
+    @abstractmethod
+    def count(self) -> int:
+        """Return the total number of rows"""
+    
+    @abstractmethod
+    def get_rows(self, start: int, count: int) -> List[tuple]:
+        """
+        Return a window of rows
+        
+        Args:
+            start: Index of the first row
+            count: Maximum number of rows to return
+            
+        Returns:
+            List of value tuples matching column order
+        """
+    
+    def sort(self, order: List[Tuple[int, bool]], sort_keys: Dict[int, Callable[[Any], Any]]) -> bool:
+        """
+        Sort the rows by one or more columns
+        
+        Args:
+            order: (column_index, reverse) pairs, most significant first
+            sort_keys: Sort key function for each column index in order
+            
+        Returns:
+            True if the provider supports sorting by these columns
+        """
+        return False
+    
+    def refresh(self):
+        """Drop cached rows so the next read reflects the data source"""
+        pass
+
+
+class ListDataProvider(DataProvider):
+    """Provider over in-memory rows"""
+    
+    def __init__(self, rows):
+        """
+        Initialize the provider
+        
+        Args:
+            rows: List of value tuples, or a RowStore to share with a table
+        """
+        self.store = rows if isinstance(rows, RowStore) else RowStore(rows)
+    
+    def count(self) -> int:
+        return len(self.store)
+    
+    def get_rows(self, start: int, count: int) -> List[tuple]:
+        return self.store.window(start, count)
+    
+    def sort(self, order: List[Tuple[int, bool]], sort_keys: Dict[int, Callable[[Any], Any]]) -> bool:
+        self.store.sort(order, sort_keys)
+        return True
+
+
+class QueryDataProvider(DataProvider):
+    """Provider that reads pages from the database on demand and caches a few of them"""
+    
+    def __init__(self, fetch_page: Callable[[Any, int], List[Dict[str, Any]]],
+                 count: Callable[[], int], to_values: Callable[[Dict[str, Any]], tuple],
+                 cursor: Optional[Callable[..., Any]] = None,
+                 page_size: int = 200, cache_pages: int = 20,
+                 sort_fields: Dict[int, str] = None, runner=None, seekable: bool = False):
+        """
+        Initialize the provider
+        
+        Args:
+            fetch_page: Function taking (after, limit) and returning a list of rows;
+                when sorted it also receives order_by and descending keywords
+            count: Function returning the total number of rows
+            to_values: Function converting a row to table values
+            cursor: Function returning the keyset cursor of a row, called with
+                (row, order_by) when sorted; when None fetch_page receives the
+                row offset instead
+            page_size: Rows fetched per query
+            cache_pages: Number of pages kept in memory
+            sort_fields: Database column to order by for each sortable column
+                index; sorting is done by the query, never in Python
+            runner: Optional BackgroundRunner; pages and the count are then
+                read off the Tk thread, get_rows returns empty placeholder rows
+                for a page until it arrives and on_change is called when it does
+            seekable: fetch_page also takes an offset keyword skipping that
+                many rows; a jump to a keyset page whose cursor is unknown then
+                reads it by offset and continues keyset paging from its last
+                row instead of reading every page before it
+        """
+        self.fetch_page = fetch_page
+        self.count_rows = count
+        self.to_values = to_values
+        self.cursor = cursor
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.sort_fields = sort_fields or {}
+        self.runner = runner
+        self.seekable = seekable
+        self.order_by = None
+        self.descending = None
+        
+        self._total = None
+        self._count_stale = False
+        self._pages = OrderedDict()
+        # Keyset cursor that starts each page, learned as pages are read
+        self._page_starts = {0: None}
+        # Background reads in flight, by page index or "count"; bumping the
+        # generation drops the results of reads started before a refresh
+        self._loading = {}
+        self._generation = 0
+    
+    def count(self) -> int:
+        if self._total is None or self._count_stale:
+            if self.runner is None:
+                self._total = self.count_rows()
+                self._count_stale = False
+            else:
+                # The previous count stays in use until the new one arrives
+                self._load("count", self.count_rows)
+        return self._total or 0
+    
+    def get_rows(self, start: int, count: int) -> List[tuple]:
+        total = self.count()
+        if self._total is not None:
+            count = min(count, total - start)
+        if count <= 0:
+            return []
+        
+        first_page = start // self.page_size
+        last_page = (start + count - 1) // self.page_size
+        
+        rows = []
+        for page_index in range(first_page, last_page + 1):
+            page = self._page(page_index)
+            if page is None:
+                if self._total is None:
+                    break
+                # Placeholders keep the window full until the page arrives
+                page = [()] * min(self.page_size, self._total - page_index * self.page_size)
+            rows.extend(page)
+        
+        offset = start - first_page * self.page_size
+        return rows[offset:offset + count]
+    
+    def sort(self, order: List[Tuple[int, bool]], sort_keys: Dict[int, Callable[[Any], Any]]) -> bool:
+        if not order or any(index not in self.sort_fields for index, _ in order):
+            return False
+        
+        self.order_by = [self.sort_fields[index] for index, _ in order]
+        self.descending = [reverse for _, reverse in order]
+        # Cached pages and cursors belong to the previous order
+        self._drop_pages()
+        return True
+    
+    def refresh(self):
+        self._count_stale = True
+        self._drop_pages()
+    
+    def _drop_pages(self):
+        self._pages.clear()
+        self._page_starts = {0: None}
+        self._generation += 1
+        for key, task in list(self._loading.items()):
+            if key != "count":
+                self.runner.cancel(task)
+                del self._loading[key]
+    
+    def _load(self, key, func: Callable[..., Any], *args, **kwargs):
+        """Run a read in the background unless it is already in flight"""
+        if key in self._loading:
+            return
+        generation = self._generation
+        
+        def loaded(result):
+            if key == "count":
+                self._loading.pop(key, None)
+                self._total = result
+                self._count_stale = False
+            elif generation == self._generation:
+                self._loading.pop(key, None)
+                self._store_page(key, result)
+            else:
+                return
+            if self.on_change is not None:
+                self.on_change()
+        
+        def failed(error):
+            if key == "count" or generation == self._generation:
+                self._loading.pop(key, None)
+            print(f"Error loading rows: {error}")
+        
+        self._loading[key] = self.runner.submit(func, *args, on_success=loaded, on_error=failed, **kwargs)
+    
+    def _page(self, page_index: int) -> Optional[List[tuple]]:
+        """Return a page of rows, or None while it is read in the background"""
+        page = self._pages.get(page_index)
+        if page is not None:
+            self._pages.move_to_end(page_index)
+            return page
+        
+        fetch = self.fetch_page
+        args = ()
+        kwargs = {"order_by": self.order_by, "descending": self.descending} if self.order_by else {}
+        if self.cursor is None:
+            after = page_index * self.page_size
+        elif page_index in self._page_starts:
+            after = self._page_starts[page_index]
+        elif self.seekable:
+            after = None
+            kwargs["offset"] = page_index * self.page_size
+        else:
+            # Keyset pages can only be reached from the page before them, so
+            # a jump walks forward from the nearest known page in one read
+            known = max(i for i in self._page_starts if i < page_index)
+            fetch = self._walk_pages
+            after = self._page_starts[known]
+            args = (page_index - known,)
+        
+        if self.runner is not None:
+            self._load(page_index, fetch, after, self.page_size, *args, **kwargs)
+            return None
+        return self._store_page(page_index, fetch(after, self.page_size, *args, **kwargs))
+    
+    def _walk_pages(self, after, limit: int, pages: int, **kwargs) -> List[Dict[str, Any]]:
+        """Read past the given number of pages from after and return the next page"""
+        for _ in range(pages):
+            records = self.fetch_page(after, limit, **kwargs)
+            if len(records) < limit:
+                return []
+            after = self._cursor_of(records[-1], kwargs.get("order_by"))
+        return self.fetch_page(after, limit, **kwargs)
+    
+    def _cursor_of(self, record: Dict[str, Any], order_by) -> Any:
+        if order_by:
+            return self.cursor(record, order_by)
+        return self.cursor(record)
+    
+    def _store_page(self, page_index: int, records: List[Dict[str, Any]]) -> List[tuple]:
+        if self.cursor is not None and len(records) == self.page_size:
+            self._page_starts[page_index + 1] = self._cursor_of(records[-1], self.order_by)
+        
+        page = [self.to_values(record) for record in records]
+        self._pages[page_index] = page
+        if len(self._pages) > self.cache_pages:
+            self._pages.popitem(last=False)
+        return page
+    
 class DataTable:
     """Enhanced data table with sorting and filtering capabilities"""
     
-    def __init__(self, parent, columns: List[Tuple[str, str, int]], height: int = 10):
+    def __init__(self, parent, columns: List[Tuple[str, str, int]], height: int = 10,
+                 virtual: bool = False, key_column: Optional[int] = None,
+                 column_types: Dict[str, str] = None):
         """
         Initialize the data table
         
@@ -20,9 +548,19 @@ class DataTable:
             parent: Parent widget
             columns: List of (column_id, column_text, column_width) tuples
             height: Height in rows
+            virtual: Only create treeview items for the visible rows and read
+                the rest from a data provider while scrolling
+            key_column: Index of the column holding a unique row key, used to
+                find, update and delete rows without scanning; None if there
+                is none. Loading two rows with the same key raises ValueError.
+            column_types: Sort type per column id: "text" (Vietnamese
+                collation, the default), "int", "float" or "date"
         """
         self.parent = parent
         self.columns = columns
+        self.virtual = virtual
+        self.key_column = key_column
+        self.column_types = column_types or {}
         
         # Create frame for table and scrollbars
         self.frame = ttk.Frame(parent)
@@ -33,11 +571,28 @@ class DataTable:
         # Setup sorting
         self._setup_sorting()
         
-        # Data tracking
-        self.data = []
-        self.filtered_data = []
+        # Data tracking: every row, and the rows passing the filter when one
+        # is shown; both are indexed by key (or by a generated handle when
+        # there is no key column)
+        self._store = RowStore(key=self._row_key if key_column is not None else None)
+        self._filtered = None
         self.sort_column = None
         self.sort_reverse = False
+        # (column_id, reverse) pairs, most significant first
+        self.sort_order = []
+        
+        # Treeview items of the rows in the tree: handle -> item and back
+        self._key_items = {}
+        self._item_keys = {}
+        
+        # Virtual scrolling state
+        self.provider = None
+        self._top = 0
+        self._items = []
+        self._detached = set()
+        self._selected_index = None
+        if virtual:
+            self._setup_virtual(height)
     
     def _create_treeview(self, height):
         """Create the treeview with scrollbars"""
@@ -57,9 +612,14 @@ class DataTable:
             self.tree.heading(col_id, text=col_text)
             self.tree.column(col_id, width=col_width)
         
-        # Add vertical scrollbar
-        vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=vsb.set)
+        # Add vertical scrollbar; in virtual mode it scrolls the provider,
+        # not the treeview
+        if self.virtual:
+            vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        else:
+            vsb = ttk.Scrollbar(self.frame, orient="vertical", command=self.tree.yview)
+            self.tree.configure(yscrollcommand=vsb.set)
+        self.vsb = vsb
         
         # Add horizontal scrollbar
         hsb = ttk.Scrollbar(self.frame, orient="horizontal", command=self.tree.xview)
@@ -74,34 +634,350 @@ class DataTable:
         self.frame.grid_columnconfigure(0, weight=1)
         self.frame.grid_rowconfigure(0, weight=1)
     
+    def _setup_virtual(self, height):
+        """Create the fixed pool of treeview items and bind the scrolling events"""
+        style = ttk.Style(self.frame)
+        try:
+            self._row_height = int(style.lookup("Treeview", "rowheight") or 20)
+        except (ValueError, tk.TclError):
+            self._row_height = 20
+        
+        self._resize_pool(height)
+        
+        self.tree.bind("<Configure>", self._on_tree_configure)
+        self.tree.bind("<<TreeviewSelect>>", self._on_virtual_select, add="+")
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        for key in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.tree.bind(key, self._on_virtual_key)
+    
+    def _resize_pool(self, size: int):
+        """Grow or shrink the item pool to the number of visible rows"""
+        size = max(1, size)
+        while len(self._items) < size:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > size:
+            item_id = self._items.pop()
+            self._detached.discard(item_id)
+            self.tree.delete(item_id)
+        self._render()
+    
+    def _on_tree_configure(self, event):
+        # One row of the widget is taken by the headings
+        rows = event.height // self._row_height - 1
+        if rows > 0 and rows != len(self._items):
+            self._resize_pool(rows)
+    
+    def set_provider(self, provider: DataProvider):
+        """
+        Show the rows of a data provider (virtual mode only)
+        
+        Args:
+            provider: Provider to read rows from
+        """
+        if self.provider is not None and self.provider is not provider:
+            self.provider.on_change = None
+        self.provider = provider
+        provider.on_change = self._on_provider_change
+        self._top = 0
+        self._selected_index = None
+        if self.sort_order and not provider.sort(*self._sort_args(self.sort_order)):
+            # The new rows cannot be put in the order the headings show
+            self._set_sort_order([])
+        self._render()
+    
+    def row_count(self) -> int:
+        """Return the number of rows in the table"""
+        if self.virtual:
+            return self.provider.count() if self.provider else 0
+        return len(self.tree.get_children())
+    
+    def scroll_to(self, index: int):
+        """
+        Scroll so that the given row is the first visible one
+        
+        Args:
+            index: Row index
+        """
+        if not self.virtual:
+            children = self.tree.get_children()
+            if 0 <= index < len(children):
+                self.tree.see(children[index])
+            return
+        
+        total = self.row_count()
+        self._top = max(0, min(index, total - len(self._items)))
+        self._render()
+    
+    def _render(self):
+        """Bind the rows of the current window to the pooled treeview items"""
+        total = self.row_count()
+        rows = self.provider.get_rows(self._top, len(self._items)) if self.provider else []
+        
+        for position, item_id in enumerate(self._items):
+            if position < len(rows):
+                self.tree.item(item_id, values=rows[position])
+                if item_id in self._detached:
+                    self.tree.move(item_id, "", position)
+                    self._detached.discard(item_id)
+            elif item_id not in self._detached:
+                self.tree.detach(item_id)
+                self._detached.add(item_id)
+        
+        # Keep the selection on the same row, not the same item
+        index = self._selected_index
+        if index is not None and self._top <= index < self._top + len(rows):
+            self.tree.selection_set(self._items[index - self._top])
+        elif self.tree.selection():
+            self.tree.selection_set(())
+        
+        if total:
+            self.vsb.set(self._top / total, min(1.0, (self._top + len(rows)) / total))
+        else:
+            self.vsb.set(0.0, 1.0)
+    
+    def _on_scrollbar(self, *args):
+        total = self.row_count()
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * total))
+        elif args[0] == "scroll":
+            amount = int(args[1])
+            if args[2] == "pages":
+                amount *= len(self._items)
+            self.scroll_to(self._top + amount)
+    
+    def _on_mousewheel(self, event):
+        if event.num == 4 or getattr(event, "delta", 0) > 0:
+            self.scroll_to(self._top - 3)
+        else:
+            self.scroll_to(self._top + 3)
+        return "break"
+    
+    def _on_virtual_key(self, event):
+        total = self.row_count()
+        if not total:
+            return "break"
+        
+        index = self._selected_index if self._selected_index is not None else self._top - 1
+        page = len(self._items)
+        steps = {"Up": -1, "Down": 1, "Prior": -page, "Next": page}
+        if event.keysym == "Home":
+            index = 0
+        elif event.keysym == "End":
+            index = total - 1
+        else:
+            index += steps.get(event.keysym, 0)
+        
+        self.select_index(max(0, min(index, total - 1)))
+        return "break"
+    
+    def _on_virtual_select(self, event):
+        selected_items = self.tree.selection()
+        if selected_items and selected_items[0] in self._items:
+            self._selected_index = self._top + self._items.index(selected_items[0])
+    
+    def select_index(self, index: int):
+        """
+        Select a row by index and scroll it into view
+        
+        Args:
+            index: Row index
+        """
+        if not self.virtual:
+            children = self.tree.get_children()
+            if 0 <= index < len(children):
+                self.tree.selection_set(children[index])
+                self.tree.see(children[index])
+            return
+        
+        self._selected_index = index
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + len(self._items):
+            self._top = index - len(self._items) + 1
+        self.scroll_to(self._top)
+    
+    def get_selected_index(self) -> Optional[int]:
+        """
+        Get the index of the selected row
+        
+        Returns:
+            Row index or None if no selection
+        """
+        if self.virtual:
+            return self._selected_index
+        
+        selected_items = self.tree.selection()
+        if not selected_items:
+            return None
+        return self.tree.index(selected_items[0])
+    
+    def _refresh_virtual(self):
+        """Re-read the provider after the underlying rows changed"""
+        if self.provider is None:
+            self.provider = ListDataProvider(self._shown())
+        elif not isinstance(self.provider, ListDataProvider):
+            self.provider.refresh()
+        self._on_provider_change()
+    
+    def _on_provider_change(self):
+        self._top = max(0, min(self._top, self.row_count() - len(self._items)))
+        self._render()
+    
+    def refresh(self):
+        """Re-read the rows of the data provider, keeping the scroll position (virtual mode only)"""
+        if self.virtual and self.provider is not None:
+            self._refresh_virtual()
+    
     def _setup_sorting(self):
-        """Setup column sorting"""
+        """Setup column sorting; shift-click adds a column to the sort"""
         for col_id, _, _ in self.columns:
             self.tree.heading(
                 col_id,
                 command=lambda c=col_id: self._sort_by_column(c)
             )
+        self.tree.bind("<Shift-Button-1>", self._on_heading_shift_click)
+    
+    def _on_heading_shift_click(self, event):
+        if self.tree.identify_region(event.x, event.y) != "heading":
+            return None
+        
+        column = self.tree.identify_column(event.x)
+        try:
+            col_id = self.columns[int(column.lstrip("#")) - 1][0]
+        except (ValueError, IndexError):
+            return None
+        
+        self._sort_by_column(col_id, add=True)
+        return "break"
     
-    def _sort_by_column(self, column):
-        """Sort treeview data by column"""
-        # Toggle sort direction if already sorting by this column
-        if self.sort_column == column:
-            self.sort_reverse = not self.sort_reverse
+    def _sort_by_column(self, column, add: bool = False):
+        """
+        Sort treeview data by column
+        
+        Args:
+            column: Column id
+            add: Add the column to the current sort instead of replacing it
+        """
+        order = list(self.sort_order)
+        directions = dict(order)
+        
+        if add and column in directions:
+            # Toggle the direction of a column already in the sort
+            order = [(col, not rev if col == column else rev) for col, rev in order]
+        elif add:
+            order.append((column, False))
+        elif len(order) == 1 and order[0][0] == column:
+            order = [(column, not order[0][1])]
         else:
-            self.sort_column = column
-            self.sort_reverse = False
+            order = [(column, False)]
+        
+        self.sort_by(order)
+    
+    def _column_sort_key(self, col_index: int) -> Callable[[Any], Any]:
+        col_id = self.columns[col_index][0]
+        return SORT_KEYS[self.column_types.get(col_id, "text")]
+    
+    def _sort_args(self, order: List[Tuple[str, bool]]):
+        """Return the column index order and sort keys for a provider sort"""
+        column_ids = [col[0] for col in self.columns]
+        index_order = [(column_ids.index(col), reverse) for col, reverse in order]
+        sort_keys = {index: self._column_sort_key(index) for index, _ in index_order}
+        return index_order, sort_keys
+    
+    def sort_by(self, order: List[Tuple[str, bool]]) -> bool:
+        """
+        Sort the table by one or more columns
+        
+        Args:
+            order: (column_id, reverse) pairs, most significant first
+            
+        Returns:
+            True if the rows were sorted
+        """
+        index_order, sort_keys = self._sort_args(order)
         
-        # Find column index
-        col_index = [col[0] for col in self.columns].index(column)
+        if self.virtual:
+            if isinstance(self.provider, ListDataProvider):
+                # The provider shows the filtered rows; keep the rest in order too
+                for store in (self._store, self._filtered):
+                    if store is not None and store is not self.provider.store:
+                        store.sort(index_order, sort_keys)
+            if self.provider is None or not self.provider.sort(index_order, sort_keys):
+                return False
+            self._selected_index = None
+            self._set_sort_order(order)
+            self.scroll_to(0)
+            return True
         
-        # Sort the data
-        self.data.sort(
-            key=lambda item: item[col_index] if item[col_index] else "",
-            reverse=self.sort_reverse
-        )
+        # Sort the data, and the filtered rows if a filter is shown
+        self._store.sort(index_order, sort_keys)
+        if self._filtered is not None:
+            self._filtered.sort(index_order, sort_keys)
+        self._set_sort_order(order)
         
-        # Reload the treeview
-        self.load_data(self.data)
+        # Move the existing items into the new order instead of rebuilding them
+        shown = self._shown()
+        if len(self._key_items) == len(shown):
+            for position, (handle, _) in enumerate(shown.items()):
+                self.tree.move(self._key_items[handle], "", position)
+        else:
+            self._insert_rows(shown)
+        return True
+    
+    def _set_sort_order(self, order: List[Tuple[str, bool]]):
+        """Remember the sort order and show it in the column headings"""
+        self.sort_order = list(order)
+        if order:
+            self.sort_column, self.sort_reverse = order[0]
+        else:
+            self.sort_column, self.sort_reverse = None, False
+        
+        positions = {col: (position, reverse) for position, (col, reverse) in enumerate(order)}
+        for col_id, col_text, _ in self.columns:
+            text = col_text
+            if col_id in positions:
+                position, reverse = positions[col_id]
+                text += " ▼" if reverse else " ▲"
+                if len(order) > 1:
+                    text += str(position + 1)
+            self.tree.heading(col_id, text=text)
+    
+    def _row_key(self, row: tuple) -> Optional[str]:
+        """Return the key of a row as a string, the form treeview values take"""
+        if self.key_column is None:
+            return None
+        return str(row[self.key_column])
+    
+    def _shown(self) -> RowStore:
+        """Return the rows on display: the filtered ones when a filter is set"""
+        return self._filtered if self._filtered is not None else self._store
+    
+    def _list_store(self) -> Optional[RowStore]:
+        """Return the rows of an in-memory provider, or None for a query provider"""
+        return self.provider.store if isinstance(self.provider, ListDataProvider) else None
+    
+    @property
+    def data(self) -> List[tuple]:
+        """All rows in table order (a copy)"""
+        return self._store.rows()
+    
+    @property
+    def filtered_data(self) -> List[tuple]:
+        """Rows passing the current filter, or an empty list without a filter (a copy)"""
+        return self._filtered.rows() if self._filtered is not None else []
+    
+    def _insert_rows(self, store: RowStore):
+        """Replace the treeview items with the rows of a store"""
+        self.tree.delete(*self.tree.get_children())
+        self._key_items = {}
+        self._item_keys = {}
+        
+        for handle, row in store.items():
+            item_id = self.tree.insert("", "end", values=row)
+            self._key_items[handle] = item_id
+            self._item_keys[item_id] = handle
     
     def load_data(self, data: List[tuple]):
         """
@@ -109,16 +985,20 @@ class DataTable:
         
         Args:
             data: List of value tuples matching column order
+            
+        Raises:
+            ValueError: If two rows have the same key
         """
         # Store data
-        self.data = data
+        self._store = RowStore(data, key=self._store.key)
+        self._filtered = None
         
-        # Clear existing items
-        self.tree.delete(*self.tree.get_children())
+        if self.virtual:
+            self.set_provider(ListDataProvider(self._store))
+            return
         
         # Add data to tree
-        for row in data:
-            self.tree.insert("", "end", values=row)
+        self._insert_rows(self._store)
     
     def filter_data(self, filter_func: Callable[[tuple], bool]):
         """
@@ -128,19 +1008,24 @@ class DataTable:
             filter_func: Function that takes a data row and returns True if it should be displayed
         """
         # Apply filter
-        self.filtered_data = [row for row in self.data if filter_func(row)]
+        self._filtered = self._store.subset(filter_func)
         
-        # Clear existing items
-        self.tree.delete(*self.tree.get_children())
+        if self.virtual:
+            self.set_provider(ListDataProvider(self._filtered))
+            return
         
         # Add filtered data to tree
-        for row in self.filtered_data:
-            self.tree.insert("", "end", values=row)
+        self._insert_rows(self._filtered)
     
     def reset_filter(self):
         """Reset filter and show all data"""
-        self.filtered_data = []
-        self.load_data(self.data)
+        self._filtered = None
+        
+        if self.virtual:
+            self.set_provider(ListDataProvider(self._store))
+            return
+        
+        self._insert_rows(self._store)
     
     def get_selected_item(self) -> Optional[tuple]:
         """
@@ -149,6 +1034,12 @@ class DataTable:
         Returns:
             Selected item values as tuple or None if no selection
         """
+        if self.virtual:
+            # The selected row may be scrolled out of the item pool
+            index = self._selected_index
+            rows = self.provider.get_rows(index, 1) if index is not None and self.provider else []
+            return rows[0] if rows and rows[0] else None
+        
         selected_items = self.tree.selection()
         
         if not selected_items:
@@ -164,6 +1055,10 @@ class DataTable:
         Returns:
             List of selected item values as tuples
         """
+        if self.virtual:
+            selected = self.get_selected_item()
+            return [selected] if selected else []
+        
         selected_items = self.tree.selection()
         
         result = []
@@ -173,6 +1068,55 @@ class DataTable:
         
         return result
     
+    def get_selected_key(self) -> Optional[str]:
+        """
+        Get the key of the currently selected row
+        
+        Returns:
+            Key as a string or None if no selection or no key column
+        """
+        if self.key_column is None:
+            return None
+        
+        if self.virtual:
+            index = self._selected_index
+            if index is None or self.provider is None:
+                return None
+            rows = self.provider.get_rows(index, 1)
+            return self._row_key(rows[0]) if rows and rows[0] else None
+        
+        selected_items = self.tree.selection()
+        return self._item_keys.get(selected_items[0]) if selected_items else None
+    
+    def select_by_key(self, key: Any) -> bool:
+        """
+        Select the row with the given key and scroll it into view
+        
+        Args:
+            key: Value of the key column
+            
+        Returns:
+            True if the row was found
+        """
+        if self.key_column is None:
+            return False
+        
+        key = str(key)
+        if self.virtual:
+            store = self._list_store()
+            index = store.index_of(key) if store is not None else None
+            if index is None:
+                return False
+            self.select_index(index)
+            return True
+        
+        item_id = self._key_items.get(key)
+        if item_id is None:
+            return False
+        self.tree.selection_set(item_id)
+        self.tree.see(item_id)
+        return True
+    
     def select_item_by_value(self, column_index: int, value: Any):
         """
         Select an item by a value in a specific column
@@ -181,6 +1125,18 @@ class DataTable:
             column_index: Index of column to match
             value: Value to match
         """
+        if column_index == self.key_column:
+            self.select_by_key(value)
+            return
+        
+        if self.virtual:
+            store = self._list_store()
+            for index, row in enumerate(store if store is not None else ()):
+                if str(row[column_index]) == str(value):
+                    self.select_index(index)
+                    return
+            return
+        
         for item_id in self.tree.get_children():
             item_values = self.tree.item(item_id, "values")
             if str(item_values[column_index]) == str(value):
@@ -195,63 +1151,115 @@ class DataTable:
         Args:
             values: Row values as tuple
             select: Whether to select the new row
+            
+        Raises:
+            ValueError: If the key is already in the table
         """
-        # Add to data
-        self.data.append(values)
+        # Add to data, and to the rows on display when a filter is shown
+        handle = self._store.append(values)
+        if self._filtered is not None:
+            self._filtered.add(handle, values)
+        
+        if self.virtual:
+            self._refresh_virtual()
+            if select:
+                self.select_index(self.row_count() - 1)
+            return
         
         # Add to tree
         item_id = self.tree.insert("", "end", values=values)
+        self._key_items[handle] = item_id
+        self._item_keys[item_id] = handle
         
         # Select if requested
         if select:
             self.tree.selection_set(item_id)
             self.tree.see(item_id)
     
+    def _replace_row(self, handle, values: tuple):
+        """Replace a row in the data and the filtered rows, returning its new handle"""
+        new_handle = self._store.replace(handle, values)
+        if self._filtered is not None and handle in self._filtered:
+            self._filtered.replace(handle, values)
+        return new_handle
+    
     def update_selected_row(self, values: tuple):
         """
         Update the selected row with new values
         
         Args:
             values: New row values as tuple
+            
+        Raises:
+            ValueError: If the new key belongs to another row
         """
+        if self.virtual:
+            index = self._selected_index
+            store = self._list_store()
+            if index is not None and store is not None and index < len(store):
+                self._replace_row(store.handle_at(index), values)
+            if self.provider is not None:
+                self._refresh_virtual()
+            return
+        
         selected_items = self.tree.selection()
         
         if not selected_items:
             return
         
         item_id = selected_items[0]
+        handle = self._item_keys.get(item_id)
+        if handle is None:
+            return
         
-        # Update in tree
+        # Update in data, then in tree
+        new_handle = self._replace_row(handle, values)
         self.tree.item(item_id, values=values)
         
-        # Update in data
-        old_values = self.tree.item(item_id, "values")
-        for i, row in enumerate(self.data):
-            if row == old_values:
-                self.data[i] = values
-                break
+        if new_handle != handle:
+            del self._key_items[handle]
+            self._key_items[new_handle] = item_id
+            self._item_keys[item_id] = new_handle
     
     def delete_selected_rows(self):
         """Delete all selected rows"""
+        if self.virtual:
+            index = self._selected_index
+            store = self._list_store()
+            if index is None or self.provider is None:
+                return
+            if store is not None and index < len(store):
+                handle = store.handle_at(index)
+                self._store.delete(handle)
+                if self._filtered is not None:
+                    self._filtered.delete(handle)
+            self._selected_index = None
+            self._refresh_virtual()
+            return
+        
         selected_items = self.tree.selection()
         
         if not selected_items:
             return
         
-        # Collect values to remove from data
-        values_to_remove = []
+        # Each row is removed through its handle; nothing is scanned
         for item_id in selected_items:
-            values = self.tree.item(item_id, "values")
-            values_to_remove.append(values)
-            
-            # Remove from tree
-            self.tree.delete(item_id)
-        
-        # Remove from data
-        self.data = [row for row in self.data if row not in values_to_remove]
+            handle = self._item_keys.pop(item_id, None)
+            if handle is None:
+                continue
+            self._key_items.pop(handle, None)
+            self._store.delete(handle)
+            if self._filtered is not None:
+                self._filtered.delete(handle)
+        self.tree.delete(*selected_items)
     
     def clear(self):
         """Clear all data"""
-        self.tree.delete(*self.tree.get_children())
-        self.data = []
-        self.filtered_data = []
\ No newline at end of file
+        self._store = RowStore(key=self._store.key)
+        self._filtered = None
+        
+        if self.virtual:
+            self.set_provider(ListDataProvider(self._store))
+            return
+        
+        self._insert_rows(self._store)
@@ -11,9 +11,8 @@ import calendar
 from datetime import datetime, timedelta
 
 from .base_view import BaseView
-from controllers.patient_controller import PatientController
-from controllers.doctor_controller import DoctorController
 from controllers.schedule_controller import ScheduleController
+from controllers.stats_controller import StatsController
 
 class DashboardView(BaseView):
     """Dashboard view implementation"""
@@ -30,9 +29,8 @@ class DashboardView(BaseView):
         self.app = app
         
         # Create controllers
-        self.patient_controller = PatientController()
-        self.doctor_controller = DoctorController()
         self.schedule_controller = ScheduleController()
+        self.stats_controller = StatsController()
         
         # Setup UI components
         self._create_content()
@@ -283,10 +281,36 @@ class DashboardView(BaseView):
         button.pack(fill=tk.BOTH, expand=True)
     
     def _load_dashboard_data(self):
-        """Load data for the dashboard"""
-        # Load today's appointments
-        today = self._get_today()
+        """Load data for the dashboard in the background"""
+        self.run_in_background(
+            self._fetch_dashboard_data, self._get_today(),
+            on_success=self._show_dashboard_data,
+            key="dashboard"
+        )
+    
+    def _fetch_dashboard_data(self, today):
+        """
+        Query today's appointments and the statistics (runs off the Tk thread)
+        
+        Args:
+            today: Date in YYYY-MM-DD format
+            
+        Returns:
+            Tuple of (appointments, stats)
+        """
         appointments = self.schedule_controller.get_appointments_by_date(today)
+        # One query for all figures
+        stats = self.stats_controller.get_dashboard_stats(today)
+        return appointments, stats
+    
+    def _show_dashboard_data(self, data):
+        """
+        Fill the dashboard widgets with loaded data
+        
+        Args:
+            data: Tuple returned by _fetch_dashboard_data
+        """
+        appointments, stats = data
         
         # Clear existing items in the tree
         self.today_tree.delete(*self.today_tree.get_children())
@@ -302,24 +326,11 @@ class DashboardView(BaseView):
             )
             self.today_tree.insert("", "end", values=values)
         
-        # Update statistics
-        doctor_count = len(self.doctor_controller.get_all_doctors())
-        patient_count = len(self.patient_controller.get_all_patients())
-        today_count = len(appointments)
-        
-        # Calculate week count (appointments for the next 7 days)
-        week_count = 0
-        today_date = datetime.strptime(today, "%Y-%m-%d")
-        for i in range(7):
-            date = today_date + timedelta(days=i)
-            date_str = date.strftime("%Y-%m-%d")
-            week_count += len(self.schedule_controller.get_appointments_by_date(date_str))
-        
         # Update stat boxes
-        self.stat_doctors.config(text=str(doctor_count))
-        self.stat_patients.config(text=str(patient_count))
-        self.stat_appointments_today.config(text=str(today_count))
-        self.stat_appointments_week.config(text=str(week_count))
+        self.stat_doctors.config(text=str(stats["doctor_count"]))
+        self.stat_patients.config(text=str(stats["patient_count"]))
+        self.stat_appointments_today.config(text=str(stats["today_count"]))
+        self.stat_appointments_week.config(text=str(stats["week_count"]))
     
     def _get_today(self):
         """Get today's date in YYYY-MM-DD format"""
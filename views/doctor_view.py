@@ -1,19 +1,26 @@
 import tkinter as tk
 from tkinter import ttk
 from typing import Dict, List, Any, Optional
+from functools import partial
 from datetime import datetime
 
 from .base_view import BaseView
+from .components.data_table import DataTable, QueryDataProvider
 from controllers.doctor_controller import DoctorController
 from database.models import Doctor
+from utils.search_cache import SearchCache
 from .custom_date_entry import CustomDateEntry
 
 
 class DoctorView(BaseView):
+    # Matches kept per search; only the rows in view are read
+    search_limit = 1000
+
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app
         self.controller = DoctorController()
+        self.search_cache = SearchCache(Doctor.refine_search, max_hits=self.search_limit)
         self._create_content()
 
         self._load_doctors()
@@ -31,6 +38,7 @@ class DoctorView(BaseView):
         ttk.Label(search_frame, text="Tìm kiếm:").pack(side=tk.LEFT, padx=5)
         self.search_entry = ttk.Entry(search_frame, width=25)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_search_as_you_type(self.search_entry, self._search_doctors)
 
         search_button = ttk.Button(
             search_frame,
@@ -60,8 +68,15 @@ class DoctorView(BaseView):
             ("ChuyenKhoa", "Chuyên khoa", 150)
         ]
 
-        self.doctor_tree, tree_frame = self.create_data_table(table_frame, columns)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Only the visible rows get treeview items; pages are read as they scroll in
+        self.doctor_table = DataTable(
+            table_frame, columns, virtual=True, key_column=0,
+            column_types={"MaBS": "int", "Ngaysinh": "date"}
+        )
+        # Heading clicks sort in the page query; the column ids are the table's
+        self.doctor_sort_fields = {index: column[0] for index, column in enumerate(columns)}
+        self.doctor_table.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.doctor_tree = self.doctor_table.tree
         button_frame = ttk.Frame(table_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
 
@@ -193,22 +208,29 @@ class DoctorView(BaseView):
         except ValueError:
             return date_str
 
+    def _doctor_values(self, doctor):
+        return (
+            doctor["MaBS"],
+            doctor["Ho"],
+            doctor["Ten"],
+            doctor["CMND"],
+            doctor["Gioitinh"],
+            self._format_date_for_display(doctor.get("Ngaysinh", "")),
+            doctor["SDT"],
+            doctor["ChuyenKhoa"]
+        )
+
     def _load_doctors(self):
-        self.doctor_tree.delete(*self.doctor_tree.get_children())
-        doctors = self.controller.get_all_doctors()
-        for doctor in doctors:
-            ngaysinh = self._format_date_for_display(doctor.get("Ngaysinh", ""))
-            values = (
-                doctor["MaBS"],
-                doctor["Ho"],
-                doctor["Ten"],
-                doctor["CMND"],
-                doctor["Gioitinh"],
-                ngaysinh,
-                doctor["SDT"],
-                doctor["ChuyenKhoa"]
-            )
-            self.doctor_tree.insert("", "end", values=values)
+        self.background.cancel_key("doctor-search")
+        self.doctor_table.set_provider(QueryDataProvider(
+            self.controller.get_doctors_page,
+            self.controller.count_doctors,
+            self._doctor_values,
+            cursor=Doctor.page_cursor,
+            sort_fields=self.doctor_sort_fields,
+            runner=self.background,
+            seekable=True
+        ))
 
     def _search_doctors(self):
         search_term = self.search_entry.get().strip()
@@ -217,22 +239,34 @@ class DoctorView(BaseView):
             self._load_doctors()
             return
 
-        self.doctor_tree.delete(*self.doctor_tree.get_children())
-        doctors = self.controller.search_doctors(search_term)
-
-        for doctor in doctors:
-            ngaysinh = self._format_date_for_display(doctor.get("Ngaysinh", ""))
-            values = (
-                doctor["MaBS"],
-                doctor["Ho"],
-                doctor["Ten"],
-                doctor["CMND"],
-                doctor["Gioitinh"],
-                ngaysinh,
-                doctor["SDT"],
-                doctor["ChuyenKhoa"]
-            )
-            self.doctor_tree.insert("", "end", values=values)
+        cached = self.search_cache.get(search_term)
+        if cached is not None:
+            self.background.cancel_key("doctor-search")
+            self._show_doctors(cached)
+            return
+
+        self.run_in_background(
+            self._fetch_search, search_term,
+            on_success=self._show_doctors,
+            key="doctor-search"
+        )
+
+    def _fetch_search(self, search_term):
+        hits = self.controller.search_doctor_keys(search_term, self.search_limit)
+        # A result shorter than the limit holds every match, so later
+        # keystrokes can narrow it without a query
+        self.search_cache.put(search_term, hits, complete=len(hits) < self.search_limit)
+        return hits
+
+    def _show_doctors(self, hits):
+        ids = [hit[0] for hit in hits]
+        self.doctor_table.set_provider(QueryDataProvider(
+            partial(self.controller.get_doctors_by_ids, ids),
+            ids.__len__,
+            self._doctor_values,
+            sort_fields=self.doctor_sort_fields,
+            runner=self.background
+        ))
 
     def _show_add_form(self):
         self.notebook.select(1)
@@ -266,13 +300,12 @@ class DoctorView(BaseView):
         return max_id + 1
 
     def _show_edit_form(self):
-        selected_items = self.doctor_tree.selection()
+        values = self.doctor_table.get_selected_item()
 
-        if not selected_items:
+        if not values:
             self.show_error("Lỗi", "Vui lòng chọn bác sĩ để sửa!")
             return
 
-        values = self.doctor_tree.item(selected_items[0], "values")
         doctor_id = values[0]
 
         doctor = self.controller.get_doctor(doctor_id)
@@ -348,6 +381,7 @@ class DoctorView(BaseView):
 
         if success:
             self.show_info("Thành công", message)
+            self.search_cache.clear()
             self._load_doctors()
             self._cancel_form()
         else:
@@ -360,13 +394,12 @@ class DoctorView(BaseView):
         self.current_doctor_id = None
 
     def _delete_doctor(self):
-        selected_items = self.doctor_tree.selection()
+        values = self.doctor_table.get_selected_item()
 
-        if not selected_items:
+        if not values:
             self.show_error("Lỗi", "Vui lòng chọn bác sĩ để xóa!")
             return
 
-        values = self.doctor_tree.item(selected_items[0], "values")
         doctor_id = values[0]
 
         confirm = self.ask_yes_no(
@@ -380,6 +413,7 @@ class DoctorView(BaseView):
 
         if success:
             self.show_info("Thành công", "Xóa bác sĩ thành công!")
+            self.search_cache.clear()
             self._load_doctors()
         else:
             self.show_error(
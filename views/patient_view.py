@@ -1,20 +1,26 @@
 import tkinter as tk
 from tkinter import ttk
 from typing import Dict, List, Any, Optional
+from functools import partial
 from datetime import datetime
 
 from .base_view import BaseView
+from .components.data_table import DataTable, QueryDataProvider
 from controllers.patient_controller import PatientController
 from database.models import Patient
+from utils.search_cache import SearchCache
 from .custom_date_entry import CustomDateEntry
 
 
 class PatientView(BaseView):
+    # Matches kept per search; only the rows in view are read
+    search_limit = 1000
 
     def __init__(self, parent, app):
         super().__init__(parent)
         self.app = app
         self.controller = PatientController()
+        self.search_cache = SearchCache(Patient.refine_search, max_hits=self.search_limit)
         self._create_content()
         self._load_patients()
 
@@ -33,6 +39,7 @@ class PatientView(BaseView):
         ttk.Label(search_frame, text="Tìm kiếm:").pack(side=tk.LEFT, padx=5)
         self.search_entry = ttk.Entry(search_frame, width=25)
         self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.bind_search_as_you_type(self.search_entry, self._search_patients)
 
         search_button = ttk.Button(
             search_frame,
@@ -64,8 +71,15 @@ class PatientView(BaseView):
             ("Ngaykham", "Ngày khám", 100)
         ]
 
-        self.patient_tree, tree_frame = self.create_data_table(table_frame, columns)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Only the visible rows get treeview items; pages are read as they scroll in
+        self.patient_table = DataTable(
+            table_frame, columns, virtual=True, key_column=0,
+            column_types={"MaBN": "int", "Ngaysinh": "date", "Ngaykham": "date"}
+        )
+        # Heading clicks sort in the page query; the column ids are the table's
+        self.patient_sort_fields = {index: column[0] for index, column in enumerate(columns)}
+        self.patient_table.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.patient_tree = self.patient_table.tree
 
         button_frame = ttk.Frame(table_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -222,25 +236,30 @@ class PatientView(BaseView):
         except ValueError:
             return date_str
 
+    def _patient_values(self, patient):
+        return (
+            patient["MaBN"],
+            patient["Ho"],
+            patient["Ten"],
+            patient["CMND"],
+            patient["Gioitinh"],
+            self._format_date_for_display(patient.get("Ngaysinh", "")),
+            patient["SDT"],
+            patient["Quequan"],
+            self._format_date_for_display(patient.get("Ngaykham", ""))
+        )
+
     def _load_patients(self):
-        self.patient_tree.delete(*self.patient_tree.get_children())
-        patients = self.controller.get_all_patients()
-        for patient in patients:
-            ngaysinh = self._format_date_for_display(patient.get("Ngaysinh", ""))
-            ngaykham = self._format_date_for_display(patient.get("Ngaykham", ""))
-
-            values = (
-                patient["MaBN"],
-                patient["Ho"],
-                patient["Ten"],
-                patient["CMND"],
-                patient["Gioitinh"],
-                ngaysinh,
-                patient["SDT"],
-                patient["Quequan"],
-                ngaykham
-            )
-            self.patient_tree.insert("", "end", values=values)
+        self.background.cancel_key("patient-search")
+        self.patient_table.set_provider(QueryDataProvider(
+            self.controller.get_patients_page,
+            self.controller.count_patients,
+            self._patient_values,
+            cursor=Patient.page_cursor,
+            sort_fields=self.patient_sort_fields,
+            runner=self.background,
+            seekable=True
+        ))
 
     def _search_patients(self):
         search_term = self.search_entry.get().strip()
@@ -249,24 +268,34 @@ class PatientView(BaseView):
             self._load_patients()
             return
 
-        self.patient_tree.delete(*self.patient_tree.get_children())
-        patients = self.controller.search_patients(search_term)
-        for patient in patients:
-            ngaysinh = self._format_date_for_display(patient.get("Ngaysinh", ""))
-            ngaykham = self._format_date_for_display(patient.get("Ngaykham", ""))
-
-            values = (
-                patient["MaBN"],
-                patient["Ho"],
-                patient["Ten"],
-                patient["CMND"],
-                patient["Gioitinh"],
-                ngaysinh,
-                patient["SDT"],
-                patient["Quequan"],
-                ngaykham
-            )
-            self.patient_tree.insert("", "end", values=values)
+        cached = self.search_cache.get(search_term)
+        if cached is not None:
+            self.background.cancel_key("patient-search")
+            self._show_patients(cached)
+            return
+
+        self.run_in_background(
+            self._fetch_search, search_term,
+            on_success=self._show_patients,
+            key="patient-search"
+        )
+
+    def _fetch_search(self, search_term):
+        hits = self.controller.search_patient_keys(search_term, self.search_limit)
+        # A result shorter than the limit holds every match, so later
+        # keystrokes can narrow it without a query
+        self.search_cache.put(search_term, hits, complete=len(hits) < self.search_limit)
+        return hits
+
+    def _show_patients(self, hits):
+        ids = [hit[0] for hit in hits]
+        self.patient_table.set_provider(QueryDataProvider(
+            partial(self.controller.get_patients_by_ids, ids),
+            ids.__len__,
+            self._patient_values,
+            sort_fields=self.patient_sort_fields,
+            runner=self.background
+        ))
 
     def _show_add_form(self):
         self.notebook.select(1)
@@ -293,13 +322,12 @@ class PatientView(BaseView):
         self.notebook.tab(1, text="Thêm bệnh nhân mới")
 
     def _show_edit_form(self):
-        selected_items = self.patient_tree.selection()
+        values = self.patient_table.get_selected_item()
 
-        if not selected_items:
+        if not values:
             self.show_error("Lỗi", "Vui lòng chọn bệnh nhân để sửa!")
             return
 
-        values = self.patient_tree.item(selected_items[0], "values")
         patient_id = values[0]
 
         patient = self.controller.get_patient(patient_id)
@@ -373,6 +401,7 @@ class PatientView(BaseView):
 
         if success:
             self.show_info("Thành công", message)
+            self.search_cache.clear()
             self._load_patients()
             self._cancel_form()
         else:
@@ -384,12 +413,11 @@ class PatientView(BaseView):
         self.current_patient_id = None
 
     def _delete_patient(self):
-        selected_items = self.patient_tree.selection()
+        values = self.patient_table.get_selected_item()
 
-        if not selected_items:
+        if not values:
             self.show_error("Lỗi", "Vui lòng chọn bệnh nhân để xóa!")
             return
-        values = self.patient_tree.item(selected_items[0], "values")
         patient_id = values[0]
 
         confirm = self.ask_yes_no(
@@ -403,6 +431,7 @@ class PatientView(BaseView):
 
         if success:
             self.show_info("Thành công", "Xóa bệnh nhân thành công!")
+            self.search_cache.clear()
             self._load_patients()
         else:
             self.show_error(
@@ -5,10 +5,13 @@ from datetime import datetime, timedelta
 import calendar
 
 from .base_view import BaseView
+from .components.data_table import DataTable, QueryDataProvider
+from .components.calendar_grid import CalendarGrid
 from controllers.schedule_controller import ScheduleController
 from controllers.doctor_controller import DoctorController
 from controllers.patient_controller import PatientController
 from database.models import Appointment
+from utils.helpers import get_week_dates, get_month_dates
 from .custom_date_entry import CustomDateEntry
 
 
@@ -182,8 +185,19 @@ class ScheduleView(BaseView):
             ("LydoKham", "Lý do khám", 200)
         ]
 
-        self.schedule_tree, tree_frame = self.create_data_table(list_frame, columns)
-        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        # Only the visible rows get treeview items; pages are read as they scroll in
+        self.schedule_table = DataTable(
+            list_frame, columns, virtual=True, key_column=0,
+            column_types={"MaLichKham": "int", "MaBN": "int", "MaBS": "int", "NgayKham": "date"}
+        )
+        # Heading clicks sort in the page query; the joined names are not
+        # LichKham columns, so they only sort search results held in memory
+        self.schedule_sort_fields = {
+            index: column[0] for index, column in enumerate(columns)
+            if column[0] not in ("TenBenhNhan", "TenBacSi")
+        }
+        self.schedule_table.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.schedule_tree = self.schedule_table.tree
 
         button_frame = ttk.Frame(list_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -224,30 +238,30 @@ class ScheduleView(BaseView):
 
     def _create_calendar_view(self):
         calendar_frame = ttk.Frame(self.notebook)
-        self.notebook.add(calendar_frame, text="Lịch theo ngày")
+        self.notebook.add(calendar_frame, text="Lịch khám")
 
         nav_frame = ttk.Frame(calendar_frame)
         nav_frame.pack(fill=tk.X, padx=5, pady=5)
 
-        prev_day_button = ttk.Button(
+        self.prev_button = ttk.Button(
             nav_frame,
             text="<< Ngày trước",
             command=self._previous_day,
             width=15
         )
-        prev_day_button.pack(side=tk.LEFT, padx=5)
+        self.prev_button.pack(side=tk.LEFT, padx=5)
 
         self.current_date = self._get_today()
         self.date_label = ttk.Label(nav_frame, text=self._format_date(self.current_date), font=("Arial", 12, "bold"))
         self.date_label.pack(side=tk.LEFT, padx=20)
 
-        next_day_button = ttk.Button(
+        self.next_button = ttk.Button(
             nav_frame,
             text="Ngày sau >>",
             command=self._next_day,
             width=15
         )
-        next_day_button.pack(side=tk.LEFT, padx=5)
+        self.next_button.pack(side=tk.LEFT, padx=5)
 
         today_button = ttk.Button(
             nav_frame,
@@ -257,8 +271,33 @@ class ScheduleView(BaseView):
         )
         today_button.pack(side=tk.RIGHT, padx=5)
 
-        self.time_slots_frame = ttk.Frame(calendar_frame)
-        self.time_slots_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.calendar_mode = tk.StringVar(value="day")
+        for text, mode in (("Tháng", "month"), ("Tuần", "week"), ("Ngày", "day")):
+            ttk.Radiobutton(
+                nav_frame,
+                text=text,
+                value=mode,
+                variable=self.calendar_mode,
+                command=self._change_calendar_mode
+            ).pack(side=tk.RIGHT, padx=5)
+
+        self.calendar_doctor_combo = ttk.Combobox(
+            nav_frame,
+            width=25,
+            values=self.doctor_combo.cget("values"),
+            state="readonly"
+        )
+        self.calendar_doctor_combo.pack(side=tk.RIGHT, padx=5)
+        self.calendar_doctor_combo.bind("<<ComboboxSelected>>", lambda event: self._load_calendar_view())
+        ttk.Label(nav_frame, text="Bác sĩ:").pack(side=tk.RIGHT, padx=5)
+
+        self.calendar_grid = CalendarGrid(
+            calendar_frame,
+            on_add=self._add_at_time,
+            on_edit=self._edit_from_calendar,
+            on_select_day=self._show_calendar_day
+        )
+        self.calendar_grid.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
         self._load_calendar_view()
 
@@ -420,28 +459,35 @@ class ScheduleView(BaseView):
         doctors = self.doctor_controller.get_all_doctors()
         doctor_values = [""] + [f"{d['MaBS']} - {d['Ho']} {d['Ten']}" for d in doctors]
         self.doctor_combo.configure(values=doctor_values)
+        if hasattr(self, "calendar_doctor_combo"):
+            self.calendar_doctor_combo.configure(values=doctor_values)
 
     def _load_appointments(self):
-        self.schedule_tree.delete(*self.schedule_tree.get_children())
-        appointments = self.controller.get_all_appointments()
-        self._populate_appointments_tree(appointments)
+        self.background.cancel_key("schedule-query")
+        self.schedule_table.set_provider(QueryDataProvider(
+            self.controller.get_appointments_page,
+            self.controller.count_all_appointments,
+            self._appointment_values,
+            cursor=Appointment.page_cursor,
+            sort_fields=self.schedule_sort_fields,
+            runner=self.background,
+            seekable=True
+        ))
         current_tab = self.notebook.index(self.notebook.select())
         if current_tab == 1:  # Calendar view tab
             self._load_calendar_view()
 
-    def _populate_appointments_tree(self, appointments):
-        for appt in appointments:
-            values = (
-                appt.get("MaLichKham", ""),
-                appt.get("MaBN", ""),
-                appt.get("TenBenhNhan", ""),
-                appt.get("MaBS", ""),
-                appt.get("TenBacSi", ""),
-                appt.get("NgayKham", ""),
-                appt.get("GioKham", ""),
-                appt.get("LydoKham", "")
-            )
-            self.schedule_tree.insert("", "end", values=values)
+    def _appointment_values(self, appt):
+        return (
+            appt.get("MaLichKham", ""),
+            appt.get("MaBN", ""),
+            appt.get("TenBenhNhan", ""),
+            appt.get("MaBS", ""),
+            appt.get("TenBacSi", ""),
+            appt.get("NgayKham", ""),
+            appt.get("GioKham", ""),
+            appt.get("LydoKham", "")
+        )
 
     def _search_by_date(self):
         # Lấy ngày khám từ CustomDateEntry
@@ -452,9 +498,7 @@ class ScheduleView(BaseView):
             self._load_appointments()
             return
 
-        self.schedule_tree.delete(*self.schedule_tree.get_children())
-        appointments = self.controller.get_appointments_by_date(date)
-        self._populate_appointments_tree(appointments)
+        self._show_query(self.controller.get_appointments_by_date, date)
 
     def _search_by_doctor(self):
         selected = self.doctor_combo.get()
@@ -464,92 +508,98 @@ class ScheduleView(BaseView):
 
         try:
             doctor_id = int(selected.split(' - ')[0])
-            self.schedule_tree.delete(*self.schedule_tree.get_children())
-            appointments = self.controller.get_doctor_appointments(doctor_id)
-
-            self._populate_appointments_tree(appointments)
+            self._show_query(self.controller.get_doctor_appointments, doctor_id)
         except (ValueError, IndexError):
             self._load_appointments()
 
+    def _show_query(self, fetch_rows, *args):
+        # The current rows stay visible until the result arrives
+        self.run_in_background(
+            fetch_rows, *args,
+            on_success=lambda rows: self.schedule_table.load_data(
+                [self._appointment_values(row) for row in rows]),
+            key="schedule-query"
+        )
+
+    def _calendar_doctor_id(self):
+        selected = self.calendar_doctor_combo.get()
+        try:
+            return int(selected.split(' - ')[0]) if selected else None
+        except ValueError:
+            return None
+
     def _load_calendar_view(self):
-        for widget in self.time_slots_frame.winfo_children():
-            widget.destroy()
-
-        self.date_label.configure(text=self._format_date(self.current_date))
-        appointments = self.controller.get_appointments_by_date(self.current_date)
-        appt_by_time = {}
-        for appt in appointments:
-            time_key = appt.get("GioKham", "")
-            if time_key not in appt_by_time:
-                appt_by_time[time_key] = []
-            appt_by_time[time_key].append(appt)
-        header_frame = ttk.Frame(self.time_slots_frame)
-        header_frame.pack(fill=tk.X, pady=(0, 10))
-
-        ttk.Label(header_frame, text="Thời gian", width=10, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-        ttk.Label(header_frame, text="Bác sĩ", width=20, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-        ttk.Label(header_frame, text="Bệnh nhân", width=20, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-        ttk.Label(header_frame, text="Lý do khám", width=30, font=("Arial", 10, "bold")).pack(side=tk.LEFT, padx=5)
-
-        for hour in range(8, 18):
-            for minute in [0, 30]:
-                time_str = f"{hour:02d}:{minute:02d}"
-
-                row_frame = ttk.Frame(self.time_slots_frame)
-                row_frame.pack(fill=tk.X, pady=2)
-
-                time_label = ttk.Label(row_frame, text=time_str, width=10)
-                time_label.pack(side=tk.LEFT, padx=5)
-
-                if time_str in appt_by_time:
-                    for i, appt in enumerate(appt_by_time[time_str]):
-                        if i > 0:
-                            row_frame = ttk.Frame(self.time_slots_frame)
-                            row_frame.pack(fill=tk.X, pady=2)
-                            ttk.Label(row_frame, text="", width=10).pack(side=tk.LEFT, padx=5)
-
-                        doctor_label = ttk.Label(row_frame, text=appt.get("TenBacSi", ""), width=20)
-                        doctor_label.pack(side=tk.LEFT, padx=5)
-
-                        patient_label = ttk.Label(row_frame, text=appt.get("TenBenhNhan", ""), width=20)
-                        patient_label.pack(side=tk.LEFT, padx=5)
-
-                        reason_label = ttk.Label(row_frame, text=appt.get("LydoKham", ""), width=30)
-                        reason_label.pack(side=tk.LEFT, padx=5)
-
-                        edit_button = ttk.Button(
-                            row_frame,
-                            text="Sửa",
-                            command=lambda a=appt: self._edit_from_calendar(a),
-                            width=8
-                        )
-                        edit_button.pack(side=tk.LEFT, padx=5)
-                else:
-                    empty_frame = ttk.Frame(row_frame)
-                    empty_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        mode = self.calendar_mode.get()
+        doctor_id = self._calendar_doctor_id()
+
+        if mode == "month":
+            date_obj = datetime.strptime(self.current_date, "%Y-%m-%d")
+            dates = get_month_dates(date_obj.year, date_obj.month)
+            self.date_label.configure(text=f"Tháng {date_obj.month:02d}/{date_obj.year}")
+            # One grouped query for the whole month
+            self.run_in_background(
+                self.controller.get_daily_counts_in_range, dates[0], dates[-1], doctor_id,
+                on_success=lambda counts: self.calendar_grid.show_month(dates, counts),
+                key="calendar"
+            )
+        elif mode == "week":
+            dates = get_week_dates(self.current_date)
+            self.date_label.configure(
+                text=f"{self._format_date(dates[0])}  →  {self._format_date(dates[-1])}"
+            )
+            # One grouped query for the whole week; a booked cell opens its
+            # day, which reads the appointments themselves
+            self.run_in_background(
+                self.controller.get_slot_counts_in_range, dates[0], dates[-1], doctor_id,
+                on_success=lambda counts: self.calendar_grid.show_days(dates, counts),
+                key="calendar"
+            )
+        else:
+            date = self.current_date
+            self.date_label.configure(text=self._format_date(date))
+            self.run_in_background(
+                self.controller.get_appointments_in_range, date, date, doctor_id,
+                on_success=lambda appointments: self.calendar_grid.show_day(date, appointments),
+                key="calendar"
+            )
 
-                    add_button = ttk.Button(
-                        row_frame,
-                        text="+",
-                        command=lambda t=time_str: self._add_at_time(t),
-                        width=5
-                    )
-                    add_button.pack(side=tk.RIGHT, padx=5)
+    def _change_calendar_mode(self):
+        labels = {
+            "month": ("<< Tháng trước", "Tháng sau >>"),
+            "week": ("<< Tuần trước", "Tuần sau >>"),
+            "day": ("<< Ngày trước", "Ngày sau >>"),
+        }
+        previous_text, next_text = labels[self.calendar_mode.get()]
+        self.prev_button.configure(text=previous_text)
+        self.next_button.configure(text=next_text)
+        self._load_calendar_view()
+
+    def _show_calendar_day(self, date_str):
+        self.current_date = date_str
+        self.calendar_mode.set("day")
+        self._change_calendar_mode()
+
+    def _move_calendar(self, direction):
+        date_obj = datetime.strptime(self.current_date, "%Y-%m-%d")
+        mode = self.calendar_mode.get()
+        if mode == "month":
+            # First day of the previous or next month
+            month_index = date_obj.year * 12 + date_obj.month - 1 + direction
+            date_obj = datetime(month_index // 12, month_index % 12 + 1, 1)
+        else:
+            date_obj += timedelta(days=(7 if mode == "week" else 1) * direction)
+        return date_obj.strftime("%Y-%m-%d")
 
     def _previous_day(self):
         try:
-            date_obj = datetime.strptime(self.current_date, "%Y-%m-%d")
-            prev_day = date_obj - timedelta(days=1)
-            self.current_date = prev_day.strftime("%Y-%m-%d")
+            self.current_date = self._move_calendar(-1)
             self._load_calendar_view()
         except ValueError:
             pass
 
     def _next_day(self):
         try:
-            date_obj = datetime.strptime(self.current_date, "%Y-%m-%d")
-            next_day = date_obj + timedelta(days=1)
-            self.current_date = next_day.strftime("%Y-%m-%d")
+            self.current_date = self._move_calendar(1)
             self._load_calendar_view()
         except ValueError:
             pass
@@ -558,7 +608,7 @@ class ScheduleView(BaseView):
         self.current_date = self._get_today()
         self._load_calendar_view()
 
-    def _add_at_time(self, time_str):
+    def _add_at_time(self, date_str, time_str):
         self._show_add_form()
 
         if "GioKham" in self.form_fields:
@@ -567,7 +617,7 @@ class ScheduleView(BaseView):
 
         if "NgayKham" in self.form_fields and isinstance(self.form_fields["NgayKham"], CustomDateEntry):
             try:
-                date_obj = datetime.strptime(self.current_date, "%Y-%m-%d")
+                date_obj = datetime.strptime(date_str, "%Y-%m-%d")
                 self.form_fields["NgayKham"].set_date(date_obj)
             except ValueError:
                 pass
@@ -610,13 +660,12 @@ class ScheduleView(BaseView):
 
     def _show_edit_form(self, appointment_id=None):
         if appointment_id is None:
-            selected_items = self.schedule_tree.selection()
+            values = self.schedule_table.get_selected_item()
 
-            if not selected_items:
+            if not values:
                 self.show_error("Lỗi", "Vui lòng chọn lịch khám để sửa!")
                 return
 
-            values = self.schedule_tree.item(selected_items[0], "values")
             appointment_id = values[0]
 
         appointment = self.controller.get_appointment(appointment_id)
@@ -721,13 +770,12 @@ class ScheduleView(BaseView):
         self.current_appointment_id = None
 
     def _delete_appointment(self):
-        selected_items = self.schedule_tree.selection()
+        values = self.schedule_table.get_selected_item()
 
-        if not selected_items:
+        if not values:
             self.show_error("Lỗi", "Vui lòng chọn lịch khám để xóa!")
             return
 
-        values = self.schedule_tree.item(selected_items[0], "values")
         appointment_id = values[0]
         confirm = self.ask_yes_no(
             "Xác nhận xóa",